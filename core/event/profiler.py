@@ -0,0 +1,158 @@
+import csv
+import time
+
+
+class Profiler:
+    """
+    Profiler class records where the tick time of a timer is spent. Every
+    bound timer callback and every post-tick level is an entry with its
+    number of calls, its cumulative time and its self time (cumulative time
+    minus the time spent in nested entries, e.g. post ticks that are executed
+    directly from within another callback).
+    """
+
+    def __init__(self):
+        """
+        Initializes the Profiler object with empty statistics.
+        """
+        # Statistics per entry key
+        self.tsName = {}
+        self.tsType = {}
+        self.tiCalls = {}
+        self.tfCumulativeTime = {}
+        self.tfSelfTime = {}
+
+        # Time spent in nested entries, one value per active measurement
+        self.afChildTime = []
+
+    def reset(self):
+        """
+        Removes all recorded statistics.
+        """
+        self.__init__()
+
+    def execute_callback(self, oTimer, iCB):
+        """
+        Executes a bound timer callback and records its execution time.
+
+        Args:
+            oTimer (Timer): Timer the callback is bound to.
+            iCB (int): Slot index of the callback.
+        """
+        xKey = ('callback', oTimer.aiBindOrder[iCB])
+
+        if xKey not in self.tsName:
+            self._add_entry(xKey, 'callback', oTimer.get_callback_name(iCB))
+
+        self._measure(xKey, oTimer.cCallBacks[iCB], oTimer)
+
+    def execute_post_tick_level(self, sGroup, sLevel, hExecute):
+        """
+        Executes a post-tick level and records its execution time.
+
+        Args:
+            sGroup (str): Name of the post-tick group.
+            sLevel (str): Name of the post-tick level.
+            hExecute (function): Function draining the level. It must return
+                the number of executed post ticks.
+        """
+        xKey = ('post_tick', sGroup, sLevel)
+
+        if xKey not in self.tsName:
+            self._add_entry(xKey, 'post_tick', f"{sGroup}.{sLevel}")
+
+        # The calls of a level are the executed post ticks, not the drains
+        iPostTicks = self._measure(xKey, hExecute)
+        self.tiCalls[xKey] += iPostTicks - 1
+
+    def get_table(self):
+        """
+        Returns the recorded statistics sorted by self time.
+
+        Returns:
+            list: One dict per entry with the keys sType, sName, iCalls,
+            fCumulativeTime, fSelfTime and fMeanTime.
+        """
+        ttTable = []
+        for xKey, sName in self.tsName.items():
+            iCalls = self.tiCalls[xKey]
+            ttTable.append({
+                'sType': self.tsType[xKey],
+                'sName': sName,
+                'iCalls': iCalls,
+                'fCumulativeTime': self.tfCumulativeTime[xKey],
+                'fSelfTime': self.tfSelfTime[xKey],
+                'fMeanTime': self.tfCumulativeTime[xKey] / iCalls if iCalls > 0 else 0,
+            })
+
+        ttTable.sort(key=lambda tEntry: tEntry['fSelfTime'], reverse=True)
+        return ttTable
+
+    def report(self, iTopN=20):
+        """
+        Prints the entries with the highest self time.
+
+        Args:
+            iTopN (int): Number of entries to print.
+        """
+        ttTable = self.get_table()
+        fTotalSelfTime = sum(tEntry['fSelfTime'] for tEntry in ttTable)
+
+        print('+-----------------------------------------------------------------------------------+')
+        print(f"Timer profile, top {min(iTopN, len(ttTable))} of {len(ttTable)} entries by self time:")
+        print(f"{'self [s]':>12} {'share':>7} {'cumulative [s]':>15} {'calls':>10}  name")
+
+        for tEntry in ttTable[:iTopN]:
+            rShare = tEntry['fSelfTime'] / fTotalSelfTime if fTotalSelfTime > 0 else 0
+            print(
+                f"{tEntry['fSelfTime']:12.4f} {rShare:7.1%} {tEntry['fCumulativeTime']:15.4f} "
+                f"{tEntry['iCalls']:10d}  [{tEntry['sType']}] {tEntry['sName']}"
+            )
+
+        print('+-----------------------------------------------------------------------------------+')
+
+    def export(self, sFilePath):
+        """
+        Writes the recorded statistics to a CSV file.
+
+        Args:
+            sFilePath (str): Path of the CSV file.
+        """
+        csFields = ['sType', 'sName', 'iCalls', 'fCumulativeTime', 'fSelfTime', 'fMeanTime']
+
+        with open(sFilePath, 'w', newline='') as oFile:
+            oWriter = csv.DictWriter(oFile, fieldnames=csFields)
+            oWriter.writeheader()
+            oWriter.writerows(self.get_table())
+
+    def _add_entry(self, xKey, sType, sName):
+        self.tsName[xKey] = sName
+        self.tsType[xKey] = sType
+        self.tiCalls[xKey] = 0
+        self.tfCumulativeTime[xKey] = 0
+        self.tfSelfTime[xKey] = 0
+
+    def _measure(self, xKey, hFunction, *args):
+        """
+        Calls a function and adds its execution time to an entry.
+
+        Returns:
+            The return value of the function.
+        """
+        self.afChildTime.append(0)
+        fStart = time.perf_counter()
+
+        try:
+            xReturn = hFunction(*args)
+        finally:
+            fElapsed = time.perf_counter() - fStart
+            fChildTime = self.afChildTime.pop()
+
+            self.tiCalls[xKey] += 1
+            self.tfCumulativeTime[xKey] += fElapsed
+            self.tfSelfTime[xKey] += fElapsed - fChildTime
+
+            if self.afChildTime:
+                self.afChildTime[-1] += fElapsed
+
+        return xReturn
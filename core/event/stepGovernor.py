@@ -0,0 +1,201 @@
+from collections import deque
+
+
+class StepGovernor:
+    """
+    StepGovernor class tracks which timer callbacks pin the global time step.
+    In every tick the callback with the earliest next execution time
+    determines the global step. Over a sliding window of ticks the governor
+    counts how often each callback did so and how many of these steps were
+    small. If small steps dominate the window the simulation is considered
+    stalled, which is reported and, depending on the policy, counteracted.
+
+    Policies:
+        'report': Only report stalled states.
+        'floor':  Additionally raise the global step to fStepFloor while the
+                  simulation is stalled. The pinning callbacks are then
+                  executed less often than they request, trading accuracy for
+                  progress. The window keeps recording the requested steps,
+                  so the floor is released once the callbacks request larger
+                  steps again. Each later stall multiplies the floor by
+                  rFloorIncrease, up to fMaxStepFloor.
+
+    Grouping the pinning callbacks into a sub-cycled inner loop is not
+    offered as a policy. The timer executes a callback at most once per
+    tick and all objects read the same global time, so executing a
+    callback repeatedly within one tick would not advance it. Fast parts of
+    a model have to be made cheaper (e.g. with the 'floor' policy or larger
+    rMaxChange values) instead.
+    """
+
+    csPolicies = ('report', 'floor')
+
+    def __init__(self, oTimer, iWindow=1000, fSmallStep=None, rStalledShare=0.9, sPolicy='report',
+                 fStepFloor=None, rFloorIncrease=10, fMaxStepFloor=1):
+        """
+        Initializes the StepGovernor object.
+
+        Args:
+            oTimer (Timer): Timer to govern.
+            iWindow (int): Number of ticks in the sliding window.
+            fSmallStep (float): Steps at or below this value count as small.
+                Defaults to 100 times the minimum time step of the timer.
+            rStalledShare (float): Share of small steps in a full window above
+                which the simulation is considered stalled.
+            sPolicy (str): 'report' or 'floor', see class description.
+            fStepFloor (float): Initial step floor of the 'floor' policy.
+                Defaults to 10 times fSmallStep.
+            rFloorIncrease (float): Factor applied to the floor on every
+                stall after the first one.
+            fMaxStepFloor (float): Upper limit for the step floor.
+        """
+        if sPolicy not in self.csPolicies:
+            raise ValueError(f"Unknown step governor policy '{sPolicy}', use one of {self.csPolicies}.")
+
+        self.oTimer = oTimer
+        self.iWindow = iWindow
+        self.fSmallStep = fSmallStep if fSmallStep is not None else 100 * oTimer.fMinimumTimeStep
+        self.rStalledShare = rStalledShare
+        self.sPolicy = sPolicy
+        self.fStepFloor = fStepFloor if fStepFloor is not None else 10 * self.fSmallStep
+        self.rFloorIncrease = rFloorIncrease
+        self.fMaxStepFloor = fMaxStepFloor
+
+        # Sliding window of (key, small step flag) per tick and the counts of
+        # the entries currently inside the window
+        self.aoWindow = deque()
+        self.iSmallSteps = 0
+        self.tiPinned = {}
+        self.tiPinnedSmall = {}
+        self.tfMinStep = {}
+        self.tsName = {}
+
+        self.bStalled = False
+        self.bFloorActive = False
+        self.iStalls = 0
+
+    def update(self, iCB, fTimeStep):
+        """
+        Records the callback pinning the step of the current tick and applies
+        the policy.
+
+        Args:
+            iCB (int): Slot of the callback with the earliest next execution,
+                None if no callback determined the step.
+            fTimeStep (float): Global time step requested by the callbacks.
+
+        Returns:
+            float: The time step to use for the next tick.
+        """
+        if iCB is None:
+            xKey = None
+        else:
+            xKey = self.oTimer.aiBindOrder[iCB]
+            if xKey not in self.tsName:
+                self.tsName[xKey] = self.oTimer.get_callback_name(iCB)
+
+        bSmall = fTimeStep <= self.fSmallStep
+        self._add_to_window(xKey, bSmall, fTimeStep)
+
+        bStalled = len(self.aoWindow) >= self.iWindow and self.iSmallSteps > self.rStalledShare * self.iWindow
+
+        if bStalled and not self.bStalled:
+            self.iStalls += 1
+            self._on_stall()
+        elif not bStalled and self.bStalled:
+            print(f"Step governor: simulation no longer stalled at t = {self.oTimer.fTime:.6g} s.")
+            self.bFloorActive = False
+
+        self.bStalled = bStalled
+
+        if self.bFloorActive:
+            return max(fTimeStep, self.fStepFloor)
+
+        return fTimeStep
+
+    def get_pinning_callbacks(self):
+        """
+        Returns the callbacks that pinned the global step within the window,
+        sorted by the number of small steps they caused.
+
+        Returns:
+            list: One dict per callback with the keys sName, iPinned,
+            iPinnedSmall, rShare and fMinStep.
+        """
+        iTicks = len(self.aoWindow)
+        ttCallBacks = []
+
+        for xKey, iPinned in self.tiPinned.items():
+            ttCallBacks.append({
+                'sName': self.tsName[xKey] if xKey is not None else 'no callback',
+                'iPinned': iPinned,
+                'iPinnedSmall': self.tiPinnedSmall.get(xKey, 0),
+                'rShare': iPinned / iTicks if iTicks > 0 else 0,
+                'fMinStep': self.tfMinStep[xKey],
+            })
+
+        ttCallBacks.sort(key=lambda tEntry: (tEntry['iPinnedSmall'], tEntry['iPinned']), reverse=True)
+        return ttCallBacks
+
+    def report(self, iTopN=10):
+        """
+        Prints the callbacks pinning the global step within the window.
+
+        Args:
+            iTopN (int): Number of callbacks to print.
+        """
+        print('+-----------------------------------------------------------------------------------+')
+        print(
+            f"Step governor: {self.iSmallSteps} of the last {len(self.aoWindow)} ticks used steps "
+            f"<= {self.fSmallStep:.3g} s, {self.iStalls} stall(s) detected."
+        )
+
+        if self.bFloorActive:
+            print(f"The step floor of {self.fStepFloor:.3g} s is active.")
+
+        print(f"{'small':>8} {'pinned':>8} {'share':>7} {'min step [s]':>13}  name")
+        for tEntry in self.get_pinning_callbacks()[:iTopN]:
+            print(
+                f"{tEntry['iPinnedSmall']:8d} {tEntry['iPinned']:8d} {tEntry['rShare']:7.1%} "
+                f"{tEntry['fMinStep']:13.3g}  {tEntry['sName']}"
+            )
+
+        print('+-----------------------------------------------------------------------------------+')
+
+    def _add_to_window(self, xKey, bSmall, fTimeStep):
+        self.aoWindow.append((xKey, bSmall))
+        self.iSmallSteps += bSmall
+        self.tiPinned[xKey] = self.tiPinned.get(xKey, 0) + 1
+        self.tfMinStep[xKey] = min(self.tfMinStep.get(xKey, fTimeStep), fTimeStep)
+        if bSmall:
+            self.tiPinnedSmall[xKey] = self.tiPinnedSmall.get(xKey, 0) + 1
+
+        if len(self.aoWindow) > self.iWindow:
+            xOldKey, bOldSmall = self.aoWindow.popleft()
+            self.iSmallSteps -= bOldSmall
+
+            self.tiPinned[xOldKey] -= 1
+            if bOldSmall:
+                self.tiPinnedSmall[xOldKey] -= 1
+
+            if self.tiPinned[xOldKey] == 0:
+                del self.tiPinned[xOldKey]
+                del self.tfMinStep[xOldKey]
+                self.tiPinnedSmall.pop(xOldKey, None)
+
+    def _on_stall(self):
+        """
+        Reports a newly detected stall and applies the policy.
+        """
+        print(
+            f"Step governor: simulation stalled at t = {self.oTimer.fTime:.6g} s, "
+            f"{self.iSmallSteps} of the last {len(self.aoWindow)} ticks used steps <= {self.fSmallStep:.3g} s."
+        )
+        self.report(5)
+
+        if self.sPolicy == 'floor':
+            if self.iStalls > 1:
+                self.fStepFloor = min(self.fStepFloor * self.rFloorIncrease, self.fMaxStepFloor)
+
+            self.bFloorActive = True
+            print(f"Step governor: raising the global step floor to {self.fStepFloor:.3g} s.")
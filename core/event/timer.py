@@ -1,15 +1,111 @@
+import heapq
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from profiler import Profiler
+from stepGovernor import StepGovernor
+
+
+class CallBackHandle:
+    """
+    Handle to a callback bound to the timer. Calling the handle sets the time
+    step of the callback. The handle stores the slot and generation of the
+    callback, so it stays valid when other callbacks are unbound and becomes
+    invalid once its own callback was unbound.
+    """
+
+    __slots__ = ('oTimer', 'iCB', 'iGeneration')
+
+    def __init__(self, oTimer, iCB, iGeneration):
+        self.oTimer = oTimer
+        self.iCB = iCB
+        self.iGeneration = iGeneration
+
+    def __call__(self, fTimeStep, bResetLastExecuted=False):
+        """
+        Sets the time step of the callback.
+
+        Args:
+            fTimeStep (float): New time step.
+            bResetLastExecuted (bool): Whether to reset the last executed time.
+        """
+        if not self.is_valid():
+            raise ValueError("Cannot set the time step of a callback that was unbound from the timer.")
+
+        self.oTimer._setTimeStep(self.iCB, fTimeStep, bResetLastExecuted)
+
+    def is_valid(self):
+        """
+        Checks whether the callback of this handle is still bound.
+
+        Returns:
+            bool: True if the callback is still bound.
+        """
+        return self.oTimer.aiGeneration[self.iCB] == self.iGeneration
+
+    def unbind(self):
+        """
+        Unbinds the callback. Unbinding an already unbound callback does
+        nothing.
+        """
+        if self.is_valid():
+            self.oTimer.unbind(self.iCB)
+
+    def sleep(self):
+        """
+        Parks the callback, it is not executed until it is woken up.
+        """
+        if not self.is_valid():
+            raise ValueError("Cannot park a callback that was unbound from the timer.")
+
+        self.oTimer.sleep(self.iCB)
+
+    def wake(self, _=None):
+        """
+        Wakes up the parked callback, it is executed in the next tick. Waking
+        an unbound callback does nothing, so the handle can be bound to
+        events that outlive the callback. The optional argument allows to
+        bind the method to events directly.
+        """
+        if self.is_valid():
+            self.oTimer.wake(self.iCB)
+
+    def wake_on(self, oSource, sEvent):
+        """
+        Wakes up the callback whenever the event of the source object is
+        triggered.
+
+        Args:
+            oSource (Source): Object triggering the event, e.g. a branch.
+            sEvent (str): Name of the event, e.g. 'outdated'.
+
+        Returns:
+            The unbind handle returned by the bind method of the source.
+        """
+        return oSource.bind(sEvent, self.wake)
+
+
 class Timer:
     """
     Timer class handles all timing operations within the simulation framework.
     """
 
-    def __init__(self, fMinimumTimeStep=1e-8, fStart=None):
+    def __init__(self, fMinimumTimeStep=1e-8, fStart=None, bVectorized=False, iInitialCallBackCapacity=1024):
         """
         Initializes the Timer object.
 
         Args:
             fMinimumTimeStep (float): Minimum allowed time step.
             fStart (float): Start time for the simulation.
+            bVectorized (bool): Store the callback time steps, last execution
+                times and flags in NumPy arrays and evaluate the due callbacks
+                with array operations instead of the scheduler heap. Intended
+                for models with tens of thousands of bound callbacks.
+            iInitialCallBackCapacity (int): Preallocated number of callback
+                slots in vectorized mode, the arrays grow when exceeded.
         """
         self.fMinimumTimeStep = fMinimumTimeStep
         self.fStart = fStart if fStart is not None else -1 * fMinimumTimeStep
@@ -18,12 +114,53 @@ class Timer:
         self.fTimeStepFinal = 0
         self.iTick = -1
 
-        # Callback-related properties
+        # Callback-related properties. The lists are indexed by slot, slots of
+        # unbound callbacks are put on the free list and reused by bind(). The
+        # generation of a slot is increased on every unbind to invalidate old
+        # handles, the bind order keeps the execution order independent of
+        # slot reuse. Parked callbacks are marked as sleeping, woken up
+        # callbacks are executed in the next tick regardless of their time
+        # step. A wake up only shortens the global time step if the time
+        # step of the callback requires it. In vectorized mode the numeric
+        # properties are arrays with a capacity larger than the number of
+        # used slots.
+        self.bVectorized = bVectorized
+        self.iCallBackSlots = 0
         self.cCallBacks = []
-        self.afTimeSteps = []
-        self.afLastExec = []
         self.ctPayload = []
-        self.abDependent = []
+        self.aiGeneration = []
+
+        if bVectorized:
+            self.afTimeSteps = np.zeros(iInitialCallBackCapacity)
+            self.afLastExec = np.full(iInitialCallBackCapacity, -np.inf)
+            self.abDependent = np.zeros(iInitialCallBackCapacity, dtype=bool)
+            self.abBound = np.zeros(iInitialCallBackCapacity, dtype=bool)
+            self.abSleeping = np.zeros(iInitialCallBackCapacity, dtype=bool)
+            self.abWakeUp = np.zeros(iInitialCallBackCapacity, dtype=bool)
+            self.aiBindOrder = np.zeros(iInitialCallBackCapacity, dtype=np.int64)
+        else:
+            self.afTimeSteps = []
+            self.afLastExec = []
+            self.abDependent = []
+            self.abBound = []
+            self.abSleeping = []
+            self.abWakeUp = []
+            self.aiBindOrder = []
+
+        self.aiFreeSlots = []
+        self.iBindCounter = 0
+        self.bSynchronizeExecuteCallBack = False
+
+        # Scheduler properties. Non-dependent callbacks are kept in a heap of
+        # (fNextExec, iCB, iVersion) entries. Changing a time step only pushes
+        # a new entry and bumps the version, old entries are discarded lazily
+        # once they reach the top of the heap. Dependent callbacks (time step
+        # -1) are executed every tick and are therefore kept in a plain set,
+        # woken up callbacks are executed once in the next tick.
+        self.aoScheduleHeap = []
+        self.aiScheduleVersion = []
+        self.aiDependentCallBacks = set()
+        self.aiWakeUpCallBacks = set()
 
         # Post-tick execution properties
         self.txPostTicks = {
@@ -57,12 +194,38 @@ class Timer:
         self.tiPostTickGroup = {}
         self.tcsPostTickLevel = {}
         self.aiNumberOfPostTickLevel = []
+
+        # Registered post ticks per group index and level name, the flags
+        # mark queued post ticks so each one is queued at most once, and the
+        # queues hold the indices of the post ticks to execute.
+        self.chPostTicks = {}
         self.cabPostTickControl = {}
+        self.caiPostTickQueue = {}
+        self.tiPostTickLevel = {}
         self.abCallbacksRegistered = []
 
+        # Optional handlers per (group index, level name) that execute all
+        # queued post ticks of a level at once, see
+        # set_post_tick_batch_handler
+        self.thPostTickBatchHandlers = {}
+
+        # Set by the first phase that registers its post-tick batch handlers,
+        # so they are only set once per timer
+        self.bPhaseBatchHandlersSet = False
+
         self.iCurrentPostTickGroup = 0
         self.iCurrentPostTickLevel = 0
 
+        # Profiler object, only set while profiling is enabled
+        self.oProfiler = None
+
+        # Step governor object, only set while enabled
+        self.oStepGovernor = None
+
+        # Global mass state of all phases, only set if a
+        # matter.phaseStateStore.PhaseStateStore is attached
+        self.oPhaseStateStore = None
+
         self._initialize_post_ticks()
 
     def _initialize_post_ticks(self):
@@ -72,8 +235,12 @@ class Timer:
         for group_index, (group_name, levels) in enumerate(self.txPostTicks.items(), start=1):
             self.tiPostTickGroup[group_name] = group_index
             self.tcsPostTickLevel[group_name] = []
+            self.tiPostTickLevel[group_name] = {}
+            self.chPostTicks[group_index] = {}
+            self.cabPostTickControl[group_index] = {}
+            self.caiPostTickQueue[group_index] = {}
 
-            for level_name in levels.keys():
+            for level_name in list(levels.keys()):
                 pre_level = f"pre_{level_name}"
                 post_level = f"post_{level_name}"
 
@@ -82,8 +249,94 @@ class Timer:
 
                 self.tcsPostTickLevel[group_name].extend([pre_level, level_name, post_level])
 
+            for level_index, level_name in enumerate(self.tcsPostTickLevel[group_name], start=1):
+                self.tiPostTickLevel[group_name][level_name] = level_index
+                self.chPostTicks[group_index][level_name] = self.txPostTicks[group_name][level_name]
+                self.cabPostTickControl[group_index][level_name] = []
+                self.caiPostTickQueue[group_index][level_name] = []
+
             self.aiNumberOfPostTickLevel.append(len(self.tcsPostTickLevel[group_name]))
 
+    def register_post_tick(self, hCallBack, sGroup, sLevel):
+        """
+        Registers a post-tick callback in the specified group and level.
+
+        Args:
+            hCallBack (function): Callback function without arguments.
+            sGroup (str): Post-tick group, e.g. 'matter'.
+            sLevel (str): Post-tick level within the group, e.g.
+                'phase_massupdate' or 'pre_multibranch_solver'.
+
+        Returns:
+            function: Handle that queues the callback for execution in the
+            post-tick of the current tick. Calling it repeatedly before the
+            execution queues the callback only once.
+        """
+        if sGroup not in self.tiPostTickGroup:
+            raise ValueError(f"Unknown post-tick group '{sGroup}'.")
+        if sLevel not in self.tiPostTickLevel[sGroup]:
+            raise ValueError(f"Unknown post-tick level '{sLevel}' in group '{sGroup}'.")
+
+        iGroup = self.tiPostTickGroup[sGroup]
+        iLevel = self.tiPostTickLevel[sGroup][sLevel]
+
+        self.chPostTicks[iGroup][sLevel].append(hCallBack)
+        self.cabPostTickControl[iGroup][sLevel].append(False)
+        iPostTick = len(self.chPostTicks[iGroup][sLevel]) - 1
+
+        return lambda: self._set_post_tick_control(iGroup, iLevel, sLevel, iPostTick)
+
+    # MATLAB style name used by parts of the framework
+    registerPostTick = register_post_tick
+
+    def set_post_tick_batch_handler(self, sGroup, sLevel, hBatchHandler):
+        """
+        Sets a handler that executes all queued post ticks of a level in
+        one call instead of calling them one by one, e.g. to update the
+        masses of all phases with array operations.
+
+        Args:
+            sGroup (str): Post-tick group, e.g. 'matter'.
+            sLevel (str): Post-tick level within the group.
+            hBatchHandler (function): Called with the list of queued
+                post-tick callbacks in execution order. It has to execute
+                all of them, either batched or individually. None removes the
+                handler.
+        """
+        if sGroup not in self.tiPostTickGroup:
+            raise ValueError(f"Unknown post-tick group '{sGroup}'.")
+        if sLevel not in self.tiPostTickLevel[sGroup]:
+            raise ValueError(f"Unknown post-tick level '{sLevel}' in group '{sGroup}'.")
+
+        iGroup = self.tiPostTickGroup[sGroup]
+        if hBatchHandler is None:
+            self.thPostTickBatchHandlers.pop((iGroup, sLevel), None)
+        else:
+            self.thPostTickBatchHandlers[(iGroup, sLevel)] = hBatchHandler
+
+    def _set_post_tick_control(self, iGroup, iLevel, sLevel, iPostTick):
+        """
+        Queues a registered post tick for execution.
+
+        Args:
+            iGroup (int): Index of the post-tick group.
+            iLevel (int): Index of the level within the group.
+            sLevel (str): Name of the level.
+            iPostTick (int): Index of the post tick within the level.
+        """
+        abControl = self.cabPostTickControl[iGroup][sLevel]
+        if abControl[iPostTick]:
+            return
+
+        # The level was already executed in this tick, so waiting for the
+        # queue to be drained would delay the update to the next tick
+        if iGroup < self.iCurrentPostTickGroup or (iGroup == self.iCurrentPostTickGroup and iLevel < self.iCurrentPostTickLevel):
+            self.chPostTicks[iGroup][sLevel][iPostTick]()
+            return
+
+        abControl[iPostTick] = True
+        self.caiPostTickQueue[iGroup][sLevel].append(iPostTick)
+
     def setMinStep(self, fMinStep):
         """
         Sets the minimum time step of the solver.
@@ -103,6 +356,71 @@ class Timer:
         """
         self.iPrecision = iPrecision
 
+    def enable_profiling(self):
+        """
+        Starts recording call counts and execution times of all callbacks
+        and post-tick levels. Statistics recorded before are kept.
+
+        Returns:
+            Profiler: The profiler object holding the statistics.
+        """
+        if self.oProfiler is None:
+            self.oProfiler = Profiler()
+
+        return self.oProfiler
+
+    def disable_profiling(self):
+        """
+        Stops profiling and removes the recorded statistics.
+        """
+        self.oProfiler = None
+
+    def enable_step_governor(self, **kwargs):
+        """
+        Starts tracking which callbacks pin the global time step.
+
+        Args:
+            **kwargs: Parameters of the StepGovernor, e.g. iWindow or sPolicy.
+
+        Returns:
+            StepGovernor: The step governor object.
+        """
+        self.oStepGovernor = StepGovernor(self, **kwargs)
+        return self.oStepGovernor
+
+    def disable_step_governor(self):
+        """
+        Stops tracking the callbacks pinning the global time step.
+        """
+        self.oStepGovernor = None
+
+    def get_callback_name(self, iCB):
+        """
+        Creates a readable name for a bound callback from its payload.
+
+        Args:
+            iCB (int): Slot index of the callback.
+
+        Returns:
+            str: Name of the callback.
+        """
+        tPayload = self.ctPayload[iCB]
+        oSrcObj = tPayload.get('oSrcObj')
+        sMethod = tPayload.get('sMethod')
+        sDescription = tPayload.get('sDescription')
+
+        if oSrcObj is not None:
+            sName = f"{type(oSrcObj).__name__} {getattr(oSrcObj, 'sName', '')}".strip()
+        else:
+            sName = 'unknown object'
+
+        if sMethod:
+            sName = f"{sName}.{sMethod}"
+        if sDescription:
+            sName = f"{sName} ({sDescription})"
+
+        return sName
+
     def bind(self, hCallBack, fTimeStep=None, tInputPayload=None):
         """
         Registers a callback with the timer object.
@@ -113,37 +431,130 @@ class Timer:
             tInputPayload (dict): Optional payload for debugging.
 
         Returns:
-            tuple: A handle to set the time step and a handle to unbind the callback.
+            tuple: A CallBackHandle to set the time step and a handle to unbind the callback.
         """
         tPayload = {'oSrcObj': None, 'sMethod': None, 'sDescription': None, 'cAdditional': []}
         if tInputPayload and isinstance(tInputPayload, dict):
             tPayload.update(tInputPayload)
 
-        iIdx = len(self.afTimeSteps)
-
-        self.cCallBacks.append(hCallBack)
-        self.afLastExec.append(-float('inf'))
-        self.ctPayload.append(tPayload)
-        self.afTimeSteps.append(fTimeStep if fTimeStep is not None else self.fMinimumTimeStep)
-        self.abDependent.append(fTimeStep == -1 if fTimeStep is not None else False)
+        fTimeStepInternal = fTimeStep if fTimeStep is not None else self.fMinimumTimeStep
+        bDependent = fTimeStep == -1 if fTimeStep is not None else False
+
+        if self.aiFreeSlots:
+            iIdx = self.aiFreeSlots.pop()
+
+            self.cCallBacks[iIdx] = hCallBack
+            self.ctPayload[iIdx] = tPayload
+        else:
+            iIdx = self.iCallBackSlots
+            self.iCallBackSlots += 1
+
+            self.cCallBacks.append(hCallBack)
+            self.ctPayload.append(tPayload)
+            self.aiGeneration.append(0)
+            self.aiScheduleVersion.append(0)
+
+            if not self.bVectorized:
+                self.afLastExec.append(None)
+                self.afTimeSteps.append(None)
+                self.abDependent.append(None)
+                self.abBound.append(None)
+                self.abSleeping.append(None)
+                self.abWakeUp.append(None)
+                self.aiBindOrder.append(None)
+            elif iIdx >= len(self.afTimeSteps):
+                self._grow_callback_arrays()
+
+        self.afLastExec[iIdx] = -float('inf')
+        self.afTimeSteps[iIdx] = fTimeStepInternal
+        self.abDependent[iIdx] = bDependent
+        self.abBound[iIdx] = True
+        self.abSleeping[iIdx] = False
+        self.abWakeUp[iIdx] = False
+        self.aiBindOrder[iIdx] = self.iBindCounter
+
+        self.iBindCounter += 1
+        self._schedule(iIdx)
+
+        oHandle = CallBackHandle(self, iIdx, self.aiGeneration[iIdx])
+        return oHandle, oHandle.unbind
+
+    def _grow_callback_arrays(self):
+        """
+        Doubles the capacity of the callback arrays in vectorized mode.
+        """
+        iCapacity = max(2 * len(self.afTimeSteps), 1)
+        iAdded = iCapacity - len(self.afTimeSteps)
 
-        return (
-            lambda fTimeStep, bReset=False: self._setTimeStep(iIdx, fTimeStep, bReset),
-            lambda: self.unbind(iIdx)
-        )
+        self.afTimeSteps = np.concatenate((self.afTimeSteps, np.zeros(iAdded)))
+        self.afLastExec = np.concatenate((self.afLastExec, np.full(iAdded, -np.inf)))
+        self.abDependent = np.concatenate((self.abDependent, np.zeros(iAdded, dtype=bool)))
+        self.abBound = np.concatenate((self.abBound, np.zeros(iAdded, dtype=bool)))
+        self.abSleeping = np.concatenate((self.abSleeping, np.zeros(iAdded, dtype=bool)))
+        self.abWakeUp = np.concatenate((self.abWakeUp, np.zeros(iAdded, dtype=bool)))
+        self.aiBindOrder = np.concatenate((self.aiBindOrder, np.zeros(iAdded, dtype=np.int64)))
 
     def unbind(self, iCB):
         """
-        Unbinds a callback.
+        Unbinds a callback. The slot is kept and reused by the next bind, so
+        the indices of all other callbacks stay valid.
 
         Args:
-            iCB (int): Index of the callback to remove.
+            iCB (int): Slot index of the callback to remove.
         """
-        del self.cCallBacks[iCB]
-        del self.afTimeSteps[iCB]
-        del self.abDependent[iCB]
-        del self.afLastExec[iCB]
-        del self.ctPayload[iCB]
+        if not self.abBound[iCB]:
+            return
+
+        self.cCallBacks[iCB] = None
+        self.ctPayload[iCB] = None
+        self.abDependent[iCB] = False
+        self.abBound[iCB] = False
+        self.abSleeping[iCB] = False
+        self.abWakeUp[iCB] = False
+        self.aiGeneration[iCB] += 1
+
+        # Invalidates any heap entry of the slot
+        self.aiScheduleVersion[iCB] += 1
+        self.aiDependentCallBacks.discard(iCB)
+        self.aiWakeUpCallBacks.discard(iCB)
+
+        self.aiFreeSlots.append(iCB)
+
+    def sleep(self, iCB):
+        """
+        Parks a callback. A parked callback is neither executed nor taken
+        into account for the global time step until it is woken up, so idle
+        parts of a model do not cost anything per tick.
+
+        Args:
+            iCB (int): Slot index of the callback.
+        """
+        if self.abSleeping[iCB]:
+            return
+
+        self.abSleeping[iCB] = True
+        self.abWakeUp[iCB] = False
+        self.aiWakeUpCallBacks.discard(iCB)
+        self._schedule(iCB)
+
+    def wake(self, iCB):
+        """
+        Wakes up a parked callback. It is executed in the next tick and then
+        continues with its time step. If the callback is already due, the
+        wake up does not shorten the global time step, so the next tick is
+        the one that is due anyway. Otherwise the callback is also scheduled
+        with its time step, e.g. one set right before the wake up.
+
+        Args:
+            iCB (int): Slot index of the callback.
+        """
+        if not self.abSleeping[iCB]:
+            return
+
+        self.abSleeping[iCB] = False
+        self.abWakeUp[iCB] = True
+        self.aiWakeUpCallBacks.add(iCB)
+        self._schedule(iCB)
 
     def tick(self):
         """
@@ -156,16 +567,37 @@ class Timer:
         self.fTime += fThisStep
         self.iTick += 1
 
-        abExec = [(last_exec + step <= self.fTime) for last_exec, step in zip(self.afLastExec, self.afTimeSteps)]
-        if hasattr(self, 'bSynchronizeExecuteCallBack') and self.bSynchronizeExecuteCallBack:
-            abExec = [True] * len(self.afTimeSteps)
+        if self.bSynchronizeExecuteCallBack:
+            aiExec = [i for i in range(self.iCallBackSlots) if self.abBound[i] and not self.abSleeping[i]]
+            aiExec.sort(key=self.aiBindOrder.__getitem__)
+            self.aoScheduleHeap = []
+            self.aiWakeUpCallBacks = set()
             self.bSynchronizeExecuteCallBack = False
-
-        aiExec = [i for i, exec_ in enumerate(abExec) if exec_]
-
-        for i in aiExec:
-            self.cCallBacks[i](self)
-            self.afLastExec[i] = self.fTime
+        elif self.bVectorized:
+            aiExec = self._find_due_callbacks_vectorized()
+        else:
+            aiExec = self._pop_due_callbacks()
+
+        aiGeneration = self.aiGeneration
+        aiExecGeneration = [aiGeneration[i] for i in aiExec]
+        oProfiler = self.oProfiler
+
+        for i, iGeneration in zip(aiExec, aiExecGeneration):
+            # Callbacks can unbind other callbacks (or themselves) while the
+            # tick is executed
+            if aiGeneration[i] != iGeneration:
+                continue
+
+            if oProfiler is None:
+                self.cCallBacks[i](self)
+            else:
+                oProfiler.execute_callback(self, i)
+
+            if aiGeneration[i] == iGeneration:
+                self.afLastExec[i] = self.fTime
+                self.abWakeUp[i] = False
+                self.aiWakeUpCallBacks.discard(i)
+                self._schedule(i)
 
         # Post-tick execution logic
         self._execute_post_ticks()
@@ -175,31 +607,106 @@ class Timer:
 
     def _execute_post_ticks(self):
         """
-        Executes registered post-tick callbacks in the defined order.
+        Executes the queued post-tick callbacks in the group and level order
+        of txPostTicks. Only levels with a non-empty queue are visited.
         """
-        for group_name in self.csPostTickGroups[:-1]:
+        for group_name in self.csPostTickGroups:
             group_index = self.tiPostTickGroup[group_name]
-            levels = self.tcsPostTickLevel[group_name]
+            self.iCurrentPostTickGroup = group_index
+
+            for level_index, level_name in enumerate(self.tcsPostTickLevel[group_name], start=1):
+                aiQueue = self.caiPostTickQueue[group_index][level_name]
+                if not aiQueue:
+                    continue
+
+                self.iCurrentPostTickLevel = level_index
+
+                if self.oProfiler is None:
+                    self._execute_post_tick_level(group_index, level_name)
+                else:
+                    self.oProfiler.execute_post_tick_level(
+                        group_name, level_name, lambda: self._execute_post_tick_level(group_index, level_name)
+                    )
+
+        self.iCurrentPostTickGroup = 0
+        self.iCurrentPostTickLevel = 0
+
+    def _execute_post_tick_level(self, iGroup, sLevel):
+        """
+        Drains the post-tick queue of one level.
+
+        Args:
+            iGroup (int): Index of the post-tick group.
+            sLevel (str): Name of the level.
+
+        Returns:
+            int: Number of executed post ticks.
+        """
+        aiQueue = self.caiPostTickQueue[iGroup][sLevel]
+        abControl = self.cabPostTickControl[iGroup][sLevel]
+        chPostTicks = self.chPostTicks[iGroup][sLevel]
+        hBatchHandler = self.thPostTickBatchHandlers.get((iGroup, sLevel))
+        iExecuted = 0
+
+        # Post ticks can queue other post ticks of the same level, so the
+        # queue is drained until it stays empty
+        while aiQueue:
+            aiExecute = sorted(aiQueue)
+            aiQueue.clear()
+
+            if hBatchHandler is None:
+                for idx in aiExecute:
+                    abControl[idx] = False
+                    chPostTicks[idx]()
+            else:
+                for idx in aiExecute:
+                    abControl[idx] = False
+
+                hBatchHandler([chPostTicks[idx] for idx in aiExecute])
+
+            iExecuted += len(aiExecute)
 
-            for level_name in levels:
-                while any(self.cabPostTickControl.get(group_index, {}).get(level_name, [])):
-                    for idx, should_execute in enumerate(self.cabPostTickControl[group_index][level_name]):
-                        if should_execute:
-                            self.chPostTicks[group_index][level_name][idx]()
-                            self.cabPostTickControl[group_index][level_name][idx] = False
+        return iExecuted
 
     def _determine_next_time_step(self):
         """
         Determines the next time step based on callback execution times.
         """
-        fNextExecutionTime = min([
-            last_exec + step
-            for last_exec, step, dependent in zip(self.afLastExec, self.afTimeSteps, self.abDependent)
-            if not dependent
-        ], default=self.fTime + self.fMinimumTimeStep)
+        if self.bVectorized:
+            iSlots = self.iCallBackSlots
+            abScheduled = self.abBound[:iSlots] & ~self.abDependent[:iSlots] & ~self.abSleeping[:iSlots]
+
+            # NaN marks callbacks that are not scheduled, -inf + inf also
+            # results in NaN for callbacks that are never due. Woken up
+            # callbacks that are already due are executed in the next tick
+            # anyway and do not constrain the time step.
+            with np.errstate(invalid='ignore'):
+                afNextExec = self.afLastExec[:iSlots] + self.afTimeSteps[:iSlots]
+                abScheduled &= ~(self.abWakeUp[:iSlots] & (afNextExec <= self.fTime))
+                afNextExec = np.where(abScheduled, afNextExec, np.nan)
+
+            if np.isnan(afNextExec).all():
+                iNextCB = None
+                fNextExecutionTime = self.fTime + self.fMinimumTimeStep
+            else:
+                iNextCB = int(np.nanargmin(afNextExec))
+                fNextExecutionTime = float(afNextExec[iNextCB])
+        else:
+            aoHeap = self.aoScheduleHeap
+            while aoHeap and aoHeap[0][2] != self.aiScheduleVersion[aoHeap[0][1]]:
+                heapq.heappop(aoHeap)
+
+            if aoHeap:
+                fNextExecutionTime, iNextCB, _ = aoHeap[0]
+            else:
+                iNextCB = None
+                fNextExecutionTime = self.fTime + self.fMinimumTimeStep
 
         self.fTimeStepFinal = max(fNextExecutionTime - self.fTime, self.fMinimumTimeStep)
 
+        if self.oStepGovernor is not None:
+            self.fTimeStepFinal = self.oStepGovernor.update(iNextCB, self.fTimeStepFinal)
+
     def _setTimeStep(self, iCB, fTimeStep, bResetLastExecuted=False):
         """
         Sets the time step for a specific callback.
@@ -213,3 +720,121 @@ class Timer:
         self.afTimeSteps[iCB] = max(fTimeStep, 0)
         if bResetLastExecuted:
             self.afLastExec[iCB] = self.fTime
+        self._schedule(iCB)
+
+    def _schedule(self, iCB):
+        """
+        Updates the scheduler entry of a callback after its time step or last
+        execution time changed. Previous heap entries become stale.
+
+        Args:
+            iCB (int): Index of the callback.
+        """
+        # The vectorized mode evaluates the arrays directly
+        if self.bVectorized:
+            return
+
+        self.aiScheduleVersion[iCB] += 1
+
+        if self.abDependent[iCB] and not self.abSleeping[iCB]:
+            self.aiDependentCallBacks.add(iCB)
+            return
+
+        self.aiDependentCallBacks.discard(iCB)
+
+        fNextExec = self._get_next_execution_time(iCB)
+        if fNextExec is None:
+            return
+
+        heapq.heappush(self.aoScheduleHeap, (fNextExec, iCB, self.aiScheduleVersion[iCB]))
+
+        # Frequent time step changes leave many stale entries behind
+        if len(self.aoScheduleHeap) > 4 * len(self.aiScheduleVersion) + 64:
+            self._rebuild_schedule()
+
+    def _rebuild_schedule(self):
+        """
+        Rebuilds the scheduler heap and the dependent set from the callback
+        lists, dropping all stale entries.
+        """
+        self.aoScheduleHeap = []
+        self.aiDependentCallBacks = set()
+
+        for iCB in range(self.iCallBackSlots):
+            if not self.abBound[iCB] or self.abSleeping[iCB]:
+                continue
+
+            if self.abDependent[iCB]:
+                self.aiDependentCallBacks.add(iCB)
+                continue
+
+            fNextExec = self._get_next_execution_time(iCB)
+            if fNextExec is not None:
+                self.aoScheduleHeap.append((fNextExec, iCB, self.aiScheduleVersion[iCB]))
+
+        heapq.heapify(self.aoScheduleHeap)
+
+    def _get_next_execution_time(self, iCB):
+        """
+        Calculates the next execution time of a scheduled callback.
+
+        Args:
+            iCB (int): Index of the callback.
+
+        Returns:
+            float: Next execution time, None if the callback is parked, never
+            due or woken up and already due (see aiWakeUpCallBacks).
+        """
+        if self.abSleeping[iCB]:
+            return None
+
+        fNextExec = self.afLastExec[iCB] + self.afTimeSteps[iCB]
+
+        # -inf + inf results in NaN, such a callback is never due
+        if fNextExec != fNextExec:
+            return None
+
+        if self.abWakeUp[iCB] and fNextExec <= self.fTime:
+            return None
+
+        return fNextExec
+
+    def _pop_due_callbacks(self):
+        """
+        Removes all callbacks that are due in the current tick from the
+        scheduler.
+
+        Returns:
+            list: Slots of the due callbacks in execution (bind) order.
+        """
+        aoHeap = self.aoScheduleHeap
+        aiScheduleVersion = self.aiScheduleVersion
+        aiExec = self.aiDependentCallBacks | self.aiWakeUpCallBacks
+        self.aiWakeUpCallBacks = set()
+
+        while aoHeap and aoHeap[0][0] <= self.fTime:
+            _, iCB, iVersion = heapq.heappop(aoHeap)
+            if iVersion == aiScheduleVersion[iCB]:
+                aiExec.add(iCB)
+
+        return sorted(aiExec, key=self.aiBindOrder.__getitem__)
+
+    def _find_due_callbacks_vectorized(self):
+        """
+        Determines the callbacks that are due in the current tick from the
+        callback arrays (vectorized mode).
+
+        Returns:
+            list: Slots of the due callbacks in execution (bind) order.
+        """
+        iSlots = self.iCallBackSlots
+        with np.errstate(invalid='ignore'):
+            abExec = self.abBound[:iSlots] & ~self.abSleeping[:iSlots] & (
+                self.abDependent[:iSlots]
+                | self.abWakeUp[:iSlots]
+                | (self.afLastExec[:iSlots] + self.afTimeSteps[:iSlots] <= self.fTime)
+            )
+
+        aiExec = np.flatnonzero(abExec)
+        aiExec = aiExec[np.argsort(self.aiBindOrder[aiExec], kind='stable')]
+        return aiExec.tolist()
@@ -0,0 +1,131 @@
+import numpy as np
+
+
+class CompoundMass:
+    """
+    Sparse compound mass matrix of a phase or flow.
+
+    Only a few substances (e.g. food, urine, feces or biomass) are compound
+    masses, so only their rows of the iSubstances x iSubstances matrix are
+    stored, as a dict of compound index to base composition vector. The
+    object supports the indexing of the dense matrix it replaces:
+    oCompoundMass[i] returns the row of compound i, oCompoundMass[i, j] a
+    single entry, and both can be assigned. np.asarray(oCompoundMass)
+    returns the dense matrix for code that still needs it.
+
+    Every assignment increments iVersion, so caches of values derived from
+    the compound masses detect changes made in place, e.g. through
+    oPhase.arCompoundMass[i] = arComposition. Rows are returned as read-only
+    views, so oCompoundMass[i][j] = x fails instead of changing the row
+    without incrementing iVersion; use oCompoundMass[i, j] = x instead.
+    """
+
+    def __init__(self, iSubstances, tarRows=None):
+        """
+        Args:
+            iSubstances (int): Number of substances in the matter table.
+            tarRows (dict): Optional compound index to base composition vector.
+        """
+        self.iSubstances = iSubstances
+        self.tarRows = {}
+        self.iVersion = 0
+
+        for iCompound, arComposition in (tarRows or {}).items():
+            self[iCompound] = arComposition
+
+    @classmethod
+    def from_dense(cls, mrCompoundMass):
+        """
+        Creates the sparse representation of a dense compound mass matrix.
+        """
+        mrCompoundMass = np.asarray(mrCompoundMass, dtype=float)
+        aiCompounds = np.flatnonzero(np.any(mrCompoundMass != 0, axis=1))
+
+        return cls(mrCompoundMass.shape[0], {iCompound: mrCompoundMass[iCompound] for iCompound in aiCompounds})
+
+    @property
+    def shape(self):
+        return (self.iSubstances, self.iSubstances)
+
+    @property
+    def nbytes(self):
+        return sum(arComposition.nbytes for arComposition in self.tarRows.values())
+
+    def __getitem__(self, xIndex):
+        if isinstance(xIndex, tuple):
+            iCompound, xSubstance = xIndex
+            arComposition = self.tarRows.get(int(iCompound))
+            if arComposition is None:
+                return np.zeros(self.iSubstances)[xSubstance]
+
+            return self._read_only(arComposition[xSubstance])
+
+        arComposition = self.tarRows.get(int(xIndex))
+        if arComposition is None:
+            # Read-only, so writing into the row of a substance that is not
+            # a compound yet fails instead of being lost
+            arComposition = np.zeros(self.iSubstances)
+            arComposition.flags.writeable = False
+            return arComposition
+
+        return self._read_only(arComposition)
+
+    @staticmethod
+    def _read_only(xValue):
+        """
+        Returns a read-only view of a stored row (or slice of it), so writes
+        have to go through __setitem__ and increment iVersion.
+        """
+        if not isinstance(xValue, np.ndarray):
+            return xValue
+
+        arView = xValue.view()
+        arView.flags.writeable = False
+        return arView
+
+    def __setitem__(self, xIndex, xValue):
+        self.iVersion += 1
+
+        if isinstance(xIndex, tuple):
+            iCompound, xSubstance = xIndex
+            iCompound = int(iCompound)
+            if iCompound not in self.tarRows:
+                self.tarRows[iCompound] = np.zeros(self.iSubstances)
+
+            self.tarRows[iCompound][xSubstance] = xValue
+        else:
+            iCompound = int(xIndex)
+            arComposition = np.array(np.broadcast_to(np.asarray(xValue, dtype=float), (self.iSubstances,)))
+
+            if np.any(arComposition):
+                self.tarRows[iCompound] = arComposition
+            else:
+                self.tarRows.pop(iCompound, None)
+
+    def __array__(self, dtype=None, copy=None):
+        mrCompoundMass = self.toarray()
+        return mrCompoundMass if dtype is None else mrCompoundMass.astype(dtype)
+
+    def toarray(self):
+        """
+        Returns the dense iSubstances x iSubstances matrix.
+        """
+        mrCompoundMass = np.zeros(self.shape)
+        for iCompound, arComposition in self.tarRows.items():
+            mrCompoundMass[iCompound] = arComposition
+
+        return mrCompoundMass
+
+    def copy(self):
+        return CompoundMass(self.iSubstances, self.tarRows)
+
+    def get_rows(self):
+        """
+        Returns the indices of all compounds with a composition and their
+        base compositions stacked into a (compounds, iSubstances) matrix.
+        """
+        aiCompounds = np.array(sorted(self.tarRows), dtype=int)
+        if not aiCompounds.size:
+            return aiCompounds, np.zeros((0, self.iSubstances))
+
+        return aiCompounds, np.vstack([self.tarRows[iCompound] for iCompound in aiCompounds])
@@ -1,7 +1,10 @@
+import numpy as np
 import MatterBranch
 from store.store import Store
 from procs.f2f.f2f import F2F
 from procs.exme.exme import ExMe
+from stateVersion import StateVersionedAttribute
+from compoundMass import CompoundMass
 
 MatterBranch = MatterBranch()
 MatterStore = Store()
@@ -14,6 +17,13 @@ class Flow:
     Represents a homogenous flow of matter at an interface between components of the simulation.
     """
 
+    # Assigning any of these increments iStateVersion, which the matter table
+    # uses to reuse resolved parameters until the state changes
+    fPressure = StateVersionedAttribute()
+    fTemperature = StateVersionedAttribute()
+    arPartialMass = StateVersionedAttribute()
+    arCompoundMass = StateVersionedAttribute()
+
     def __init__(self, oCreator=None):
         """
         Initialize the flow object.
@@ -21,6 +31,7 @@ class Flow:
         Args:
             oCreator: The object that creates the flow, either a branch or a store.
         """
+        self.iStateVersion = 0
         self.fFlowRate = 0  # [kg/s]
         self.fPressure = 0  # [Pa]
         self.fTemperature = 293  # [K]
@@ -50,8 +61,8 @@ class Flow:
         if oCreator:
             self.oMT = oCreator.oMT
             self.oTimer = oCreator.oTimer
-            self.arPartialMass = [0] * self.oMT.iSubstances
-            self.arCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+            self.arPartialMass = np.zeros(self.oMT.iSubstances)
+            self.arCompoundMass = CompoundMass(self.oMT.iSubstances)
 
             if isinstance(oCreator, MatterBranch):
                 self.oBranch = oCreator
@@ -92,10 +103,12 @@ class Flow:
                 aoPhases = [exme.oPhase for exme in self.oBranch.coExmes]
                 oPhase = max(aoPhases, key=lambda phase: phase.fMass)
 
+            # Copies, so later changes of the phase do not change the flow
+            # without updating its state version
             if oPhase.fMass != 0:
-                self.arPartialMass = oPhase.arPartialMass
+                self.arPartialMass = np.array(oPhase.arPartialMass)
                 self.fMolarMass = oPhase.fMolarMass
-                self.arCompoundMass = oPhase.arCompoundMass
+                self.arCompoundMass = oPhase.arCompoundMass.copy()
 
         return setData, hRemoveIfProc
 
@@ -113,20 +126,34 @@ class Flow:
 
     def getDensity(self):
         """
-        Returns the density of the flow.
+        Returns the density of the flow, recalculated if the flow state
+        changed by more than the tolerances of the property cache.
         """
-        if self.fDensity is None:
-            self.fDensity = self.oMT.calculateDensity(self)
+        self.fDensity = self.oMT.oPropertyCache.get(
+            self, 'fDensity', lambda: self.oMT.calculateDensity(self), self.getPropertyCacheInputs()
+        )
         return self.fDensity
 
     def getDynamicViscosity(self):
         """
-        Returns the dynamic viscosity of the flow.
+        Returns the dynamic viscosity of the flow, recalculated if the flow
+        state changed by more than the tolerances of the property cache.
         """
-        if self.fDynamicViscosity is None:
-            self.fDynamicViscosity = self.oMT.calculateDynamicViscosity(self)
+        self.fDynamicViscosity = self.oMT.oPropertyCache.get(
+            self, 'fDynamicViscosity', lambda: self.oMT.calculateDynamicViscosity(self), self.getPropertyCacheInputs()
+        )
         return self.fDynamicViscosity
 
+    def getPropertyCacheInputs(self):
+        """
+        Returns the state of the flow the cached matter properties depend on.
+        """
+        return {
+            'fPressure': self.fPressure,
+            'fTemperature': self.fTemperature,
+            'arPartialMass': self.arPartialMass,
+        }
+
     @property
     def afPartialPressure(self):
         """
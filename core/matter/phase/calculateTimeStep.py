@@ -5,90 +5,229 @@ def calculate_time_step(self):
     Calculates the next timestep for the phase.
     Determines the new timestep based on mass changes, inflows, outflows, and various constraints.
     """
-    # Get total mass change and details
-    afChange, mfDetails, self.arInFlowCompoundMass = self.get_total_mass_change()
-    afTmpCurrentTotalInOuts = self.afCurrentTotalInOuts
-
-    # Update current inflow/outflow properties
-    self.afCurrentTotalInOuts = afChange
-    self.mfCurrentInflowDetails = mfDetails
-
-    # Include substance manipulators if applicable
-    if self.iSubstanceManipulators != 0:
-        afPartialFlows = self.afCurrentTotalInOuts + self.toManips.substance.afPartialFlows
-    else:
-        afPartialFlows = self.afCurrentTotalInOuts
-
-    # For boundary phases, use the maximum timestep
-    if self.bBoundary:
-        fNewStep = self.fMaxStep
-    else:
-        # Maximum timestep to avoid negative masses
-        abOutFlows = afPartialFlows < 0
-        fMaxFlowStep = min(abs((self.fMassErrorLimit + self.afMass[abOutFlows]) / afPartialFlows[abOutFlows]))
+    calculate_time_steps([self])
+
+
+def calculate_time_steps(aoPhases):
+    """
+    Calculates the next timestep of many phases in one pass. The in- and
+    outflows, masses and limits of all phases are stacked and the new steps
+    are calculated with array operations, see calculate_new_time_steps. The
+    result for a phase does not depend on the other phases, so this is also
+    the path used for a single phase.
+
+    Args:
+        aoPhases (list): Phases to update.
+
+    Returns:
+        numpy.ndarray: The new timestep of every phase.
+    """
+    cafPartialFlows = []
+    for oPhase in aoPhases:
+        # Get total mass change and details
+        afChange, mfDetails, oPhase.arInFlowCompoundMass = oPhase.get_total_mass_change()
 
-        if self.fFixedTimeStep is not None:
-            fNewStep = self.fFixedTimeStep
-        elif self.bFlow:
-            fNewStep = self.fMaxStep
+        # Update current inflow/outflow properties
+        oPhase.afCurrentTotalInOuts = afChange
+        oPhase.mfCurrentInflowDetails = mfDetails
+
+        # Include substance manipulators if applicable
+        if oPhase.iSubstanceManipulators != 0:
+            cafPartialFlows.append(oPhase.afCurrentTotalInOuts + oPhase.toManips.substance.afPartialFlows)
         else:
-            # Calculate partial mass changes per second
-            abChange = afPartialFlows != 0
-            arPartialsChange = abs(afPartialFlows[abChange] / self.round_prec(self.fMass, self.iTimeStepPrecision))
-            rPartialsPerSecond = max(arPartialsChange[~np.isinf(arPartialsChange)]) if arPartialsChange.size > 0 else 0
-
-            # Total mass change per second
-            fChange = sum(afPartialFlows)
-            rTotalPerSecond = abs(self.round_prec(fChange, self.iTimeStepPrecision) / self.fMass) if fChange != 0 else 0
-
-            # Partial mass changes compared to individual masses
-            if self.bHasSubstanceSpecificMaxChangeValues:
-                afCurrentMass = np.copy(self.afMass)
-                afCurrentMass[self.afMass < 10 ** (-self.iTimeStepPrecision)] = 10 ** (-self.iTimeStepPrecision)
-                arPartialChangeToPartials = abs(afPartialFlows / self.round_prec(afCurrentMass, self.iTimeStepPrecision))
-                arPartialChangeToPartials[self.afMass == 0] = 0
-                afNewStepPartialChangeToPartials = self.arMaxChange / arPartialChangeToPartials
-                afNewStepPartialChangeToPartials[self.arMaxChange == 0] = float('inf')
-                fNewStepPartialChangeToPartials = min(afNewStepPartialChangeToPartials)
-            else:
-                fNewStepPartialChangeToPartials = float('inf')
-
-            # Calculate the new timestep
-            fNewStepTotal = self.rMaxChange / rTotalPerSecond
-            fNewStepPartials = self.rMaxChange / rPartialsPerSecond
-            fNewStep = min(fNewStepTotal, fNewStepPartials, fNewStepPartialChangeToPartials)
-
-            # Handle special cases for zero mass phases
-            if self.fMass == 0:
-                if fChange < 0:
-                    fNewStep = abs(self.fMassErrorLimit / fChange)
-                else:
-                    fNewStep = abs(self.fMaximumInitialMass / fChange)
+            cafPartialFlows.append(oPhase.afCurrentTotalInOuts)
 
-    # Ensure timestep is within allowable bounds
-    if fNewStep > self.fMaxStep:
-        fNewStep = self.fMaxStep
-        self.log_debug(2, "max-time-step", f"Setting maximum timestep: {fNewStep:.16f}s")
+    # The limits are read where the per phase calculation uses them, so a
+    # phase missing one of them fails the same way in both paths. Unused
+    # entries are NaN, their results are replaced by the fixed, flow or
+    # boundary time steps.
+    iPhases = len(aoPhases)
+    afMassErrorLimit = np.full(iPhases, np.nan)
+    afMaximumInitialMass = np.full(iPhases, np.nan)
+    arMaxChange = np.full(iPhases, np.nan)
+    aiPrecision = np.zeros(iPhases, dtype=int)
+    mrMaxChange = np.zeros((iPhases, len(cafPartialFlows[0])))
+    abSubstanceSpecific = np.zeros(iPhases, dtype=bool)
+    for iPhase, oPhase in enumerate(aoPhases):
+        if oPhase.bBoundary:
+            continue
+
+        afMassErrorLimit[iPhase] = oPhase.fMassErrorLimit
+
+        if oPhase.fFixedTimeStep is not None or oPhase.bFlow:
+            continue
+
+        aiPrecision[iPhase] = oPhase.iTimeStepPrecision
+        arMaxChange[iPhase] = oPhase.rMaxChange
+
+        if oPhase.bHasSubstanceSpecificMaxChangeValues:
+            abSubstanceSpecific[iPhase] = True
+            mrMaxChange[iPhase] = oPhase.arMaxChange
 
-    elif fNewStep < self.fMinStep:
-        fNewStep = self.fMinStep
-        self.log_debug(2, "min-time-step", f"Setting minimum timestep: {fNewStep:.16f}s")
+        if oPhase.fMass == 0:
+            afMaximumInitialMass[iPhase] = oPhase.fMaximumInitialMass
 
-    # Debugging outputs
-    self.log_debug(1, "new-timestep", f"New timestep: {fNewStep:.16f}s")
-    self.log_debug(1, "mass-changes", f"Mass: {self.fMass:.16f} kg, Change Rate: {sum(self.afCurrentTotalInOuts):.16f} kg/s")
+    afMaxStep = np.array([oPhase.fMaxStep for oPhase in aoPhases], dtype=float)
+    afMinStep = np.array([oPhase.fMinStep for oPhase in aoPhases], dtype=float)
+
+    afNewStep, afMaxFlowStep = calculate_new_time_steps(
+        np.array(cafPartialFlows, dtype=float),
+        np.array([oPhase.afMass for oPhase in aoPhases], dtype=float),
+        np.array([oPhase.fMass for oPhase in aoPhases], dtype=float),
+        afMassErrorLimit,
+        afMaximumInitialMass,
+        arMaxChange,
+        mrMaxChange,
+        abSubstanceSpecific,
+        aiPrecision,
+        np.array([np.nan if oPhase.fFixedTimeStep is None else oPhase.fFixedTimeStep for oPhase in aoPhases]),
+        np.array([oPhase.bFlow for oPhase in aoPhases], dtype=bool),
+        np.array([oPhase.bBoundary for oPhase in aoPhases], dtype=bool),
+        afMaxStep,
+    )
+
+    # Ensure timestep is within allowable bounds
+    abMaximumStep = afNewStep > afMaxStep
+    afNewStep = np.where(abMaximumStep, afMaxStep, afNewStep)
+    abMinimumStep = ~abMaximumStep & (afNewStep < afMinStep)
+    afNewStep = np.where(abMinimumStep, afMinStep, afNewStep)
+    afBoundedStep = afNewStep
 
     # Compare with the maximum flow timestep
-    if fNewStep > fMaxFlowStep:
-        fNewStep = fMaxFlowStep
-        if fNewStep < self.fMinStep:
-            fNewStep = self.fMinStep
-
-    # Update the phase's timestep
-    if self.fLastUpdate == self.oTimer.fTime or self.bFlow:
-        self.set_time_step(fNewStep, reset_last_exec=True)
-    else:
-        self.set_time_step(fNewStep)
-
-    # Cache the timestep for logging or further processing
-    self.fTimeStep = fNewStep
+    abFlowStep = afNewStep > afMaxFlowStep
+    afNewStep = np.where(abFlowStep, afMaxFlowStep, afNewStep)
+    afNewStep = np.where(abFlowStep & (afNewStep < afMinStep), afMinStep, afNewStep)
+
+    for iPhase, oPhase in enumerate(aoPhases):
+        if abMaximumStep[iPhase]:
+            oPhase.log_debug(2, "max-time-step", f"Setting maximum timestep: {afBoundedStep[iPhase]:.16f}s")
+        elif abMinimumStep[iPhase]:
+            oPhase.log_debug(2, "min-time-step", f"Setting minimum timestep: {afBoundedStep[iPhase]:.16f}s")
+
+        # Debugging outputs
+        oPhase.log_debug(1, "new-timestep", f"New timestep: {afBoundedStep[iPhase]:.16f}s")
+        oPhase.log_debug(1, "mass-changes", f"Mass: {oPhase.fMass:.16f} kg, Change Rate: {sum(oPhase.afCurrentTotalInOuts):.16f} kg/s")
+
+        fNewStep = float(afNewStep[iPhase])
+
+        # Update the phase's timestep
+        if oPhase.fLastUpdate == oPhase.oTimer.fTime or oPhase.bFlow:
+            oPhase.set_time_step(fNewStep, reset_last_exec=True)
+        else:
+            oPhase.set_time_step(fNewStep)
+
+        # Cache the timestep for logging or further processing
+        oPhase.fTimeStep = fNewStep
+
+    return afNewStep
+
+
+def calculate_new_time_steps(mfPartialFlows, mfMass, afTotalMass, afMassErrorLimit, afMaximumInitialMass,
+                             arMaxChange, mrMaxChange, abSubstanceSpecific, aiPrecision, afFixedTimeStep,
+                             abFlow, abBoundary, afMaxStep):
+    """
+    Time step kernel for stacked phases, one row per phase. Every row is
+    calculated with the same operations as a single phase, the reductions
+    (minimum, maximum and the sequential sum of the flows) are exact per row,
+    so the results do not depend on the other phases.
+
+    Args:
+        mfPartialFlows (array): Partial in- and outflows incl. manipulators in kg/s, (phases, substances).
+        mfMass (array): Partial masses in kg, (phases, substances).
+        afTotalMass (array): Total masses in kg.
+        afMassErrorLimit (array): Allowed negative masses in kg.
+        afMaximumInitialMass (array): Mass limit for the first step of empty phases in kg.
+        arMaxChange (array): Maximum relative change of the total and partial masses per step.
+        mrMaxChange (array): Substance specific maximum relative changes, (phases, substances).
+        abSubstanceSpecific (array): Phases using mrMaxChange.
+        aiPrecision (array): Time step precision of every phase.
+        afFixedTimeStep (array): Fixed time steps, NaN for phases without one.
+        abFlow (array): Flow phases.
+        abBoundary (array): Boundary phases.
+        afMaxStep (array): Maximum time steps in s.
+
+    Returns:
+        afNewStep (array): New time steps before the minimum and maximum limits.
+        afMaxFlowStep (array): Maximum time steps to avoid negative masses, inf for boundary phases.
+    """
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # Maximum timestep to avoid negative masses
+        abOutFlows = mfPartialFlows < 0
+        mfFlowStep = np.abs((afMassErrorLimit[:, np.newaxis] + mfMass) / mfPartialFlows)
+        afMaxFlowStep = np.min(np.where(abOutFlows, mfFlowStep, np.inf), axis=1)
+        afMaxFlowStep[abBoundary] = np.inf
+
+        # Calculate partial mass changes per second
+        afRoundedMass = round_prec(afTotalMass, aiPrecision)
+        mrPartialsChange = np.abs(mfPartialFlows / afRoundedMass[:, np.newaxis])
+        abPartialsChange = (mfPartialFlows != 0) & ~np.isinf(mrPartialsChange)
+        arPartialsPerSecond = np.max(np.where(abPartialsChange, mrPartialsChange, -np.inf), axis=1)
+        arPartialsPerSecond[~np.any(abPartialsChange, axis=1)] = 0
+
+        # Total mass change per second, summed up in the order of the
+        # substances like the built-in sum
+        afChange = np.cumsum(mfPartialFlows, axis=1)[:, -1]
+        arTotalPerSecond = np.where(afChange != 0, np.abs(round_prec(afChange, aiPrecision) / afTotalMass), 0)
+
+        # Partial mass changes compared to individual masses
+        afNewStepPartialChangeToPartials = np.full(mfMass.shape[0], np.inf)
+        if np.any(abSubstanceSpecific):
+            afMinimumMass = np.power(10.0, -aiPrecision[abSubstanceSpecific])[:, np.newaxis]
+            mfSpecificMass = mfMass[abSubstanceSpecific]
+            mfCurrentMass = np.where(mfSpecificMass < afMinimumMass, afMinimumMass, mfSpecificMass)
+            mrPartialChangeToPartials = np.abs(
+                mfPartialFlows[abSubstanceSpecific]
+                / round_prec(mfCurrentMass, aiPrecision[abSubstanceSpecific][:, np.newaxis])
+            )
+            mrPartialChangeToPartials[mfSpecificMass == 0] = 0
+
+            mrSpecificMaxChange = mrMaxChange[abSubstanceSpecific]
+            mfNewStepPartialChangeToPartials = mrSpecificMaxChange / mrPartialChangeToPartials
+            mfNewStepPartialChangeToPartials[mrSpecificMaxChange == 0] = np.inf
+            afNewStepPartialChangeToPartials[abSubstanceSpecific] = np.min(mfNewStepPartialChangeToPartials, axis=1)
+
+        # Calculate the new timestep
+        afNewStepTotal = arMaxChange / arTotalPerSecond
+        afNewStepPartials = arMaxChange / arPartialsPerSecond
+        afNewStep = np.minimum(np.minimum(afNewStepTotal, afNewStepPartials), afNewStepPartialChangeToPartials)
+
+        # Handle special cases for zero mass phases
+        abEmpty = afTotalMass == 0
+        afNewStep = np.where(abEmpty & (afChange < 0), np.abs(afMassErrorLimit / afChange), afNewStep)
+        afNewStep = np.where(abEmpty & (afChange >= 0), np.abs(afMaximumInitialMass / afChange), afNewStep)
+
+    # Fixed time steps, flow and boundary phases
+    abFixed = ~np.isnan(afFixedTimeStep)
+    afNewStep = np.where(abFixed, afFixedTimeStep, afNewStep)
+    afNewStep = np.where(~abFixed & abFlow, afMaxStep, afNewStep)
+    afNewStep = np.where(abBoundary, afMaxStep, afNewStep)
+
+    return afNewStep, afMaxFlowStep
+
+
+def calculate_time_step_batch(chCallBacks):
+    """
+    Post-tick batch handler of the timestep level, see
+    Timer.set_post_tick_batch_handler. The time steps of all queued phases
+    are calculated in one pass, other callbacks are executed individually.
+
+    Args:
+        chCallBacks (list): Queued post-tick callbacks.
+    """
+    aoPhases = []
+    for hCallBack in chCallBacks:
+        if getattr(hCallBack, '__func__', None) is calculate_time_step:
+            aoPhases.append(hCallBack.__self__)
+        else:
+            hCallBack()
+
+    if aoPhases:
+        calculate_time_steps(aoPhases)
+
+
+def round_prec(xValue, xPrecision):
+    """
+    Rounds values to a number of decimal places, which can differ per value.
+    """
+    xScale = np.power(10.0, xPrecision)
+    return np.round(xValue * xScale) / xScale
@@ -1,8 +1,15 @@
 from abc import ABC, abstractmethod
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "store")))
 from store import Store
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from stateVersion import StateVersionedAttribute
+from compoundMass import CompoundMass
+from phaseStateStore import PhaseStateAttribute
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+from calculateTimeStep import calculate_time_step, calculate_time_step_batch
 
 Store = Store()
 
@@ -15,6 +22,24 @@ class Phase(ABC):
 
     sObjectType = 'phase'  # Object type identifier for all derived classes
 
+    # Assigning any of these increments iStateVersion, which the matter table
+    # uses to reuse resolved parameters until the state changes. The mass,
+    # temperature and mass to pressure factor are kept in the phase state
+    # store of the timer if one is attached
+    fMass = PhaseStateAttribute()
+    fTemperature = PhaseStateAttribute()
+    fMassToPressure = PhaseStateAttribute()
+    arPartialMass = StateVersionedAttribute()
+    arCompoundMass = StateVersionedAttribute()
+
+    # Rows of the phase state store of the timer if one is attached
+    afMass = PhaseStateAttribute(bVersioned=False)
+    afMassGenerated = PhaseStateAttribute(bVersioned=False)
+    afCurrentTotalInOuts = PhaseStateAttribute(bVersioned=False)
+
+    # Time step calculation, batched for all phases queued in a tick
+    calculate_time_step = calculate_time_step
+
     @abstractmethod
     def __init__(self, oStore, sName, tfMass=None, fTemperature=None):
         """
@@ -24,6 +49,8 @@ class Phase(ABC):
         if not isinstance(oStore, Store):
             raise ValueError("oStore must be an instance of Store.")
 
+        self.iStateVersion = 0
+
         self.sName = sName
         self.oStore = oStore
         self.oStore.add_phase(self)
@@ -31,11 +58,15 @@ class Phase(ABC):
         self.oMT = oStore.oMT
         self.oTimer = oStore.oTimer
 
-        self.afMass = [0] * self.oMT.iSubstances
-        self.arPartialMass = [0] * self.oMT.iSubstances
-        self.arCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
-        self.arInFlowCompoundMass = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
-        self.afEmptyCompoundMassArray = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+        # Mass vectors are contiguous float64 arrays, the mass update
+        # modifies them in place. Compound masses only store the rows of
+        # the compounds present in the phase
+        iSubstances = self.oMT.iSubstances
+        self.afMass = np.zeros(iSubstances)
+        self.arPartialMass = np.zeros(iSubstances)
+        self.arCompoundMass = CompoundMass(iSubstances)
+        self.arInFlowCompoundMass = CompoundMass(iSubstances)
+        self.afEmptyCompoundMassArray = CompoundMass(iSubstances)
         self.fMinStep = self.oTimer.fMinimumTimeStep
 
         if tfMass and isinstance(tfMass, dict):
@@ -46,22 +77,34 @@ class Phase(ABC):
             self.set_temperature(fTemperature)
         else:
             self.fMass = 0
-            self.arPartialMass = self.afMass
+            self.arPartialMass = np.zeros(iSubstances)
 
             self.set_temperature(self.oMT.Standard.Temperature)
 
         self.fMolarMass = self.oMT.calculate_molar_mass(self.afMass)
-        self.fMass = sum(self.afMass)
-        self.afMassGenerated = [0] * self.oMT.iSubstances
+        self.fMass = float(np.sum(self.afMass))
+        self.afMassGenerated = np.zeros(iSubstances)
         self.fMassToPressure = 0  # Will be set later
 
         self.fMassLastUpdate = 0
-        self.afMassLastUpdate = [0] * self.oMT.iSubstances
+        self.afMassLastUpdate = np.zeros(iSubstances)
+
+        # Move the mass state into the global phase state store, if used
+        oStateStore = getattr(self.oTimer, 'oPhaseStateStore', None)
+        if oStateStore is not None:
+            oStateStore.add_phase(self)
 
         self.hBindPostTickMassUpdate = self.oTimer.register_post_tick(self.massupdate, 'matter', 'phase_massupdate')
         self.hBindPostTickUpdate = self.oTimer.register_post_tick(self.update, 'matter', 'phase_update')
         self.hBindPostTickTimeStep = self.oTimer.register_post_tick(self.calculate_time_step, 'post_physics', 'timestep')
 
+        # The batch handlers are configuration of the timer, shared by all
+        # phases, so only the first phase sets them
+        if not self.oTimer.bPhaseBatchHandlersSet:
+            self.oTimer.set_post_tick_batch_handler('matter', 'phase_massupdate', Phase.massupdate_batch)
+            self.oTimer.set_post_tick_batch_handler('post_physics', 'timestep', calculate_time_step_batch)
+            self.oTimer.bPhaseBatchHandlersSet = True
+
     def _initialize_mass(self, tfMass):
         """
         Initializes the mass properties based on the input mass dictionary.
@@ -75,8 +118,8 @@ class Phase(ABC):
             if self.oMT.abCompound[idx]:
                 self._handle_compound_mass(substance, mass)
 
-        self.fMass = sum(self.afMass)
-        self.arPartialMass = [m / self.fMass if self.fMass > 0 else 0 for m in self.afMass]
+        self.fMass = float(np.sum(self.afMass))
+        self.arPartialMass = self._calculate_partial_mass()
 
     def _handle_compound_mass(self, substance, mass):
         """
@@ -85,9 +128,20 @@ class Phase(ABC):
         idx = self.oMT.tiN2I[substance]
         compound = self.oMT.ttxMatter[substance]
 
-        for component, ratio in compound.trBaseComposition.items():
-            comp_idx = self.oMT.tiN2I[component]
-            self.arCompoundMass[idx][comp_idx] = ratio
+        arBaseComposition = np.zeros(self.oMT.iSubstances)
+        for component, ratio in compound["trBaseComposition"].items():
+            arBaseComposition[self.oMT.tiN2I[component]] = ratio
+
+        self.arCompoundMass[idx] = arBaseComposition
+
+    def _calculate_partial_mass(self):
+        """
+        Returns the mass ratios of all substances, zero for an empty phase.
+        """
+        if self.fMass > 0:
+            return self.afMass / self.fMass
+
+        return np.zeros(self.afMass.shape)
 
     def set_temperature(self, fTemperature):
         """
@@ -111,22 +165,109 @@ class Phase(ABC):
         self.fLastMassUpdate = fTime
         self.fMassUpdateTimeStep = fLastStep
 
-        afTotalInOuts = self.afCurrentTotalInOuts
-        afTotalInOuts = [flow * fLastStep for flow in afTotalInOuts]
+        self.afMass += np.asarray(self.afCurrentTotalInOuts, dtype=float) * fLastStep
 
-        for i, mass in enumerate(self.afMass):
-            self.afMass[i] += afTotalInOuts[i]
-            if self.afMass[i] < 0:
-                self.afMassGenerated[i] -= self.afMass[i]
-                self.afMass[i] = 0
+        # Negative masses are set to zero, the generated mass is recorded
+        self.afMassGenerated -= np.minimum(self.afMass, 0)
+        np.maximum(self.afMass, 0, out=self.afMass)
 
-        self.fMass = sum(self.afMass)
-        self.arPartialMass = [m / self.fMass if self.fMass > 0 else 0 for m in self.afMass]
+        self.fMass = float(np.sum(self.afMass))
+        self.arPartialMass = self._calculate_partial_mass()
 
         self.set_branches_outdated()
         self.set_p2ps_and_manips_outdated()
         self.set_outdated_ts()
 
+    @staticmethod
+    def massupdate_batch(chCallBacks):
+        """
+        Executes the queued mass updates of the phase_massupdate post-tick
+        level at once. The integration, the clamping of negative masses and
+        the normalization of the partial masses are done for all phases with
+        array operations, directly on the phase state store if the phases
+        use one. The outdated notifications of the phases are sent
+        afterwards. Callbacks of phases overriding massupdate and all other
+        callbacks are executed individually, after the phases queued before
+        them are updated.
+
+        Args:
+            chCallBacks (list): Queued post-tick callbacks.
+        """
+        # Phases queued between two other callbacks are updated together,
+        # so every callback still runs at its position in the queue
+        aoPhases = []
+        for hCallBack in chCallBacks:
+            if getattr(hCallBack, '__func__', None) is Phase.massupdate:
+                aoPhases.append(hCallBack.__self__)
+            else:
+                Phase._massupdate_phases(aoPhases)
+                aoPhases = []
+                hCallBack()
+
+        Phase._massupdate_phases(aoPhases)
+
+    @staticmethod
+    def _massupdate_phases(aoPhases):
+        """
+        Executes the mass updates of the given phases at once, see
+        massupdate_batch.
+
+        Args:
+            aoPhases (list): Phases to update, in queue order.
+        """
+        if not aoPhases:
+            return
+
+        fTime = aoPhases[0].oTimer.fTime
+        afLastStep = fTime - np.array([oPhase.fLastMassUpdate for oPhase in aoPhases])
+
+        # Phases that were already updated in this tick only notify
+        abUpdate = afLastStep != 0
+        aoUpdated = [oPhase for oPhase, bUpdate in zip(aoPhases, abUpdate) if bUpdate]
+        afLastStep = afLastStep[abUpdate]
+
+        if aoUpdated:
+            oStateStore = aoUpdated[0].__dict__.get('oStateStore')
+            bStateStore = oStateStore is not None and all(
+                oPhase.__dict__.get('oStateStore') is oStateStore for oPhase in aoUpdated
+            )
+
+            if bStateStore:
+                aiRows = np.array([oPhase.__dict__['iStateIndex'] for oPhase in aoUpdated])
+                oStateStore.integrate_mass(afLastStep, aiRows)
+                mfMass = oStateStore.tmfVectors['afMass'][aiRows]
+                afTotalMass = oStateStore.tafScalars['fMass'][aiRows]
+            else:
+                mfMass = np.vstack([oPhase.afMass for oPhase in aoUpdated])
+                mfMass += np.vstack([
+                    np.asarray(oPhase.afCurrentTotalInOuts, dtype=float) for oPhase in aoUpdated
+                ]) * afLastStep[:, np.newaxis]
+
+                mfGenerated = -np.minimum(mfMass, 0)
+                np.maximum(mfMass, 0, out=mfMass)
+                afTotalMass = np.sum(mfMass, axis=1)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mrPartialMass = np.where(afTotalMass[:, np.newaxis] > 0, mfMass / afTotalMass[:, np.newaxis], 0)
+
+            for iPhase, oPhase in enumerate(aoUpdated):
+                oPhase.fLastMassUpdate = fTime
+                oPhase.fMassUpdateTimeStep = float(afLastStep[iPhase])
+
+                if not bStateStore:
+                    oPhase.afMass[:] = mfMass[iPhase]
+                    oPhase.afMassGenerated += mfGenerated[iPhase]
+
+                oPhase.fMass = float(afTotalMass[iPhase])
+                oPhase.arPartialMass = mrPartialMass[iPhase]
+
+        for oPhase, bUpdate in zip(aoPhases, abUpdate):
+            if bUpdate:
+                oPhase.set_branches_outdated()
+
+            oPhase.set_p2ps_and_manips_outdated()
+            oPhase.set_outdated_ts()
+
     def set_branches_outdated(self):
         """
         Sets branches connected to this phase as outdated.
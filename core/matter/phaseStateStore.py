@@ -0,0 +1,241 @@
+import numpy as np
+from stateVersion import StateVersionedAttribute
+
+
+class PhaseStateAttribute(StateVersionedAttribute):
+    """
+    Attribute of a phase that is part of its mass state. If the phase is
+    registered in a PhaseStateStore, the value lives in the arrays of the
+    store, otherwise in the phase itself. Vectors are returned as row views
+    of the store, assignments are copied into the row.
+    """
+
+    def __init__(self, bVersioned=True):
+        """
+        Args:
+            bVersioned (bool): Whether assignments increment the
+                iStateVersion of the phase, see StateVersionedAttribute.
+        """
+        self.bVersioned = bVersioned
+
+    def __get__(self, oObject, oOwner=None):
+        if oObject is None:
+            return self
+
+        oStateStore = oObject.__dict__.get('oStateStore')
+        if oStateStore is None:
+            return super().__get__(oObject, oOwner)
+
+        return oStateStore.get_value(self.sName, oObject.__dict__['iStateIndex'])
+
+    def __set__(self, oObject, xValue):
+        tDict = oObject.__dict__
+        oStateStore = tDict.get('oStateStore')
+
+        if oStateStore is not None:
+            oStateStore.set_value(self.sName, tDict['iStateIndex'], xValue)
+        else:
+            tDict[self.sName] = xValue
+
+        if self.bVersioned:
+            tDict['iStateVersion'] = tDict.get('iStateVersion', 0) + 1
+
+
+class PhaseStateStore:
+    """
+    Optional global structure-of-arrays store of the mass state of all
+    phases. The mass vectors of all phases are rows of one
+    (phases x substances) matrix and the scalar states are entries of one
+    array per property, so model wide operations like the mass integration,
+    the total mass of the observers or checkpoints are single array
+    operations.
+
+    The store is attached to the timer with attach. Phases created
+    afterwards register themselves, existing phases can be added with
+    add_phase. Arrays grow automatically, so row views obtained from a phase
+    should not be kept across the creation of new phases.
+    """
+
+    # Vectors of every phase, one row per phase
+    csVectors = ('afMass', 'afMassGenerated', 'afCurrentTotalInOuts')
+
+    # Scalars of every phase, one entry per phase
+    csScalars = ('fMass', 'fMassToPressure', 'fTemperature')
+
+    def __init__(self, iSubstances, iInitialCapacity=64):
+        """
+        Args:
+            iSubstances (int): Number of substances in the matter table.
+            iInitialCapacity (int): Preallocated number of phases, the arrays
+                grow when exceeded.
+        """
+        self.iSubstances = iSubstances
+        self.iPhases = 0
+        self.aoPhases = []
+
+        self.tmfVectors = {sName: np.zeros((iInitialCapacity, iSubstances)) for sName in self.csVectors}
+        self.tafScalars = {sName: np.zeros(iInitialCapacity) for sName in self.csScalars}
+        self.abBoundary = np.zeros(iInitialCapacity, dtype=bool)
+        self.afInitialMass = np.zeros(iInitialCapacity)
+
+    @classmethod
+    def attach(cls, oTimer, iSubstances, iInitialCapacity=64):
+        """
+        Creates a store and attaches it to the timer, so all phases created
+        afterwards store their mass state in it.
+
+        Returns:
+            PhaseStateStore: The new store.
+        """
+        oStateStore = cls(iSubstances, iInitialCapacity)
+        oTimer.oPhaseStateStore = oStateStore
+        return oStateStore
+
+    @property
+    def mfMass(self):
+        return self.tmfVectors['afMass'][:self.iPhases]
+
+    @property
+    def mfMassGenerated(self):
+        return self.tmfVectors['afMassGenerated'][:self.iPhases]
+
+    @property
+    def mfCurrentTotalInOuts(self):
+        return self.tmfVectors['afCurrentTotalInOuts'][:self.iPhases]
+
+    @property
+    def afMass(self):
+        return self.tafScalars['fMass'][:self.iPhases]
+
+    @property
+    def afMassToPressure(self):
+        return self.tafScalars['fMassToPressure'][:self.iPhases]
+
+    @property
+    def afTemperature(self):
+        return self.tafScalars['fTemperature'][:self.iPhases]
+
+    def add_phase(self, oPhase):
+        """
+        Moves the mass state of a phase into the store.
+
+        Returns:
+            int: Row of the phase in the store.
+        """
+        if oPhase.__dict__.get('oStateStore') is not None:
+            raise ValueError(f"Phase {oPhase.sName} is already registered in a phase state store.")
+
+        if self.iPhases == self.abBoundary.size:
+            self._grow()
+
+        iIndex = self.iPhases
+        self.iPhases += 1
+        self.aoPhases.append(oPhase)
+
+        # Values set before the registration are moved into the store
+        for sName in self.csVectors + self.csScalars:
+            xValue = oPhase.__dict__.pop(sName, None)
+            if xValue is not None:
+                self.set_value(sName, iIndex, xValue)
+
+        self.abBoundary[iIndex] = getattr(oPhase, 'bBoundary', False)
+        self.afInitialMass[iIndex] = self.tafScalars['fMass'][iIndex]
+
+        oPhase.__dict__['oStateStore'] = self
+        oPhase.__dict__['iStateIndex'] = iIndex
+
+        return iIndex
+
+    def get_value(self, sName, iIndex):
+        if sName in self.tafScalars:
+            return float(self.tafScalars[sName][iIndex])
+
+        return self.tmfVectors[sName][iIndex]
+
+    def set_value(self, sName, iIndex, xValue):
+        if sName in self.tafScalars:
+            self.tafScalars[sName][iIndex] = xValue
+        else:
+            self.tmfVectors[sName][iIndex] = xValue
+
+    def integrate_mass(self, afTimeStep, aiPhases=None):
+        """
+        Integrates the current total in- and outflows of many phases at once,
+        the batched equivalent of the mass update of the phases. Negative
+        masses are set to zero and recorded as generated mass. The partial
+        masses and outdated flags of the phases are not updated.
+
+        Args:
+            afTimeStep (float or array): Time since the last mass update of
+                each phase in s.
+            aiPhases (array): Rows of the phases to update, all if None.
+        """
+        if aiPhases is None:
+            aiPhases = slice(0, self.iPhases)
+
+        mfMass = self.tmfVectors['afMass'][aiPhases]
+        mfMass += self.tmfVectors['afCurrentTotalInOuts'][aiPhases] * np.reshape(afTimeStep, (-1, 1))
+
+        self.tmfVectors['afMassGenerated'][aiPhases] -= np.minimum(mfMass, 0)
+        np.maximum(mfMass, 0, out=mfMass)
+
+        self.tmfVectors['afMass'][aiPhases] = mfMass
+        self.tafScalars['fMass'][aiPhases] = np.sum(mfMass, axis=1)
+
+    def get_total_mass(self, bIncludeBoundaries=False):
+        """
+        Returns the total mass of all phases in kg.
+        """
+        if bIncludeBoundaries:
+            return float(np.sum(self.afMass))
+
+        return float(np.sum(self.afMass[~self.abBoundary[:self.iPhases]]))
+
+    def get_total_generated_mass(self):
+        """
+        Returns the total mass generated by all phases to avoid negative
+        masses in kg.
+        """
+        return float(np.sum(self.mfMassGenerated))
+
+    def get_checkpoint(self):
+        """
+        Returns a copy of the mass state of all phases.
+        """
+        return {
+            'iPhases': self.iPhases,
+            'tmfVectors': {sName: mfValues[:self.iPhases].copy() for sName, mfValues in self.tmfVectors.items()},
+            'tafScalars': {sName: afValues[:self.iPhases].copy() for sName, afValues in self.tafScalars.items()},
+        }
+
+    def restore_checkpoint(self, tCheckpoint):
+        """
+        Restores the mass state of all phases from get_checkpoint.
+        """
+        if tCheckpoint['iPhases'] != self.iPhases:
+            raise ValueError("The checkpoint was created for a different number of phases.")
+
+        for sName, mfValues in tCheckpoint['tmfVectors'].items():
+            self.tmfVectors[sName][:self.iPhases] = mfValues
+
+        for sName, afValues in tCheckpoint['tafScalars'].items():
+            self.tafScalars[sName][:self.iPhases] = afValues
+
+        for oPhase in self.aoPhases:
+            oPhase.__dict__['iStateVersion'] = oPhase.__dict__.get('iStateVersion', 0) + 1
+
+    def _grow(self):
+        iCapacity = max(2 * self.abBoundary.size, 1)
+
+        for sName, mfValues in self.tmfVectors.items():
+            mfGrown = np.zeros((iCapacity, self.iSubstances))
+            mfGrown[:mfValues.shape[0]] = mfValues
+            self.tmfVectors[sName] = mfGrown
+
+        for sName, afValues in self.tafScalars.items():
+            afGrown = np.zeros(iCapacity)
+            afGrown[:afValues.size] = afValues
+            self.tafScalars[sName] = afGrown
+
+        self.abBoundary = np.concatenate((self.abBoundary, np.zeros(iCapacity - self.abBoundary.size, dtype=bool)))
+        self.afInitialMass = np.concatenate((self.afInitialMass, np.zeros(iCapacity - self.afInitialMass.size)))
@@ -1,3 +1,9 @@
+import sys
+import os
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from compoundMass import CompoundMass
+
 class Flow:
     """
     Flow phase class
@@ -29,7 +35,7 @@ class Flow:
         self.fInitialMass = self.fMass
         self.fDensity = self.fMass / self.fVolume if self.fVolume else 0
 
-        self.mfEmptyCompoundMassFlow = [[0] * self.oMT.iSubstances for _ in range(self.oMT.iSubstances)]
+        self.mfEmptyCompoundMassFlow = CompoundMass(self.oMT.iSubstances)
         self.fVirtualPressure = None
         self.oMultiBranchSolver = None
         self.fPressureLastHeatCapacityUpdate = None
@@ -55,8 +61,9 @@ class Flow:
         if afPartialInFlows is None:
             afPartialInFlows = self.calculate_inflows()
 
-        fTotalInFlow = sum(afPartialInFlows)
-        self.arPartialMass = [x / fTotalInFlow for x in afPartialInFlows] if fTotalInFlow else [0] * len(afPartialInFlows)
+        afPartialInFlows = np.asarray(afPartialInFlows, dtype=float)
+        fTotalInFlow = np.sum(afPartialInFlows)
+        self.arPartialMass = afPartialInFlows / fTotalInFlow if fTotalInFlow else np.zeros(afPartialInFlows.shape)
 
     def calculate_inflows(self):
         """
@@ -66,7 +73,7 @@ class Flow:
             list: Partial inflows calculated from connected EXMEs and manipulators.
         """
         # Implement calculations as needed based on EXMEs and flow logic
-        return [0] * self.oMT.iSubstances
+        return np.zeros(self.oMT.iSubstances)
 
     def set_handler(self, oMultiBranchSolver):
         """
@@ -81,11 +88,11 @@ class Flow:
         """
         Updates the flow phase, including heat capacity and density.
         """
-        if self.arPartialMass and (
+        if np.any(self.arPartialMass) and (
             not self.fPressureLastHeatCapacityUpdate
             or abs(self.fPressureLastHeatCapacityUpdate - self.fPressure) > 100
             or abs(self.fTemperatureLastHeatCapacityUpdate - self.fTemperature) > 1
-            or max(abs(x - y) for x, y in zip(self.arPartialMassLastHeatCapacityUpdate, self.arPartialMass)) > 0.01
+            or np.max(np.abs(self.arPartialMassLastHeatCapacityUpdate - self.arPartialMass)) > 0.01
         ):
             self.oCapacity.set_specific_heat_capacity(self.oMT.calculate_specific_heat_capacity(self))
             self.fDensity = self.oMT.calculate_density(self)
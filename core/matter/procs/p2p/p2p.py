@@ -1,5 +1,6 @@
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "event")))
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "matter")))
 import Flow
@@ -35,9 +36,6 @@ class P2P(MatterFlow, EventSource):
         self.fLastUpdate = -1
         self.oThermalBranch = None
         self.fSpecificHeatCapacityP2P = None
-        self.fPressureLastHeatCapacityUpdate = None
-        self.fTemperatureLastHeatCapacityUpdate = None
-        self.arPartialMassLastHeatCapacityUpdate = None
         self.hBindPostTickUpdate = None
         self.coExmes = []
         self.bTriggersetMatterPropertiesCallbackBound = False
@@ -146,10 +144,10 @@ class P2P(MatterFlow, EventSource):
 
         oExme = self.getInEXME() if fFlowRate >= 0 else self.coExmes[1]
 
-        self.arPartialMass = arPartialMass or oExme.oPhase.arPartialMass
+        self.arPartialMass = oExme.oPhase.arPartialMass if arPartialMass is None else arPartialMass
         self.fTemperature = fTemperature or oExme.getExMeProperties()[1]
         self.fPressure = fPressure or oExme.getExMeProperties()[0]
-        self.arCompoundMass = arCompoundMass or oExme.oPhase.arCompoundMass
+        self.arCompoundMass = oExme.oPhase.arCompoundMass if arCompoundMass is None else arCompoundMass
 
         self.coExmes[0].oPhase.registerMassupdate()
         self.coExmes[1].oPhase.registerMassupdate()
@@ -158,8 +156,22 @@ class P2P(MatterFlow, EventSource):
             self.fSpecificHeatCapacityP2P = 0
             return
 
-        afMass = [ratio * self.fFlowRate for ratio in self.arPartialMass]
+        afMass = np.asarray(self.arPartialMass, dtype=float) * self.fFlowRate
         self.fMolarMass = self.oMT.calculateMolarMass(afMass)
 
+        afPartialPressures = getattr(oExme.oPhase, 'afPP', None)
+        if afPartialPressures is None:
+            afPartialPressures = [self.fPressure] * self.oMT.iSubstances
+
+        # Only recalculated if the matter properties changed by more than the
+        # tolerances of the property cache
+        self.fSpecificHeatCapacityP2P = self.oMT.oPropertyCache.get(
+            self, 'fSpecificHeatCapacity',
+            lambda: self.oMT.calculateSpecificHeatCapacity(
+                oExme.oPhase.sType, self.arPartialMass, self.fTemperature, afPartialPressures
+            ),
+            self.getPropertyCacheInputs(),
+        )
+
         if self.bTriggersetMatterPropertiesCallbackBound:
             self.trigger('setMatterProperties')
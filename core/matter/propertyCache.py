@@ -0,0 +1,213 @@
+import weakref
+import numpy as np
+
+# Default tolerances of the inputs of cached matter properties. A cached
+# value is reused as long as no input changed by more than
+# fAbsolute + rRelative * |previous value|.
+TOLERANCES = {
+    'fTemperature': {'fAbsolute': 1, 'rRelative': 0},  # [K]
+    'fPressure': {'fAbsolute': 100, 'rRelative': 0},  # [Pa]
+    'arPartialMass': {'fAbsolute': 0.01, 'rRelative': 0},  # [-]
+}
+
+
+class PropertyCache:
+    """
+    Tolerance based memoization of matter properties, e.g. the specific heat
+    capacity of a capacity or the density of a flow. Every (object, property)
+    pair stores the inputs of its last calculation and the result. The result
+    is reused until an input changes by more than its tolerance.
+
+    Tolerances are looked up per object and property, then per property and
+    finally per input, so they can be tuned for single objects or globally.
+    rToleranceScale scales all tolerances and bEnabled = False disables the
+    cache, which allows trading accuracy against speed for a whole simulation.
+
+    The matter table holds one cache (oMT.oPropertyCache) shared by all
+    capacities, branches, F2Fs and P2Ps. Hits and misses are counted per
+    property and per object, see get_statistics.
+    """
+
+    def __init__(self):
+        self.bEnabled = True
+        self.rToleranceScale = 1
+
+        self.ttfInputTolerances = {sInput: dict(tfTolerance) for sInput, tfTolerance in TOLERANCES.items()}
+        self.tttfPropertyTolerances = {}
+
+        # Per object data, removed automatically with the objects
+        self.toObjectTolerances = weakref.WeakKeyDictionary()
+        self.toEntries = weakref.WeakKeyDictionary()
+
+        self.ttiStatistics = {}
+
+    def set_tolerances(self, ttfTolerances, sProperty=None, oObject=None):
+        """
+        Set the tolerances of one or more inputs.
+
+        Args:
+            ttfTolerances (dict): Input name to a dict with fAbsolute and/or
+                rRelative, e.g. {'fTemperature': {'fAbsolute': 0.5}}.
+            sProperty (str): Only set the tolerances for this property.
+            oObject (object): Only set the tolerances for this object,
+                requires sProperty.
+        """
+        if oObject is not None:
+            if sProperty is None:
+                raise ValueError('Object specific tolerances require the name of the property.')
+
+            tttfTolerances = self.toObjectTolerances.setdefault(oObject, {})
+            ttfTarget = tttfTolerances.setdefault(sProperty, {})
+        elif sProperty is not None:
+            ttfTarget = self.tttfPropertyTolerances.setdefault(sProperty, {})
+        else:
+            ttfTarget = self.ttfInputTolerances
+
+        for sInput, tfTolerance in ttfTolerances.items():
+            if not set(tfTolerance) <= {'fAbsolute', 'rRelative'}:
+                raise ValueError(f'Tolerances of {sInput} can only define fAbsolute and rRelative.')
+
+            ttfTarget.setdefault(sInput, {}).update(tfTolerance)
+
+    def get_tolerance(self, oObject, sProperty, sInput):
+        """
+        Returns the absolute and relative tolerance of an input.
+
+        Returns:
+            tuple: fAbsolute and rRelative, scaled with rToleranceScale.
+        """
+        tfTolerance = {'fAbsolute': 0, 'rRelative': 0}
+        tfTolerance.update(self.ttfInputTolerances.get(sInput, {}))
+        tfTolerance.update(self.tttfPropertyTolerances.get(sProperty, {}).get(sInput, {}))
+
+        tttfObjectTolerances = self.toObjectTolerances.get(oObject)
+        if tttfObjectTolerances is not None:
+            tfTolerance.update(tttfObjectTolerances.get(sProperty, {}).get(sInput, {}))
+
+        return tfTolerance['fAbsolute'] * self.rToleranceScale, tfTolerance['rRelative'] * self.rToleranceScale
+
+    def get(self, oObject, sProperty, hCalculate, txInputs):
+        """
+        Returns a property of an object, calculating it only if one of the
+        inputs changed by more than its tolerance since the last calculation.
+
+        Args:
+            oObject (object): Object the property belongs to, e.g. a capacity.
+            sProperty (str): Name of the property.
+            hCalculate (callable): Calculates the property without arguments.
+            txInputs (dict): Current values of the inputs the property
+                depends on, scalars or vectors.
+
+        Returns:
+            The cached or newly calculated property.
+        """
+        tiStatistics = self.ttiStatistics.setdefault(sProperty, {'iHits': 0, 'iMisses': 0})
+
+        txEntries = self.toEntries.get(oObject)
+        if txEntries is None:
+            txEntries = {}
+            self.toEntries[oObject] = txEntries
+
+        txEntry = txEntries.get(sProperty)
+        if self.bEnabled and txEntry is not None and self._is_within_tolerance(oObject, sProperty, txEntry, txInputs):
+            tiStatistics['iHits'] += 1
+            txEntry['iHits'] += 1
+            return txEntry['xValue']
+
+        xValue = hCalculate()
+
+        tiStatistics['iMisses'] += 1
+        if txEntry is None:
+            txEntry = {'iHits': 0, 'iMisses': 0}
+            txEntries[sProperty] = txEntry
+
+        txEntry['iMisses'] += 1
+        txEntry['txInputs'] = {sInput: _copy_input(xInput) for sInput, xInput in txInputs.items()}
+        txEntry['xValue'] = xValue
+
+        return xValue
+
+    def invalidate(self, oObject, sProperty=None):
+        """
+        Removes the cached values of an object, so they are recalculated on
+        next use.
+
+        Args:
+            oObject (object): The object.
+            sProperty (str): Only remove this property.
+        """
+        txEntries = self.toEntries.get(oObject)
+        if txEntries is None:
+            return
+
+        if sProperty is None:
+            for txEntry in txEntries.values():
+                txEntry.pop('txInputs', None)
+        elif sProperty in txEntries:
+            txEntries[sProperty].pop('txInputs', None)
+
+    def get_statistics(self, oObject=None):
+        """
+        Returns the hits and misses of all properties, or of the properties
+        of a single object.
+
+        Returns:
+            dict: Property name to a dict with iHits, iMisses and rHitRatio.
+        """
+        if oObject is None:
+            ttiStatistics = self.ttiStatistics
+        else:
+            ttiStatistics = {
+                sProperty: {'iHits': txEntry['iHits'], 'iMisses': txEntry['iMisses']}
+                for sProperty, txEntry in self.toEntries.get(oObject, {}).items()
+            }
+
+        ttxStatistics = {}
+        for sProperty, tiStatistics in ttiStatistics.items():
+            iCalls = tiStatistics['iHits'] + tiStatistics['iMisses']
+            ttxStatistics[sProperty] = {
+                'iHits': tiStatistics['iHits'],
+                'iMisses': tiStatistics['iMisses'],
+                'rHitRatio': tiStatistics['iHits'] / iCalls if iCalls else 0,
+            }
+
+        return ttxStatistics
+
+    def reset_statistics(self):
+        """
+        Sets all hit and miss counters to zero.
+        """
+        self.ttiStatistics = {}
+        for txEntries in self.toEntries.values():
+            for txEntry in txEntries.values():
+                txEntry['iHits'] = 0
+                txEntry['iMisses'] = 0
+
+    def _is_within_tolerance(self, oObject, sProperty, txEntry, txInputs):
+        txPreviousInputs = txEntry.get('txInputs')
+        if txPreviousInputs is None or txPreviousInputs.keys() != txInputs.keys():
+            return False
+
+        for sInput, xInput in txInputs.items():
+            xPrevious = txPreviousInputs[sInput]
+            if xInput is None or xPrevious is None:
+                if xInput is not xPrevious:
+                    return False
+                continue
+
+            afInput = np.asarray(xInput, dtype=float)
+            if afInput.shape != xPrevious.shape:
+                return False
+
+            fAbsolute, rRelative = self.get_tolerance(oObject, sProperty, sInput)
+            if np.any(np.abs(afInput - xPrevious) > fAbsolute + rRelative * np.abs(xPrevious)):
+                return False
+
+        return True
+
+
+def _copy_input(xInput):
+    if xInput is None:
+        return None
+
+    return np.array(xInput, dtype=float)
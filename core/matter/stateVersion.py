@@ -0,0 +1,29 @@
+class StateVersionedAttribute:
+    """
+    Attribute of a phase or flow that is part of its matter state, e.g. the
+    temperature or the mass. Every assignment increments the iStateVersion
+    counter of the object, so values derived from the state can be cached
+    per (object, version).
+
+    Only assignments are detected. Vectors like arPartialMass have to be
+    reassigned instead of changed in place, and must not be shared with other
+    objects that change them. Compound masses count their own changes, see
+    CompoundMass.iVersion.
+    """
+
+    def __set_name__(self, oOwner, sName):
+        self.sName = sName
+
+    def __get__(self, oObject, oOwner=None):
+        if oObject is None:
+            return self
+
+        try:
+            return oObject.__dict__[self.sName]
+        except KeyError:
+            raise AttributeError(self.sName) from None
+
+    def __set__(self, oObject, xValue):
+        tDict = oObject.__dict__
+        tDict[self.sName] = xValue
+        tDict['iStateVersion'] = tDict.get('iStateVersion', 0) + 1
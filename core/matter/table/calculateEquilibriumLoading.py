@@ -8,129 +8,141 @@ def calculateEquilibriumLoading(self, *args):
         mfEquilibriumLoading: Vector containing the mass (kg) of each substance absorbed by the given absorber mass at equilibrium.
         mfLinearizationConstant: Vector of linearization constants for each substance.
     """
+    abAbsorber = np.asarray(self.abAbsorber, dtype=bool)
+
     if len(args) == 1:
         if args[0].sObjectType != "p2p":
             raise ValueError(
                 "If only one parameter is provided, it must be a matter.procs.p2p derivative."
             )
 
-        if any(args[0].oOut.oPhase.afMass[self.abAbsorber]):
+        if any(np.asarray(args[0].oOut.oPhase.afMass)[abAbsorber]):
             afMass = args[0].oOut.oPhase.afMass
             fTemperature = args[0].oOut.oPhase.fTemperature
             afPP = args[0].oIn.oPhase.afPP
-        elif any(args[0].oIn.oPhase.afMass[self.abAbsorber]):
+        elif any(np.asarray(args[0].oIn.oPhase.afMass)[abAbsorber]):
             afMass = args[0].oIn.oPhase.afMass
             fTemperature = args[0].oIn.oPhase.fTemperature
             afPP = args[0].oOut.oPhase.afPP
         else:
             # Output zero equilibrium loading
-            return [0] * self.iSubstances, [0] * self.iSubstances
+            return np.zeros(self.iSubstances), np.zeros(self.iSubstances)
     else:
         # TODO: Add error checks for incorrect inputs
         afMass = args[0]
         afPP = args[1]
         fTemperature = args[2]
 
-        if not any(afMass[self.abAbsorber]):
+        if not any(np.asarray(afMass)[abAbsorber]):
             # Output zero equilibrium loading
-            return [0] * self.iSubstances, [0] * self.iSubstances
+            return np.zeros(self.iSubstances), np.zeros(self.iSubstances)
 
-    # Find absorbers present in the mass
-    csAbsorbers = [
-        self.csSubstances[i]
-        for i, val in enumerate((afMass != 0) * self.abAbsorber)
-        if val != 0
-    ]
+    mfEquilibriumLoading, mfLinearizationConstant = self.calculateEquilibriumLoadingCells(
+        afMass, afPP, fTemperature
+    )
 
-    mfEquilibriumLoadingPerAbsorberMolsPerKG = [
-        [0] * self.iSubstances for _ in range(len(csAbsorbers))
-    ]
-    mfEquilibriumLoadingPerAbsorber = [
-        [0] * self.iSubstances for _ in range(len(csAbsorbers))
-    ]
+    return mfEquilibriumLoading, mfLinearizationConstant
 
-    mfLinearizationConstantPerAbsorberMolsPerKG = [
-        [0] * self.iSubstances for _ in range(len(csAbsorbers))
-    ]
-    mfLinearizationConstantPerAbsorber = [
-        [0] * self.iSubstances for _ in range(len(csAbsorbers))
-    ]
 
-    for iAbsorber, absorber in enumerate(csAbsorbers):
-        if absorber == "Zeolite5A":
-            (
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber],
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-            ) = self.calculateEquilibriumLoading_Zeolite5A(afPP, fTemperature)
-        elif absorber == "Zeolite5A_RK38":
-            (
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber],
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-            ) = self.calculateEquilibriumLoading_Zeolite5A_RK38(afPP, fTemperature)
-        elif absorber == "Zeolite13x":
-            (
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber],
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-            ) = self.calculateEquilibriumLoading_Zeolite13x(afPP, fTemperature)
-        elif absorber == "SilicaGel_40":
-            (
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber],
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-            ) = self.calculateEquilibriumLoading_SilicaGel_40(afPP, fTemperature)
-        elif absorber == "Sylobead_B125":
-            (
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber],
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-            ) = self.calculateEquilibriumLoading_Sylobead_B125(afPP, fTemperature)
-        else:
-            raise ValueError(
-                "A new absorber substance was defined without adding the required Toth equation function."
-            )
+def calculateEquilibriumLoadingCells(self, mfMass, mfPP, afTemperature):
+    """
+    Calculates the equilibrium loading and linearization constants for many
+    cells at once, e.g. all cells of an adsorber bed. All absorbers are
+    evaluated with the Toth equation in one broadcast operation over the
+    stacked parameter arrays, see getTothParameters.
 
-        # Convert to absolute kg value and apply molar mass
-        mfEquilibriumLoadingPerAbsorber[iAbsorber] = [
-            mols_per_kg * afMass[self.tiN2I[absorber]] * molar_mass
-            for mols_per_kg, molar_mass in zip(
-                mfEquilibriumLoadingPerAbsorberMolsPerKG[iAbsorber], self.afMolarMass
-            )
-        ]
-        mfLinearizationConstantPerAbsorber[iAbsorber] = [
-            constant * afMass[self.tiN2I[absorber]] * molar_mass
-            for constant, molar_mass in zip(
-                mfLinearizationConstantPerAbsorberMolsPerKG[iAbsorber],
-                self.afMolarMass,
-            )
-        ]
+    Args:
+        mfMass: Masses in kg, shape (cells, substances) or (substances,).
+        mfPP: Partial pressures in Pa of the gas in contact with each cell,
+            same shape as mfMass.
+        afTemperature: Temperature in K of each cell, shape (cells,) or scalar.
 
-    # Summing up to one vector
-    mfEquilibriumLoading = [
-        sum(x) for x in zip(*mfEquilibriumLoadingPerAbsorber)
-    ]
-    mfLinearizationConstant = [
-        sum(x) / len(csAbsorbers) for x in zip(*mfLinearizationConstantPerAbsorber)
-    ]
+    Returns:
+        mfEquilibriumLoading: Mass (kg) of each substance absorbed in each cell at equilibrium, shape of mfMass.
+        mfLinearizationConstant: Linearization constants of each cell and substance, shape of mfMass.
+    """
+    tToth = self.getTothParameters()
 
-    return mfEquilibriumLoading, mfLinearizationConstant
+    mfMass = np.asarray(mfMass, dtype=float)
+    bSingleCell = mfMass.ndim == 1
+    mfMass = np.atleast_2d(mfMass)
+    mfPP = np.atleast_2d(np.asarray(mfPP, dtype=float))
+    afTemperature = np.broadcast_to(np.asarray(afTemperature, dtype=float).reshape(-1), (mfMass.shape[0],))
 
+    # Absorber mass of each cell, shape (cells, absorbers)
+    mfAbsorberMass = mfMass[:, tToth["aiAbsorbers"]]
 
-def calculateEquilibriumLoading_Zeolite5A(self, afPP, fTemperature):
-    # Calculate parameters for Toth equation
-    mf_A = (
-        self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_A0
-        * np.exp(self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_E / fTemperature)
-    )
-    mf_B = (
-        self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_B0
-        * np.exp(self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_E / fTemperature)
-    )
-    mf_t_T = (
-        self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_T0
-        + self.ttxMatter.Zeolite5A.tAbsorberParameters.tToth.mf_C0 / fTemperature
+    # Toth parameters per cell, absorber and substance, shape (cells, absorbers, substances)
+    afInverseTemperature = (1 / afTemperature)[:, np.newaxis, np.newaxis]
+    mf_A = tToth["mf_A0"] * np.exp(tToth["mf_E"] * afInverseTemperature)
+    mf_B = tToth["mf_B0"] * np.exp(tToth["mf_E"] * afInverseTemperature)
+    mf_t_T = tToth["mf_T0"] + tToth["mf_C0"] * afInverseTemperature
+
+    # Substances without Toth parameters are not absorbed
+    abParameters = mf_t_T != 0
+    mf_t_T_Safe = np.where(abParameters, mf_t_T, 1)
+
+    afDenominator = 1 + np.sum(mf_B * mfPP[:, np.newaxis, :], axis=2, keepdims=True)
+    mfLinearizationConstantMolsPerKG = np.where(
+        abParameters, (mf_A / afDenominator ** mf_t_T_Safe) ** (1.0 / mf_t_T_Safe), 0
     )
 
-    mfLinearizationConstant = (
-        mf_A / (1 + np.sum(mf_B * afPP)) ** mf_t_T
-    ) ** (1.0 / mf_t_T)
+    # Convert to absolute kg values and sum up over the absorbers
+    mfAbsorberFactor = mfAbsorberMass[:, :, np.newaxis] * tToth["afMolarMass"]
+    mfLinearizationConstantPerAbsorber = mfLinearizationConstantMolsPerKG * mfAbsorberFactor
+
+    mfEquilibriumLoading = np.sum(mfLinearizationConstantPerAbsorber * mfPP[:, np.newaxis, :], axis=1)
+
+    # The linearization constant is averaged over the absorbers present in a cell
+    aiPresentAbsorbers = np.count_nonzero(mfAbsorberMass, axis=1)[:, np.newaxis]
+    mfLinearizationConstant = np.sum(mfLinearizationConstantPerAbsorber, axis=1) / np.maximum(aiPresentAbsorbers, 1)
+
+    if bSingleCell:
+        return mfEquilibriumLoading[0], mfLinearizationConstant[0]
+
+    return mfEquilibriumLoading, mfLinearizationConstant
+
+
+def getTothParameters(self):
+    """
+    Returns the Toth parameters of all absorbers stacked into arrays of
+    shape (absorbers, substances). Every substance with tAbsorberParameters
+    in the matter table is included, so new absorbers only have to be added
+    to the absorber data. The arrays are created on first use and have to be
+    reset with resetTothParameters if absorber data changes.
+
+    Returns:
+        tToth: Dict with csAbsorbers, aiAbsorbers (substance indices of the
+        absorbers), afMolarMass and the parameter arrays mf_A0, mf_B0, mf_E,
+        mf_T0 and mf_C0.
+    """
+    tToth = getattr(self, "tTothParameters", None)
+    if tToth is not None:
+        return tToth
+
+    csAbsorbers = [
+        sSubstance for sSubstance in self.csSubstances
+        if "tAbsorberParameters" in self.ttxMatter.get(sSubstance, {})
+    ]
+
+    tToth = {
+        "csAbsorbers": csAbsorbers,
+        "aiAbsorbers": np.array([self.tiN2I[sAbsorber] for sAbsorber in csAbsorbers], dtype=int),
+        "afMolarMass": np.asarray(self.afMolarMass, dtype=float),
+    }
 
-    mfQ_equ = mfLinearizationConstant * afPP
-    return mfQ_equ, mfLinearizationConstant
+    for sParameter in ("mf_A0", "mf_B0", "mf_E", "mf_T0", "mf_C0"):
+        tToth[sParameter] = np.array(
+            [self.ttxMatter[sAbsorber]["tAbsorberParameters"]["tToth"][sParameter] for sAbsorber in csAbsorbers],
+            dtype=float,
+        ).reshape(len(csAbsorbers), self.iSubstances)
+
+    self.tTothParameters = tToth
+    return tToth
+
+
+def resetTothParameters(self):
+    """
+    Removes the stacked Toth parameters, they are rebuilt on next use.
+    """
+    self.tTothParameters = None
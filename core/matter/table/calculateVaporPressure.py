@@ -1,3 +1,5 @@
+import numpy as np
+
 def calculate_vapor_pressure(self, f_temperature, s_substance):
     """
     Calculates the vapor pressure for a given substance at a given temperature.
@@ -6,70 +8,111 @@ def calculate_vapor_pressure(self, f_temperature, s_substance):
     condensation in heat exchangers. The vapor pressure returned is 0 if the
     substance is liquid at all pressures, and inf if it is a gas at all pressures.
 
+    The Antoine ranges of the substance are evaluated directly, so the
+    temperature can be a scalar or an array of any shape.
+
     Args:
-        f_temperature (float): The temperature in K.
+        f_temperature (float or array): The temperature in K.
         s_substance (str): The substance for which to calculate vapor pressure.
 
     Returns:
-        float: The vapor pressure in Pa.
+        float or array: The vapor pressure in Pa, an array for array inputs.
     """
-    try:
-        # If an interpolation for vapor pressure already exists, use it
-        t_matter = self.ttx_matter[s_substance]
-        f_vapor_pressure = t_matter["tInterpolations"]["VaporPressure"](f_temperature)
-
-    except KeyError:
-        # If no interpolation exists, create it
-        antoine_data = self.matter_data["AntoineData"][s_substance]
+    t_ranges = _get_antoine_ranges(self, s_substance)
 
-        mf_limits = [limit for range_data in antoine_data["Range"] for limit in range_data["mfLimits"]]
+    af_temperature = np.asarray(f_temperature, dtype=float)
 
-        # Create temperature array (0 to 1000 K, step of 1 K)
-        af_temperature = list(range(0, 1001))
+    # Every temperature uses the last range starting below it, temperatures
+    # below the first range use the first one and are set to 0 afterwards
+    ai_range = np.clip(np.searchsorted(t_ranges["afLower"], af_temperature, side="right") - 1, 0, None)
 
-        af_vapor_pressure = [
-            self._create_interpolation(temp, antoine_data, mf_limits) for temp in af_temperature
-        ]
+    with np.errstate(divide="ignore", over="ignore"):
+        # Antoine Equation (source: NIST Chemistry WebBook)
+        af_vapor_pressure = 10 ** (
+            t_ranges["afA"][ai_range] - t_ranges["afB"][ai_range] / (af_temperature + t_ranges["afC"][ai_range])
+        ) * 1e5
 
-        # Store the interpolation in the matter data
-        from scipy.interpolate import interp1d
-        self.ttx_matter[s_substance]["tInterpolations"]["VaporPressure"] = interp1d(
-            af_temperature, af_vapor_pressure, kind="linear", bounds_error=False, fill_value="extrapolate"
-        )
+    # Below the limits the substance is liquid, above them gaseous
+    af_vapor_pressure = np.where(af_temperature < t_ranges["afLower"][0], 0, af_vapor_pressure)
+    af_vapor_pressure = np.where(af_temperature > t_ranges["afUpper"][-1], np.inf, af_vapor_pressure)
 
-        # Calculate vapor pressure using the newly created interpolation
-        f_vapor_pressure = self.ttx_matter[s_substance]["tInterpolations"]["VaporPressure"](f_temperature)
+    if af_vapor_pressure.ndim == 0:
+        return float(af_vapor_pressure)
 
-    return f_vapor_pressure
+    return af_vapor_pressure
 
 
-def _create_interpolation(self, f_temperature, antoine_data, mf_limits):
+def calculate_saturation_temperature(self, f_vapor_pressure, s_substance):
     """
-    Helper function to create vapor pressure interpolation for a given temperature.
+    Inverse of calculate_vapor_pressure, calculates the temperature at which
+    the vapor pressure of a substance equals the given pressure, e.g. the
+    dew point for a partial pressure of water.
 
     Args:
-        f_temperature (float): The temperature in K.
-        antoine_data (dict): Antoine equation data for the substance.
-        mf_limits (list): List of temperature limits for the Antoine ranges.
+        f_vapor_pressure (float or array): The vapor pressure in Pa.
+        s_substance (str): The substance.
 
     Returns:
-        float: Vapor pressure in Pa.
+        float or array: The saturation temperature in K, NaN for pressures
+        that are not positive or NaN. An infinite pressure returns inf, the
+        inverse of the infinite vapor pressure above the Antoine ranges.
+    """
+    t_ranges = _get_antoine_ranges(self, s_substance)
+
+    af_vapor_pressure = np.asarray(f_vapor_pressure, dtype=float)
+
+    # Solve the Antoine Equation of every range for the temperature
+    with np.errstate(divide="ignore", invalid="ignore"):
+        af_log_pressure = np.where(af_vapor_pressure > 0, np.log10(af_vapor_pressure / 1e5), np.nan)[..., np.newaxis]
+        mf_temperature = t_ranges["afB"] / (t_ranges["afA"] - af_log_pressure) - t_ranges["afC"]
+
+    # The vapor pressure increases with the temperature, so the valid range
+    # is the last one whose solution lies above its lower limit
+    ai_range = np.clip(np.sum(mf_temperature >= t_ranges["afLower"], axis=-1) - 1, 0, None)
+    af_temperature = np.take_along_axis(mf_temperature, ai_range[..., np.newaxis], axis=-1)[..., 0]
+    af_temperature = np.where(np.isposinf(af_vapor_pressure), np.inf, af_temperature)
+
+    if af_temperature.ndim == 0:
+        return float(af_temperature)
+
+    return af_temperature
+
+
+def _get_antoine_ranges(self, s_substance):
     """
-    if f_temperature < mf_limits[0]:
-        # Temperature below the limits: substance is liquid, vapor pressure is 0
-        return 0
-    elif f_temperature > mf_limits[-1]:
-        # Temperature above the limits: substance is gaseous, vapor pressure is inf
-        return float('inf')
-    else:
-        for range_data in antoine_data["Range"]:
-            if mf_limits[0] <= f_temperature <= mf_limits[1]:
-                f_a = range_data["fA"]
-                f_b = range_data["fB"]
-                f_c = range_data["fC"]
-
-                # Antoine Equation (source: NIST Chemistry WebBook)
-                f_vapor_pressure = (10 ** (f_a - (f_b / (f_temperature + f_c)))) * 1e5
-                return f_vapor_pressure
-
-    raise ValueError("Temperature is outside the defined ranges for Antoine data.")
+    Returns the Antoine ranges of a substance as arrays sorted by their lower
+    temperature limit. The arrays are created on first use and cached in the
+    matter table.
+
+    Returns:
+        dict: afLower, afUpper, afA, afB and afC, one entry per range.
+    """
+    if getattr(self, "t_antoine_ranges", None) is None:
+        self.t_antoine_ranges = {}
+
+    if s_substance not in self.t_antoine_ranges:
+        tx_antoine = self.ttx_matter.get(s_substance, {}).get("cxAntoineParameters")
+        if tx_antoine is None:
+            tx_antoine = self.matter_data["AntoineData"][s_substance]
+
+        ct_ranges = tx_antoine["Range"]
+        if isinstance(ct_ranges, dict):
+            ct_ranges = [ct_ranges]
+
+        ct_ranges = sorted((t_range for t_range in ct_ranges if "fA" in t_range), key=lambda t: t["mfLimits"][0])
+        if not ct_ranges:
+            raise ValueError(f"No Antoine parameters defined for {s_substance}.")
+
+        self.t_antoine_ranges[s_substance] = {
+            "afLower": np.array([t_range["mfLimits"][0] for t_range in ct_ranges], dtype=float),
+            "afUpper": np.array([t_range["mfLimits"][1] for t_range in ct_ranges], dtype=float),
+            "afA": np.array([t_range["fA"] for t_range in ct_ranges], dtype=float),
+            "afB": np.array([t_range["fB"] for t_range in ct_ranges], dtype=float),
+            "afC": np.array([t_range["fC"] for t_range in ct_ranges], dtype=float),
+        }
+
+    return self.t_antoine_ranges[s_substance]
+
+
+# Name used by the phases and components
+calculateVaporPressure = calculate_vapor_pressure
@@ -1,5 +1,3 @@
-import math
-
 def convert_humidity_to_dewpoint(self, *args):
     """
     Converts a relative humidity value (0 to 1) into dewpoint temperature in Kelvin.
@@ -24,29 +22,13 @@ def convert_humidity_to_dewpoint(self, *args):
         f_temperature = args[1]
         f_partial_pressure = r_relative_humidity * self.calculate_vapor_pressure(f_temperature, "H2O")
 
-    # Values for Antoine equation from NIST Chemistry WebBook
-    if 255.9 <= f_temperature < 379:
-        # Parameters for the vapor pressure calculation
-        f_a = 4.6543
-        f_b = 1435.264
-        f_c = -64.848
-    elif 379 <= f_temperature < 573:
-        # Parameters for the vapor pressure calculation
-        f_a = 3.55959
-        f_b = 643.748
-        f_c = -198.043
-    elif f_temperature < 255.9:
+    # Outside of the Antoine ranges of water the dew point is not defined
+    if f_temperature < 255.9:
         # Below limits: substance is liquid, dewpoint is effectively 0 K
         return 0
     elif f_temperature >= 573:
         # Above limits: substance is gaseous, dewpoint is effectively infinite
         return float('inf')
 
-    # Solve Antoine Equation for temperature
-    try:
-        f_dew_point = f_b / (f_a - math.log10(f_partial_pressure / 1e5)) - f_c
-    except ValueError:
-        # Handle log10 errors for invalid pressure values
-        f_dew_point = float('nan')
-
-    return f_dew_point
+    # Solve the Antoine Equation for temperature, NaN for invalid pressure values
+    return self.calculate_saturation_temperature(f_partial_pressure, "H2O")
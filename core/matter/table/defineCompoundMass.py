@@ -1,5 +1,6 @@
 import sys
 import os
+import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "simulation")))
 import Infrastructure
 import Table
@@ -75,13 +76,11 @@ def define_compound_mass(self, o_caller, s_compound_name, tr_base_composition, b
             "sName": s_compound_name
         })
 
-        ar_base_composition = [0] * self.i_substances
-        for key, value in tr_base_composition.items():
-            ar_base_composition[self.ti_n2i[key] - 1] = value
+        ar_base_composition = _get_base_composition(self, tr_base_composition)
 
         # Calculate molar mass
         self.af_molar_mass.append(
-            sum(m * c for m, c in zip(self.af_molar_mass, ar_base_composition))
+            float(np.dot(self.af_molar_mass, ar_base_composition[:len(self.af_molar_mass)]))
         )
 
         # Default properties
@@ -97,10 +96,18 @@ def define_compound_mass(self, o_caller, s_compound_name, tr_base_composition, b
                 absorber_params["tToth"][param].append(0)
     else:
         # If the compound already exists, update its molar mass
-        ar_base_composition = [0] * self.i_substances
-        for key, value in tr_base_composition.items():
-            ar_base_composition[self.ti_n2i[key] - 1] = value
+        ar_base_composition = _get_base_composition(self, tr_base_composition)
 
-        self.af_molar_mass[self.ti_n2i[s_compound_name] - 1] = sum(
-            m * c for m, c in zip(self.af_molar_mass, ar_base_composition)
+        self.af_molar_mass[self.ti_n2i[s_compound_name] - 1] = float(
+            np.dot(self.af_molar_mass, ar_base_composition[:len(self.af_molar_mass)])
         )
+
+def _get_base_composition(self, tr_base_composition):
+    """
+    Returns the base composition of a compound as a vector over all substances.
+    """
+    ar_base_composition = np.zeros(self.i_substances)
+    for key, value in tr_base_composition.items():
+        ar_base_composition[self.ti_n2i[key] - 1] = value
+
+    return ar_base_composition
@@ -1,3 +1,10 @@
+import sys
+import os
+import hashlib
+import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "private")))
+from propertyGrid import PropertyGrid
+
 def determine_phase(self, s_substance, f_temperature, f_pressure):
     """
     Determine the phase of a substance based on temperature and pressure.
@@ -9,20 +16,23 @@ def determine_phase(self, s_substance, f_temperature, f_pressure):
 
     Returns:
         mi_phase (int): Phase indicator (1=solid, 2=liquid, 3=gas, 4=supercritical).
+            Non-integer values indicate a substance in a phase change.
         cs_possible_phase (list): Possible phases.
     """
     cs_phase = ["Solid", "Liquid", "Gas", "Supercritical"]
 
-    if isinstance(s_substance, list):  # Case for a mass vector
-        cs_substances = [self.cs_substances[i] for i, mass in enumerate(s_substance) if mass != 0]
+    if isinstance(s_substance, (list, np.ndarray)):  # Case for a mass vector
+        ai_substances = np.flatnonzero(np.asarray(s_substance) != 0)
 
-        if any(self.ab_compound[i] for i, mass in enumerate(s_substance) if mass != 0):
+        if any(self.ab_compound[i] for i in ai_substances):
             raise ValueError("Resolve compound masses using the `resolve_compound_mass` function before using `determine_phase`.")
 
+        # Classify all substances of the mass vector at once
+        af_phase = determine_phases(self, ai_substances, f_temperature, np.asarray(f_pressure, dtype=float)[ai_substances])
+
         mi_phase = [0] * self.i_substances
-        for substance in cs_substances:
-            phase, _ = self._determine_phase_for_substance(substance, f_temperature, f_pressure[self.ti_n2i[substance]])
-            mi_phase[self.ti_n2i[substance]] = phase
+        for i_substance, f_phase in zip(ai_substances, af_phase):
+            mi_phase[i_substance] = _to_phase_indicator(f_phase)
 
         try:
             cs_possible_phase = [cs_phase[i - 1] for i in set(mi_phase) if i != 0]
@@ -34,6 +44,34 @@ def determine_phase(self, s_substance, f_temperature, f_pressure):
 
     return mi_phase, cs_possible_phase
 
+def determine_phases(self, ai_substances, af_temperature, af_pressure):
+    """
+    Vectorized phase identification for many (substance, temperature,
+    pressure) combinations. The entries are grouped by substance and every
+    phase identification grid is evaluated once for all of its entries.
+
+    Args:
+        ai_substances (array): Substance indices.
+        af_temperature (float or array): Temperatures in Kelvin.
+        af_pressure (float or array): Pressures in Pascal.
+
+    Returns:
+        array: Phase indicator of every entry, see determine_phase.
+    """
+    ai_substances = np.asarray(ai_substances, dtype=int).ravel()
+    af_temperature = np.broadcast_to(np.asarray(af_temperature, dtype=float), ai_substances.shape)
+    af_pressure = np.broadcast_to(np.asarray(af_pressure, dtype=float), ai_substances.shape)
+
+    af_phase = np.zeros(ai_substances.shape)
+
+    for i_substance in np.unique(ai_substances):
+        ab_substance = ai_substances == i_substance
+        af_phase[ab_substance] = _evaluate_phase(
+            self, self.cs_substances[i_substance], af_temperature[ab_substance], af_pressure[ab_substance]
+        )
+
+    return af_phase
+
 def _determine_phase_for_substance(self, s_substance, f_temperature, f_pressure):
     """
     Determine phase for a specific substance.
@@ -54,59 +92,105 @@ def _determine_phase_for_substance(self, s_substance, f_temperature, f_pressure)
         mi_phase = cs_phase.index(cs_possible_phase[0]) + 1
         return mi_phase, cs_possible_phase
 
-    if "tPhaseIdentification" not in self.ttx_matter[s_substance]["tIsobaricData"]:
-        # Construct mfData matrix
-        mf_data = []
-        for i_phase, phase in enumerate(cs_phase):
-            data = self.ttx_matter[s_substance]["tIsobaricData"][f"t{phase}"]["mfData"]
-            temperature, pressure = data[:, 0], data[:, 1]
-            mf_data.extend([[t, p, i_phase + 1] for t, p in zip(temperature, pressure) if not (t is None or p is None)])
+    mi_phase = _to_phase_indicator(_evaluate_phase(self, s_substance, np.array([f_temperature]), np.array([f_pressure]))[0])
+
+    # Both neighbouring phases are possible during a phase change
+    cs_possible_phase = cs_phase[int(np.floor(mi_phase)) - 1 : int(np.ceil(mi_phase))]
+
+    return mi_phase, cs_possible_phase
+
+def get_phase_identification(self, s_substance, i_temperature_points=512, i_pressure_points=512):
+    """
+    Returns the phase identification grid of a substance, creating it on
+    first use. The phase indicators of all isobaric NIST data points are
+    resampled onto a regular (temperature, log10 pressure) grid, so phase
+    boundaries show up as fractional values between two phases. If the
+    matter table has a cache directory (sCacheDirectory), the grid is stored
+    there and reused in later runs as long as the data does not change.
+
+    Args:
+        s_substance (str): Substance name.
+        i_temperature_points (int): Number of grid points in temperature.
+        i_pressure_points (int): Number of grid points in log10 pressure.
+
+    Returns:
+        PropertyGrid: The phase identification grid.
+    """
+    tx_isobaric_data = self.ttx_matter[s_substance]["tIsobaricData"]
+
+    if "tPhaseIdentification" not in tx_isobaric_data:
+        i_column_temperature = tx_isobaric_data["tColumns"].get("Temperature", 0)
+        i_column_pressure = tx_isobaric_data["tColumns"].get("Pressure", 1)
+
+        # Construct mfData matrix of temperature, pressure and phase
+        cmf_data = []
+        for i_phase, phase in enumerate(["Solid", "Liquid", "Gas", "Supercritical"]):
+            data = np.asarray(tx_isobaric_data[f"t{phase}"]["mfData"], dtype=float)
+            mf_phase_data = np.column_stack(
+                (data[:, i_column_temperature], data[:, i_column_pressure], np.full(data.shape[0], i_phase + 1.0))
+            )
+            cmf_data.append(mf_phase_data[~np.isnan(mf_phase_data).any(axis=1)])
 
         # Remove duplicates
-        mf_data = list({tuple(row) for row in mf_data})
-
-        # Create interpolation
-        mf_data.sort()
-        temperatures, pressures, phases = zip(*mf_data)
-        interpolation = self.create_interpolation(temperatures, pressures, phases)
-        self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"] = {
-            "tInterpolation": interpolation,
-            "bInterpolation": True,
+        mf_data = np.unique(np.vstack(cmf_data), axis=0)
+
+        o_hash = hashlib.sha256(mf_data.tobytes())
+        o_hash.update(f"{i_temperature_points}x{i_pressure_points}".encode())
+        s_fingerprint = o_hash.hexdigest()
+
+        s_cache_dir = getattr(self, "sCacheDirectory", None)
+        s_file_path = None
+        o_grid = None
+        if s_cache_dir is not None:
+            s_file_path = os.path.join(s_cache_dir, "PhaseGrids", f"{s_substance}.npz")
+            o_grid = PropertyGrid.load(s_file_path, s_fingerprint)
+
+        if o_grid is None:
+            o_grid = PropertyGrid.from_scattered_data(
+                mf_data[:, 0], mf_data[:, 1], mf_data[:, 2], i_temperature_points, i_pressure_points
+            )
+            if o_grid is None:
+                raise ValueError(f"Cannot create the phase identification of {s_substance}.")
+
+            # The closest valid cells are needed for the phase
+            # identification, so they are stored as well
+            if s_file_path is not None:
+                o_grid.save(s_file_path, s_fingerprint, b_nearest=True)
+
+        tx_isobaric_data["tPhaseIdentification"] = {
+            "oGrid": o_grid,
             "ttExtremes": {
-                "tTemperature": {"Min": min(temperatures), "Max": max(temperatures)},
-                "tPressure": {"Min": min(pressures), "Max": max(pressures)},
+                "tTemperature": {"Min": mf_data[:, 0].min(), "Max": mf_data[:, 0].max()},
+                "tPressure": {"Min": mf_data[:, 1].min(), "Max": mf_data[:, 1].max()},
             },
         }
 
-    # Adjust temperature and pressure if outside interpolation bounds
-    extremes = self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"]["ttExtremes"]
-    f_temperature = max(min(f_temperature, extremes["tTemperature"]["Max"]), extremes["tTemperature"]["Min"])
-    f_pressure = max(min(f_pressure, extremes["tPressure"]["Max"]), extremes["tPressure"]["Min"])
+    return tx_isobaric_data["tPhaseIdentification"]["oGrid"]
 
-    # Perform interpolation
-    interpolation = self.ttx_matter[s_substance]["tIsobaricData"]["tPhaseIdentification"]["tInterpolation"]
-    f_phase = interpolation(f_temperature, f_pressure)
-
-    # Handle numerical errors
-    f_phase = round(f_phase, 6)
+def _evaluate_phase(self, s_substance, af_temperature, af_pressure):
+    """
+    Returns the phase indicators of one substance for arrays of temperatures
+    and pressures. Values outside of the data are limited to its range.
+    """
+    if not self.ttx_matter[s_substance]["bIndividualFile"]:
+        i_phase, _ = self._determine_phase_for_substance(s_substance, None, None)
+        return np.full(np.shape(af_temperature), float(i_phase))
 
-    cs_possible_phase = cs_phase[int(f_phase) - 1 : int(f_phase)]
-    mi_phase = int(f_phase)
+    o_grid = get_phase_identification(self, s_substance)
 
-    return mi_phase, cs_possible_phase
+    af_phase = o_grid.evaluate(af_temperature, af_pressure)
 
-def create_interpolation(self, temperatures, pressures, phases):
-    """
-    Create an interpolation function for phase determination.
+    # Grid cells outside of the data use the closest cell with a phase
+    ab_invalid = np.isnan(af_phase)
+    if ab_invalid.any():
+        af_phase[ab_invalid] = o_grid.find_nearest_valid(af_temperature[ab_invalid], af_pressure[ab_invalid])
 
-    Args:
-        temperatures (list): List of temperatures.
-        pressures (list): List of pressures.
-        phases (list): List of phases.
+    # Handle numerical errors
+    return np.round(af_phase, 6)
 
-    Returns:
-        interpolation: Interpolation function.
+def _to_phase_indicator(f_phase):
+    """
+    Converts a phase value to an int unless the substance is in a phase change.
     """
-    from scipy.interpolate import LinearNDInterpolator
-    points = list(zip(temperatures, pressures))
-    return LinearNDInterpolator(points, phases)
+    f_phase = float(f_phase)
+    return int(f_phase) if f_phase % 1 == 0 else f_phase
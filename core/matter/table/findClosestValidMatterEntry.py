@@ -1,4 +1,11 @@
+import sys
+import os
 import numpy as np
+from scipy.spatial import cKDTree
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "private")))
+from interpolatorCache import InterpolatorCache
+from findProperty import _get_property_data
 
 def find_closest_valid_matter_entry(self, t_parameters):
     """
@@ -52,81 +59,121 @@ def find_closest_valid_matter_entry(self, t_parameters):
     if not isinstance(b_use_isobaric_data, bool):
         raise ValueError("Isobaric data selector must be a boolean.")
 
-    tx_matter_for_substance = self.ttx_matter[s_substance]
-
-    # Determine the type of data
-    if tx_matter_for_substance["bIndividualFile"]:
-        s_type_struct = "tIsobaricData" if b_use_isobaric_data else "tIsochoricData"
-        if s_property == "Heat Capacity":
-            s_property = "Isobaric Heat Capacity" if b_use_isobaric_data else "Isochoric Heat Capacity"
-    else:
+    if not self.ttx_matter[s_substance]["bIndividualFile"]:
         raise ValueError("Non-individual files are not supported in this implementation.")
 
-    s_phase_struct_name = {
-        "solid": "tSolid",
-        "liquid": "tLiquid",
-        "gas": "tGas",
-        "supercritical": "tSupercritical",
-    }.get(s_phase_type)
-
-    if not s_phase_struct_name:
-        raise ValueError(f"Invalid phase type: {s_phase_type}")
-
-    tx_matter_for_substance_and_type = tx_matter_for_substance[s_type_struct]
-    tx_matter_for_substance_and_type_and_aggregate = tx_matter_for_substance_and_type[s_phase_struct_name]
-
-    # Get the column for the desired property
-    i_column = tx_matter_for_substance_and_type["tColumns"].get(s_property.replace(" ", ""))
-    if i_column is None:
-        raise ValueError(f"Cannot find property {s_property} in the matter table for {s_substance}.")
-
-    # Handle first dependency
-    s_first_dep_name_no_spaces = s_first_dep_name.replace(" ", "")
-    i_column_first = tx_matter_for_substance_and_type["tColumns"].get(s_first_dep_name_no_spaces)
-    if i_column_first is None:
-        raise ValueError(f"Cannot find property {s_first_dep_name} in the matter table for {s_substance}.")
-
-    f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Min"]
-    f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Max"]
-
-    if f_first_dep_value > f_max:
-        f_first_dep_value = f_max
-    elif f_first_dep_value < f_min:
-        f_first_dep_value = f_min
-
-    if i_dependencies == 1:
-        # Single dependency
-        af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first]]
-        af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
-        af_temporary = np.unique(af_temporary, axis=0)
-
-        af_root_square_sum = np.abs(af_temporary[:, 1] - f_first_dep_value)
-        closest_index = np.argmin(af_root_square_sum)
-        f_property = af_temporary[closest_index, 0]
-
-    else:
-        # Two dependencies
-        s_second_dep_name_no_spaces = s_second_dep_name.replace(" ", "")
-        i_column_second = tx_matter_for_substance_and_type["tColumns"].get(s_second_dep_name_no_spaces)
-        if i_column_second is None:
-            raise ValueError(f"Cannot find property {s_second_dep_name} in the matter table for {s_substance}.")
-
-        f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Min"]
-        f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Max"]
-
-        if f_second_dep_value > f_max:
-            f_second_dep_value = f_max
-        elif f_second_dep_value < f_min:
-            f_second_dep_value = f_min
-
-        af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first, i_column_second]]
-        af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
-        af_temporary = np.unique(af_temporary, axis=0)
-
-        af_root_square_sum = np.sqrt(
-            (af_temporary[:, 1] - f_first_dep_value) ** 2 + (af_temporary[:, 2] - f_second_dep_value) ** 2
+    # The closest data point is also used if a property grid exists, grid
+    # cells are interpolated and would make the result depend on the grid
+    af_property = find_closest_valid_matter_entries(
+        self, s_substance, s_property, s_first_dep_name, f_first_dep_value,
+        s_second_dep_name if i_dependencies == 2 else None, f_second_dep_value if i_dependencies == 2 else None,
+        s_phase_type, b_use_isobaric_data
+    )
+
+    return float(af_property[0])
+
+
+def find_closest_valid_matter_entries(self, s_substance, s_property, s_first_dep_name, af_first_dep_values,
+                                      s_second_dep_name, af_second_dep_values, s_phase_type, b_use_isobaric_data=True):
+    """
+    Batch version of find_closest_valid_matter_entry for one substance,
+    property and phase. Uses the cached spatial index of the valid data
+    points, so every query takes O(log n).
+
+    Args:
+        s_substance (str): Name of the substance.
+        s_property (str): Desired property.
+        s_first_dep_name (str): Name of the first dependency.
+        af_first_dep_values (array): Values of the first dependency.
+        s_second_dep_name (str): Name of the second dependency, None for
+            properties depending only on the first dependency.
+        af_second_dep_values (array): Values of the second dependency.
+        s_phase_type (str): Phase type ('solid', 'liquid', 'gas', 'supercritical').
+        b_use_isobaric_data (bool): Use isobaric data if True; otherwise, use isochoric data.
+
+    Returns:
+        array: Closest matching value for every query point.
+    """
+    t_index = get_closest_valid_matter_index(
+        self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type, b_use_isobaric_data
+    )
+
+    # Copied, the dependencies are transformed in place below
+    mf_points = np.atleast_1d(np.array(af_first_dep_values, dtype=float, copy=True))[:, np.newaxis]
+    if s_second_dep_name is not None:
+        af_second = np.broadcast_to(np.asarray(af_second_dep_values, dtype=float), mf_points.shape[:1])
+        mf_points = np.column_stack((np.broadcast_to(mf_points[:, 0], af_second.shape), af_second))
+
+    # Pressures are compared in log10, non-positive pressures are limited to
+    # the lowest pressure of the data like all values outside of its range
+    ab_logarithmic = t_index["abLogarithmic"]
+    with np.errstate(divide="ignore"):
+        mf_points[:, ab_logarithmic] = np.log10(np.maximum(mf_points[:, ab_logarithmic], 0))
+
+    # Limit the dependencies to the range of the data and normalize them
+    mf_limits = t_index["mfLimits"]
+    mf_points = np.clip(mf_points, mf_limits[:, 0], mf_limits[:, 1])
+
+    _, ai_closest = t_index["oTree"].query((mf_points - t_index["afOffset"]) / t_index["afScale"])
+
+    return t_index["afValues"][ai_closest]
+
+
+def get_closest_valid_matter_index(self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type,
+                                   b_use_isobaric_data=True):
+    """
+    Returns the spatial index of the valid data points of a substance
+    property from the interpolation cache of the matter table, creating it
+    on first use. Pressures are used as log10 pressures and all
+    dependencies are normalized to their data range, the same metric as the
+    closest valid cells of a PropertyGrid, so temperature and pressure
+    contribute equally to the distance.
+
+    Returns:
+        dict: oTree, the KD-tree over the normalized data points, afValues,
+        the property value of every point, abLogarithmic, the dependencies
+        used as log10, afOffset and afScale, the normalization of the
+        dependencies, and mfLimits, the [min, max] range of each dependency
+        after the log10.
+    """
+    if getattr(self, "o_interpolator_cache", None) is None:
+        self.o_interpolator_cache = InterpolatorCache()
+
+    x_key = ("ClosestValidMatterIndex", s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type,
+             b_use_isobaric_data)
+
+    t_index = self.o_interpolator_cache.get(x_key)
+    if t_index is None:
+        af_data, _ = _get_property_data(
+            self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type, b_use_isobaric_data
         )
-        closest_index = np.argmin(af_root_square_sum)
-        f_property = af_temporary[closest_index, 0]
 
-    return f_property
+        ab_logarithmic = np.array([s_name == "Pressure" for s_name in (s_first_dep_name, s_second_dep_name)
+                                   if s_name is not None])
+
+        # Points without a positive pressure have no log10 pressure
+        af_data = af_data[np.all(af_data[:, 1:][:, ab_logarithmic] > 0, axis=1)]
+
+        if af_data.shape[0] == 0:
+            raise ValueError(f"No valid data for {s_property} of {s_substance} in {s_phase_type} phase.")
+
+        mf_dependencies = af_data[:, 1:].copy()
+        mf_dependencies[:, ab_logarithmic] = np.log10(mf_dependencies[:, ab_logarithmic])
+
+        af_offset = mf_dependencies.min(axis=0)
+        af_scale = np.ptp(mf_dependencies, axis=0)
+        af_scale[af_scale == 0] = 1
+
+        t_index = {
+            "oTree": cKDTree((mf_dependencies - af_offset) / af_scale),
+            "afValues": af_data[:, 0].copy(),
+            "abLogarithmic": ab_logarithmic,
+            "afOffset": af_offset,
+            "afScale": af_scale,
+            "mfLimits": np.column_stack((af_offset, mf_dependencies.max(axis=0))),
+        }
+
+        # Normalized points, values and tree nodes
+        self.o_interpolator_cache.put(x_key, t_index, 3 * af_data.nbytes)
+
+    return t_index
@@ -1,5 +1,11 @@
+import sys
+import os
+import hashlib
 import numpy as np
-from scipy.interpolate import interp1d, RegularGridInterpolator
+from scipy.interpolate import interp1d, LinearNDInterpolator
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "private")))
+from interpolatorCache import InterpolatorCache
+from propertyGrid import PropertyGrid
 
 def find_property(self, t_parameters):
     """
@@ -43,12 +49,300 @@ def find_property(self, t_parameters):
     if not isinstance(b_use_isobaric_data, bool):
         raise ValueError("Isobaric data selector must be a boolean.")
 
+    if i_dependencies == 2 and s_first_dep_name == "Temperature" and s_second_dep_name == "Pressure":
+        o_grid = get_property_grid(self, s_substance, s_property, s_phase_type, b_use_isobaric_data)
+        if o_grid is not None:
+            f_property = float(o_grid.evaluate(f_first_dep_value, f_second_dep_value))
+            if np.isnan(f_property):
+                raise ValueError(f"No valid value for {s_property} of {s_substance} in {s_phase_type} phase.")
+
+            return f_property
+
+    t_interpolation = get_property_interpolation(
+        self, s_substance, s_property, s_first_dep_name, s_second_dep_name if i_dependencies == 2 else None,
+        s_phase_type, b_use_isobaric_data
+    )
+
+    # Limit the dependencies to the range of the data
+    mf_limits = t_interpolation["mfLimits"]
+    f_first_dep_value = min(max(f_first_dep_value, mf_limits[0][0]), mf_limits[0][1])
+
+    if i_dependencies == 1:
+        f_property = float(t_interpolation["hInterpolation"](f_first_dep_value))
+    else:
+        f_second_dep_value = min(max(f_second_dep_value, mf_limits[1][0]), mf_limits[1][1])
+        f_property = float(t_interpolation["hInterpolation"](f_first_dep_value, f_second_dep_value))
+
+    if f_property is None or np.isnan(f_property):
+        raise ValueError(f"No valid value for {s_property} of {s_substance} in {s_phase_type} phase.")
+
+    return f_property
+
+
+def find_properties(self, s_property, ai_substances, af_first_dep_values, af_second_dep_values, cs_phase_types,
+                    s_first_dep_name="Temperature", s_second_dep_name="Pressure", b_use_isobaric_data=True):
+    """
+    Batch version of find_property. Looks up a property for many
+    (substance, first dependency, second dependency, phase) combinations at
+    once. The entries are grouped by substance and phase, so every cached
+    interpolation is evaluated only once with all of its points. Entries
+    without a valid value are resolved in a second pass, using the closest
+    valid matter entry if the substance is in a phase change.
+
+    Args:
+        s_property (str): Desired property (e.g., 'Density').
+        ai_substances (array): Substance indices.
+        af_first_dep_values (array): Values of the first dependency.
+        af_second_dep_values (array): Values of the second dependency, 0
+            uses the interpolation depending only on the first dependency.
+        cs_phase_types (list): Phase type of every entry.
+        s_first_dep_name (str): First dependency name.
+        s_second_dep_name (str): Second dependency name.
+        b_use_isobaric_data (bool): Use isobaric data if True; otherwise, use isochoric data.
+
+    Returns:
+        array: The property value of every entry.
+    """
+    ai_substances = np.asarray(ai_substances, dtype=int).ravel()
+    i_entries = ai_substances.shape[0]
+    af_first_dep_values = np.broadcast_to(np.asarray(af_first_dep_values, dtype=float), (i_entries,))
+    af_second_dep_values = np.broadcast_to(np.asarray(af_second_dep_values, dtype=float), (i_entries,))
+    cs_phase_types = np.broadcast_to(np.asarray(cs_phase_types, dtype=object), (i_entries,))
+
+    if not isinstance(b_use_isobaric_data, bool):
+        raise ValueError("Isobaric data selector must be a boolean.")
+
+    af_property = np.full(i_entries, np.nan)
+
+    # Properties of entries with a second dependency of 0 only depend on the
+    # first one, just like in find_property
+    ab_two_dependencies = af_second_dep_values != 0
+
+    # Lookup errors of each group, raised in the second pass if the entries
+    # cannot be resolved there either
+    t_errors = {}
+
+    t_groups = {}
+    for i, (i_substance, s_phase_type, b_two) in enumerate(zip(ai_substances, cs_phase_types, ab_two_dependencies)):
+        t_groups.setdefault((i_substance, s_phase_type, b_two), []).append(i)
+
+    b_grid_dependencies = s_first_dep_name == "Temperature" and s_second_dep_name == "Pressure"
+
+    for (i_substance, s_phase_type, b_two), ai_group in t_groups.items():
+        ai_group = np.array(ai_group)
+        s_substance = self.cs_substances[i_substance]
+
+        if b_two and b_grid_dependencies:
+            o_grid = get_property_grid(self, s_substance, s_property, s_phase_type, b_use_isobaric_data)
+            if o_grid is not None:
+                af_property[ai_group] = o_grid.evaluate(af_first_dep_values[ai_group], af_second_dep_values[ai_group])
+                continue
+
+        try:
+            t_interpolation = get_property_interpolation(
+                self, s_substance, s_property, s_first_dep_name, s_second_dep_name if b_two else None,
+                s_phase_type, b_use_isobaric_data
+            )
+        except Exception as o_error:
+            t_errors[(i_substance, s_phase_type, b_two)] = o_error
+            continue
+
+        # Limit the dependencies to the range of the data
+        mf_limits = t_interpolation["mfLimits"]
+        af_first = np.clip(af_first_dep_values[ai_group], mf_limits[0][0], mf_limits[0][1])
+
+        if b_two:
+            af_second = np.clip(af_second_dep_values[ai_group], mf_limits[1][0], mf_limits[1][1])
+            af_property[ai_group] = t_interpolation["hInterpolation"](af_first, af_second)
+        else:
+            af_property[ai_group] = t_interpolation["hInterpolation"](af_first)
+
+    # Second pass for the entries outside of the data, phase changes are
+    # identified for all of them at once
+    ai_invalid = np.flatnonzero(np.isnan(af_property))
+    af_phase = self.determine_phases(ai_substances[ai_invalid], af_first_dep_values[ai_invalid],
+                                     af_second_dep_values[ai_invalid]) if ai_invalid.size else []
+
+    for i, f_phase in zip(ai_invalid, af_phase):
+        i_substance = ai_substances[i]
+        s_substance = self.cs_substances[i_substance]
+        t_parameters = {
+            "sSubstance": s_substance,
+            "sProperty": s_property,
+            "sFirstDepName": s_first_dep_name,
+            "fFirstDepValue": float(af_first_dep_values[i]),
+            "sPhaseType": cs_phase_types[i],
+            "sSecondDepName": s_second_dep_name,
+            "fSecondDepValue": float(af_second_dep_values[i]),
+            "bUseIsobaricData": b_use_isobaric_data
+        }
+
+        if f_phase % 1 != 0:  # Indicates a phase change
+            af_property[i] = self.find_closest_valid_matter_entry(t_parameters)
+            continue
+
+        o_error = t_errors.get((i_substance, cs_phase_types[i], bool(ab_two_dependencies[i])))
+        if o_error is not None:
+            raise o_error
+
+        raise ValueError(f"No valid value for {s_property} of {s_substance} in {cs_phase_types[i]} phase.")
+
+    return af_property
+
+
+def get_property_interpolation(self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type,
+                               b_use_isobaric_data=True):
+    """
+    Returns the interpolation of a substance property from the interpolation
+    cache of the matter table, creating it on first use.
+
+    Args:
+        s_substance (str): Substance name.
+        s_property (str): Desired property.
+        s_first_dep_name (str): First dependency name.
+        s_second_dep_name (str): Second dependency name, None for properties
+            depending only on the first dependency.
+        s_phase_type (str): Phase type ('solid', 'liquid', 'gas', 'supercritical').
+        b_use_isobaric_data (bool): Use isobaric data if True; otherwise, use isochoric data.
+
+    Returns:
+        dict: hInterpolation, the interpolation function, and mfLimits, the
+        [min, max] range of each dependency.
+    """
+    if getattr(self, "o_interpolator_cache", None) is None:
+        self.o_interpolator_cache = InterpolatorCache()
+
+    x_key = (s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type, b_use_isobaric_data)
+
+    t_interpolation = self.o_interpolator_cache.get(x_key)
+    if t_interpolation is None:
+        t_interpolation, i_bytes = _create_property_interpolation(
+            self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type, b_use_isobaric_data
+        )
+        self.o_interpolator_cache.put(x_key, t_interpolation, i_bytes)
+
+    return t_interpolation
+
+
+def preload_property_interpolations(self, cs_properties=("Density", "Heat Capacity", "Thermal Conductivity", "Dynamic Viscosity"),
+                                    cs_substances=None):
+    """
+    Creates the temperature and pressure dependent interpolations of the
+    given properties for all phases of the substances with NIST data, so no
+    interpolation has to be created during the simulation.
+
+    Args:
+        cs_properties (tuple): Properties to create interpolations for.
+        cs_substances (list): Substances to create interpolations for,
+            defaults to all substances with individual data files.
+    """
+    if cs_substances is None:
+        cs_substances = [s for s, tx in self.ttx_matter.items() if tx.get("bIndividualFile")]
+
+    for s_substance in cs_substances:
+        for s_phase_type in ("solid", "liquid", "gas", "supercritical"):
+            for s_property in cs_properties:
+                try:
+                    get_property_interpolation(self, s_substance, s_property, "Temperature", "Pressure", s_phase_type)
+                except (ValueError, KeyError):
+                    # Not every substance has data for every phase or property
+                    continue
+
+
+def get_property_grid(self, s_substance, s_property, s_phase_type, b_use_isobaric_data=True):
+    """
+    Returns the regular (temperature, log10 pressure) grid of a substance
+    property created by build_property_grids.
+
+    Returns:
+        PropertyGrid: The grid, or None if no grid was built for the property.
+    """
+    t_property_grids = getattr(self, "t_property_grids", None)
+    if not t_property_grids:
+        return None
+
+    return t_property_grids.get((s_substance, s_property, s_phase_type, b_use_isobaric_data))
+
+
+def build_property_grids(self, cs_properties=("Density", "Heat Capacity", "Thermal Conductivity", "Dynamic Viscosity"),
+                         cs_substances=None, i_temperature_points=256, i_pressure_points=256):
+    """
+    Preprocessing stage resampling the temperature and pressure dependent
+    NIST data of the given properties onto regular grids, see PropertyGrid.
+    Afterwards find_property and find_properties use the grids for all
+    temperature and pressure dependent lookups of these properties.
+
+    If the matter table has a cache directory (sCacheDirectory), the grids
+    are stored there and only rebuilt if the underlying data changed.
+
+    Args:
+        cs_properties (tuple): Properties to create grids for.
+        cs_substances (list): Substances to create grids for, defaults to all
+            substances with individual data files.
+        i_temperature_points (int): Number of grid points in temperature.
+        i_pressure_points (int): Number of grid points in log10 pressure.
+    """
+    if getattr(self, "t_property_grids", None) is None:
+        self.t_property_grids = {}
+
+    if cs_substances is None:
+        cs_substances = [s for s, tx in self.ttx_matter.items() if tx.get("bIndividualFile")]
+
+    s_cache_dir = getattr(self, "sCacheDirectory", None)
+
+    for s_substance in cs_substances:
+        for s_phase_type in ("solid", "liquid", "gas", "supercritical"):
+            for s_property in cs_properties:
+                try:
+                    af_data, _ = _get_property_data(
+                        self, s_substance, s_property, "Temperature", "Pressure", s_phase_type, True
+                    )
+                except (ValueError, KeyError):
+                    # Not every substance has data for every phase or property
+                    continue
+
+                o_hash = hashlib.sha256(np.ascontiguousarray(af_data).tobytes())
+                o_hash.update(f"{i_temperature_points}x{i_pressure_points}".encode())
+                s_fingerprint = o_hash.hexdigest()
+
+                s_file_path = None
+                o_grid = None
+                if s_cache_dir is not None:
+                    s_file_path = os.path.join(
+                        s_cache_dir, "PropertyGrids", f"{s_substance}_{s_phase_type}_{s_property.replace(' ', '')}.npz"
+                    )
+                    o_grid = PropertyGrid.load(s_file_path, s_fingerprint)
+
+                if o_grid is None:
+                    o_grid = PropertyGrid.from_scattered_data(
+                        af_data[:, 1], af_data[:, 2], af_data[:, 0], i_temperature_points, i_pressure_points
+                    )
+                    if o_grid is None:
+                        continue
+
+                    if s_file_path is not None:
+                        o_grid.save(s_file_path, s_fingerprint)
+
+                self.t_property_grids[(s_substance, s_property, s_phase_type, True)] = o_grid
+
+
+def _get_property_data(self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type,
+                       b_use_isobaric_data):
+    """
+    Extracts the valid data points of a substance property from the NIST
+    data.
+
+    Returns:
+        tuple: Array with the property in the first column followed by the
+        dependencies, and the [min, max] limits of each dependency.
+    """
     # Fetch matter data for the substance
     tx_matter_for_substance = self.ttx_matter[s_substance]
 
     # Determine the type of data
     s_type_struct = "tIsobaricData" if b_use_isobaric_data else "tIsochoricData"
-    s_property = f"Isobaric {s_property}" if b_use_isobaric_data and s_property == "Heat Capacity" else s_property
+    if s_property == "Heat Capacity":
+        s_property = "Isobaric Heat Capacity" if b_use_isobaric_data else "Isochoric Heat Capacity"
 
     s_phase_struct_name = {
         "solid": "tSolid",
@@ -74,21 +368,12 @@ def find_property(self, t_parameters):
     if i_column_first is None:
         raise ValueError(f"Cannot find dependency {s_first_dep_name} for substance {s_substance}.")
 
-    f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Min"]
-    f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_first_dep_name_no_spaces}"]["Max"]
-
-    if f_first_dep_value > f_max:
-        f_first_dep_value = f_max
-    elif f_first_dep_value < f_min:
-        f_first_dep_value = f_min
+    tt_extremes = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"]
+    t_first_extremes = tt_extremes[f"t{s_first_dep_name_no_spaces}"]
+    mf_limits = [[t_first_extremes["Min"], t_first_extremes["Max"]]]
 
-    if i_dependencies == 1:
+    if s_second_dep_name is None:
         af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first]]
-        af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
-        af_temporary = np.unique(af_temporary, axis=0)
-
-        h_interpolation = interp1d(af_temporary[:, 1], af_temporary[:, 0], bounds_error=False, fill_value="extrapolate")
-        f_property = h_interpolation(f_first_dep_value)
 
     else:
         s_second_dep_name_no_spaces = s_second_dep_name.replace(" ", "")
@@ -96,24 +381,47 @@ def find_property(self, t_parameters):
         if i_column_second is None:
             raise ValueError(f"Cannot find dependency {s_second_dep_name} for substance {s_substance}.")
 
-        f_min = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Min"]
-        f_max = tx_matter_for_substance_and_type_and_aggregate["ttExtremes"][f"t{s_second_dep_name_no_spaces}"]["Max"]
-
-        if f_second_dep_value > f_max:
-            f_second_dep_value = f_max
-        elif f_second_dep_value < f_min:
-            f_second_dep_value = f_min
+        t_second_extremes = tt_extremes[f"t{s_second_dep_name_no_spaces}"]
+        mf_limits.append([t_second_extremes["Min"], t_second_extremes["Max"]])
 
         af_temporary = tx_matter_for_substance_and_type_and_aggregate["mfData"][:, [i_column, i_column_first, i_column_second]]
-        af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
-        af_temporary = np.unique(af_temporary, axis=0)
 
-        h_interpolation = RegularGridInterpolator(
-            (af_temporary[:, 1], af_temporary[:, 2]), af_temporary[:, 0], bounds_error=False, fill_value=None
-        )
-        f_property = h_interpolation([f_first_dep_value, f_second_dep_value])
+    af_temporary = af_temporary[~np.isnan(af_temporary).any(axis=1)]
+    af_temporary = np.unique(af_temporary, axis=0)
 
-    if f_property is None or np.isnan(f_property):
-        raise ValueError(f"No valid value for {s_property} of {s_substance} in {s_phase_type} phase.")
+    return af_temporary, mf_limits
 
-    return f_property
+
+def _create_property_interpolation(self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type,
+                                   b_use_isobaric_data):
+    """
+    Creates the interpolation of a substance property from the NIST data.
+
+    Returns:
+        tuple: The interpolation dict (see get_property_interpolation) and
+        its estimated memory use in bytes.
+    """
+    af_temporary, mf_limits = _get_property_data(
+        self, s_substance, s_property, s_first_dep_name, s_second_dep_name, s_phase_type, b_use_isobaric_data
+    )
+
+    if s_second_dep_name is None:
+        h_interpolation = interp1d(af_temporary[:, 1], af_temporary[:, 0], bounds_error=False, fill_value="extrapolate")
+
+        # Copies of the data points held by the interpolation
+        i_bytes = 2 * af_temporary.nbytes
+
+    else:
+        # The NIST data points are scattered in the (first, second)
+        # dependency plane, so a triangulation based interpolation is used.
+        # Points outside of the data return NaN, just like MATLAB's
+        # scatteredInterpolant with extrapolation method 'none'. Rescaling
+        # keeps the triangulation sane for temperatures in K and pressures
+        # in Pa.
+        h_interpolation = LinearNDInterpolator(af_temporary[:, 1:3], af_temporary[:, 0], rescale=True)
+
+        # Points, values and roughly two simplices with vertices and
+        # neighbors per data point
+        i_bytes = af_temporary.nbytes + 2 * af_temporary.shape[0] * 6 * 4
+
+    return {"hInterpolation": h_interpolation, "mfLimits": mf_limits}, i_bytes
@@ -25,37 +25,20 @@ class MatterTable:
         if np.isnan(ar_partial_mass).any():
             raise ValueError("Invalid entries in mass vector.")
 
-        i_num_indices = len(ai_indices)
-
-        # Initialize an array for storing property values
-        af_property = np.zeros(i_num_indices)
-
-        for i, index in enumerate(ai_indices):
-            # Prepare the parameter dictionary for find_property
-            t_parameters = {
-                "sSubstance": self.cs_substances[index],
-                "sProperty": s_property,
-                "sFirstDepName": "Temperature",
-                "fFirstDepValue": f_temperature,
-                "sPhaseType": cs_phase[round(ai_phase[index])],
-                "sSecondDepName": "Pressure",
-                "fSecondDepValue": af_partial_pressures[index],
-                "bUseIsobaricData": b_use_isobaric_data
-            }
-
-            try:
-                af_property[i] = self.find_property(t_parameters)
-            except Exception as s_msg:
-                # Handle phase transition and find closest valid matter entry
-                i_phase = self.determine_phase(
-                    t_parameters["sSubstance"],
-                    f_temperature,
-                    af_partial_pressures[index]
-                )
-                if i_phase % 1 != 0:  # Indicates a phase change
-                    af_property[i] = self.find_closest_valid_matter_entry(t_parameters)
-                else:
-                    raise s_msg
+        ai_indices = np.asarray(ai_indices, dtype=int)
+
+        # Look up the property of all substances in one batch, the entries
+        # outside of the data fall back to the closest valid matter entry
+        af_property = self.find_properties(
+            s_property,
+            ai_indices,
+            f_temperature,
+            np.asarray(af_partial_pressures, dtype=float)[ai_indices],
+            [cs_phase[round(ai_phase[index])] for index in ai_indices],
+            "Temperature",
+            "Pressure",
+            b_use_isobaric_data
+        )
 
         # Ensure there are no NaN values in the property array
         if np.isnan(af_property).any():
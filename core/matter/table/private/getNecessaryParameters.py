@@ -1,3 +1,4 @@
+import weakref
 import numpy as np
 
 class MatterTable:
@@ -5,10 +6,49 @@ class MatterTable:
         """
         Determines necessary parameters for calculations based on phase, flow, or direct inputs.
 
+        For a phase or flow the resolved parameters are cached per object. They
+        are reused as long as the state version of the object (iStateVersion,
+        incremented on every change of its mass, temperature or pressure), the
+        version of its compound masses and the simulation time are unchanged,
+        so all property calculations of a tick share one resolution.
+
         :param args: Either a single object (phase or flow) or a set of parameters (state, mass, etc.)
         :return: Tuple containing fTemperature, arPartialMass, csPhase, aiPhase, aiIndices,
                  afPartialPressures, tbReference, sMatterState, bUseIsobaricData
         """
+        if len(args) != 1 or getattr(args[0], "iStateVersion", None) is None:
+            return self._resolve_necessary_parameters(*args)
+
+        obj = args[0]
+
+        if getattr(self, "tNecessaryParameterCache", None) is None:
+            self.tNecessaryParameterCache = weakref.WeakKeyDictionary()
+
+        # The pressure of a phase changes with the time since its last mass
+        # update, so the resolution is only valid within one tick
+        oTimer = getattr(obj, "oTimer", None)
+        xKey = (
+            obj.iStateVersion,
+            getattr(getattr(obj, "arCompoundMass", None), "iVersion", None),
+            oTimer.fTime if oTimer is not None else None,
+        )
+
+        tEntry = self.tNecessaryParameterCache.get(obj)
+        if tEntry is not None and tEntry[0] == xKey:
+            return tEntry[1]
+
+        tParameters = self._resolve_necessary_parameters(obj)
+        self.tNecessaryParameterCache[obj] = (xKey, tParameters)
+
+        return tParameters
+
+    # Name used by some of the property calculations
+    getNecessaryParameters = get_necessary_parameters
+
+    def _resolve_necessary_parameters(self, *args):
+        """
+        Resolves the necessary parameters without caching, see get_necessary_parameters.
+        """
         tbReference = {"bPhase": False, "bFlow": False, "bNone": False}
 
         if len(args) == 1:
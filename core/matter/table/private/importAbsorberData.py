@@ -59,3 +59,6 @@ class MatterTable:
             # Parse absorption enthalpy
             self.ttxMatter[substance]["tAbsorberParameters"]["mfAbsorptionEnthalpy"][self.tiN2I["CO2"]] = t_data["fAdsorptionEnthalpy_CO2"]
             self.ttxMatter[substance]["tAbsorberParameters"]["mfAbsorptionEnthalpy"][self.tiN2I["H2O"]] = t_data["fAdsorptionEnthalpy_H2O"]
+
+        # The stacked Toth parameters of all absorbers are rebuilt on next use
+        self.tTothParameters = None
@@ -1,12 +1,20 @@
 import csv
+import os
+import sys
 import numpy as np
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from matterTableCache import hash_source_files, read_matter_table_cache, write_matter_table_cache
 
-def import_matter_data(s_target):
+def import_matter_data(s_target, s_cache_dir=None):
     """
     Imports substance data from CSV files into a structured format.
     
     Parameters:
     s_target (str): 'MatterData' to import the main data file, or the name of a specific substance.
+    s_cache_dir (str): Directory of the binary matter table cache. If given,
+        the NIST data of a substance is read from the cache as long as the
+        hashes of its source CSV files match, otherwise the CSV files are
+        parsed and the cache is rewritten. None always parses the CSV files.
     
     Returns:
     dict: Structured data containing substance properties and related metadata.
@@ -57,6 +65,18 @@ def import_matter_data(s_target):
     else:
         # Import specific substance files
         info_file_path = f'+matter/+data/+NIST/{s_target}_Information_File.csv'.replace('/', '\\')
+
+        cs_source_files = [info_file_path]
+        for data_type in ["Isochoric", "Isobaric"]:
+            cs_source_files.append(f'+matter/+data/+NIST/{s_target}_{data_type}_HeaderFile.csv'.replace('/', '\\'))
+            cs_source_files.append(f'+matter/+data/+NIST/{s_target}_{data_type}_DataFile.csv'.replace('/', '\\'))
+
+        if s_cache_dir is not None:
+            s_hash = hash_source_files(cs_source_files)
+            tx_cached = read_matter_table_cache(s_cache_dir, s_target, s_hash)
+            if tx_cached is not None:
+                return tx_cached
+
         with open(info_file_path, 'r') as file:
             lines = file.readlines()
             column_names = lines[0].strip().split(';')
@@ -99,4 +119,7 @@ def import_matter_data(s_target):
                 phase_data = raw_data[raw_data[:, ttx_import_matter[f"t{data_type}Data"]["tColumns"]["Phase"]] == phase_id]
                 ttx_import_matter[f"t{data_type}Data"]["Phases"][phase_name] = phase_data
 
+        if s_cache_dir is not None:
+            write_matter_table_cache(s_cache_dir, s_target, ttx_import_matter, s_hash)
+
     return ttx_import_matter
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+
+
+class InterpolatorCache:
+    """
+    Least recently used cache for the property interpolations of the matter
+    table. Every entry stores an interpolation object together with an
+    estimate of its memory use. If the total exceeds the memory limit, the
+    least recently used interpolations are removed.
+    """
+
+    def __init__(self, i_max_bytes=256 * 1024 ** 2):
+        """
+        Args:
+            i_max_bytes (int): Memory limit for all cached interpolations in
+                bytes. None disables the limit.
+        """
+        self.i_max_bytes = i_max_bytes
+        self.i_bytes = 0
+        self.i_hits = 0
+        self.i_misses = 0
+        self.i_evictions = 0
+
+        # Key -> (interpolation, estimated size in bytes)
+        self.t_entries = OrderedDict()
+
+    def get(self, x_key):
+        """
+        Returns a cached interpolation and marks it as recently used.
+
+        Args:
+            x_key (tuple): Key of the interpolation.
+
+        Returns:
+            The interpolation object or None if it is not cached.
+        """
+        t_entry = self.t_entries.get(x_key)
+
+        if t_entry is None:
+            self.i_misses += 1
+            return None
+
+        self.i_hits += 1
+        self.t_entries.move_to_end(x_key)
+        return t_entry[0]
+
+    def put(self, x_key, o_interpolation, i_bytes):
+        """
+        Adds an interpolation to the cache.
+
+        Args:
+            x_key (tuple): Key of the interpolation.
+            o_interpolation: Interpolation object.
+            i_bytes (int): Estimated memory use of the interpolation.
+        """
+        if x_key in self.t_entries:
+            self.i_bytes -= self.t_entries.pop(x_key)[1]
+
+        self.t_entries[x_key] = (o_interpolation, i_bytes)
+        self.i_bytes += i_bytes
+
+        # The newest entry is always kept, even if it exceeds the limit alone
+        while self.i_max_bytes is not None and self.i_bytes > self.i_max_bytes and len(self.t_entries) > 1:
+            _, (_, i_evicted_bytes) = self.t_entries.popitem(last=False)
+            self.i_bytes -= i_evicted_bytes
+            self.i_evictions += 1
+
+    def clear(self):
+        """
+        Removes all cached interpolations, the statistics are kept.
+        """
+        self.t_entries.clear()
+        self.i_bytes = 0
+
+    def get_statistics(self):
+        """
+        Returns the usage statistics of the cache.
+
+        Returns:
+            dict: Number of entries, memory use, hits, misses and evictions.
+        """
+        return {
+            "iEntries": len(self.t_entries),
+            "iBytes": self.i_bytes,
+            "iHits": self.i_hits,
+            "iMisses": self.i_misses,
+            "iEvictions": self.i_evictions,
+        }
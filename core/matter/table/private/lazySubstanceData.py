@@ -0,0 +1,57 @@
+class LazySubstanceData(dict):
+    """
+    Matter table entry of a substance with individual NIST data files. The
+    substance fields from MatterData.csv are available immediately, the
+    heavy tIsobaricData and tIsochoricData arrays are only imported when
+    they are accessed for the first time, e.g. by find_property or
+    determine_phase.
+    """
+
+    csLazyKeys = ("tIsobaricData", "tIsochoricData")
+
+    def __init__(self, txFields, hImport, *args):
+        """
+        Args:
+            txFields (dict): Fields of the substance that are known without
+                importing the NIST data.
+            hImport (function): Function returning the NIST data of the
+                substance as a dict, e.g. import_matter_data. Must be a module
+                level function, so the entry can be pickled.
+            *args: Arguments passed to hImport.
+        """
+        super().__init__(txFields)
+        self.hImport = hImport
+        self.xArgs = args
+        self.bLoaded = False
+
+    def load(self):
+        """
+        Imports the NIST data of the substance, if that was not done yet.
+        Fields already present in the entry are not overwritten.
+        """
+        if self.bLoaded:
+            return
+
+        self.bLoaded = True
+        for sKey, xValue in self.hImport(*self.xArgs).items():
+            if not super().__contains__(sKey):
+                super().__setitem__(sKey, xValue)
+
+    def __missing__(self, sKey):
+        if sKey in self.csLazyKeys and not self.bLoaded:
+            self.load()
+            return super().__getitem__(sKey)
+
+        raise KeyError(sKey)
+
+    def __contains__(self, sKey):
+        if sKey in self.csLazyKeys:
+            self.load()
+
+        return super().__contains__(sKey)
+
+    def get(self, sKey, xDefault=None):
+        if sKey in self.csLazyKeys:
+            self.load()
+
+        return super().get(sKey, xDefault)
@@ -0,0 +1,152 @@
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+
+# Version of the binary format, stored in every index header. Caches written
+# with another version are regenerated.
+I_CACHE_VERSION = 1
+
+
+def hash_source_files(cs_file_paths):
+    """
+    Computes a combined hash over the contents of the source files of a
+    substance.
+
+    Parameters:
+    cs_file_paths (list): Paths of the source files.
+
+    Returns:
+    str: Hex digest of the file contents, in the given file order.
+    """
+    o_hash = hashlib.sha256()
+
+    for s_file_path in cs_file_paths:
+        o_hash.update(os.path.basename(s_file_path).encode())
+        with open(s_file_path, 'rb') as file:
+            for x_chunk in iter(lambda: file.read(1024 ** 2), b''):
+                o_hash.update(x_chunk)
+
+    return o_hash.hexdigest()
+
+
+def write_matter_table_cache(s_cache_dir, s_substance, tx_substance, s_hash):
+    """
+    Writes the imported NIST data of a substance to the binary matter table
+    cache. Every (data type, phase) array is stored as a contiguous float64
+    block in '<substance>.bin', its position and shape together with all
+    other substance fields are stored in the index header '<substance>.json'.
+
+    Parameters:
+    s_cache_dir (str): Directory of the cache.
+    s_substance (str): Name of the substance.
+    tx_substance (dict): Imported substance data, see import_matter_data.
+    s_hash (str): Hash of the source files, see hash_source_files.
+    """
+    os.makedirs(s_cache_dir, exist_ok=True)
+    s_data_path = os.path.join(s_cache_dir, f"{s_substance}.bin")
+    s_index_path = os.path.join(s_cache_dir, f"{s_substance}.json")
+
+    t_index = {"iVersion": I_CACHE_VERSION, "sHash": s_hash, "txFields": {}, "ttData": {}}
+
+    # The index is replaced last, so an interrupted write leaves a stale
+    # header behind that does not match the data file. Every writer uses its
+    # own temporary files, so parallel processes regenerating the same cache
+    # do not interfere, the last replace wins with identical content.
+    i_file, s_data_tmp_path = tempfile.mkstemp(dir=s_cache_dir, prefix=f"{s_substance}.bin.", suffix='.tmp')
+    try:
+        with os.fdopen(i_file, 'wb') as file:
+            i_offset = 0
+            for s_key, x_value in tx_substance.items():
+                if not (s_key.startswith('t') and s_key.endswith('Data') and isinstance(x_value, dict)):
+                    t_index["txFields"][s_key] = x_value
+                    continue
+
+                t_index["ttData"][s_key] = {
+                    "tColumns": x_value["tColumns"],
+                    "tUnits": x_value["tUnits"],
+                    "tBlocks": {},
+                }
+
+                for s_phase, mf_data in x_value["Phases"].items():
+                    mf_data = np.ascontiguousarray(mf_data, dtype=np.float64)
+                    file.write(mf_data.tobytes())
+
+                    t_index["ttData"][s_key]["tBlocks"][s_phase] = [i_offset, *mf_data.shape]
+                    i_offset += mf_data.nbytes
+
+        os.replace(s_data_tmp_path, s_data_path)
+    except BaseException:
+        _remove_silently(s_data_tmp_path)
+        raise
+
+    i_file, s_index_tmp_path = tempfile.mkstemp(dir=s_cache_dir, prefix=f"{s_substance}.json.", suffix='.tmp')
+    try:
+        with os.fdopen(i_file, 'w') as file:
+            json.dump(t_index, file)
+
+        os.replace(s_index_tmp_path, s_index_path)
+    except BaseException:
+        _remove_silently(s_index_tmp_path)
+        raise
+
+
+def _remove_silently(s_path):
+    try:
+        os.remove(s_path)
+    except OSError:
+        pass
+
+
+def read_matter_table_cache(s_cache_dir, s_substance, s_hash):
+    """
+    Opens the binary matter table cache of a substance. The data arrays are
+    read-only memory maps, so all processes opening the same cache share one
+    copy of the data in the page cache.
+
+    Parameters:
+    s_cache_dir (str): Directory of the cache.
+    s_substance (str): Name of the substance.
+    s_hash (str): Hash of the current source files. If it differs from the
+        hash the cache was written with, the cache is considered stale.
+
+    Returns:
+    dict: The substance data in the format of import_matter_data, or None if
+        there is no valid cache.
+    """
+    s_data_path = os.path.join(s_cache_dir, f"{s_substance}.bin")
+    s_index_path = os.path.join(s_cache_dir, f"{s_substance}.json")
+
+    if not (os.path.exists(s_index_path) and os.path.exists(s_data_path)):
+        return None
+
+    try:
+        with open(s_index_path, 'r') as file:
+            t_index = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if t_index.get("iVersion") != I_CACHE_VERSION or t_index.get("sHash") != s_hash:
+        return None
+
+    i_file_size = os.path.getsize(s_data_path)
+    tx_substance = dict(t_index["txFields"])
+
+    for s_key, t_data in t_index["ttData"].items():
+        tx_substance[s_key] = {"tColumns": t_data["tColumns"], "tUnits": t_data["tUnits"], "Phases": {}}
+
+        for s_phase, (i_offset, i_rows, i_columns) in t_data["tBlocks"].items():
+            if i_offset + i_rows * i_columns * 8 > i_file_size:
+                return None
+
+            if i_rows * i_columns == 0:
+                # Empty arrays cannot be memory mapped
+                mf_data = np.empty((i_rows, i_columns))
+            else:
+                mf_data = np.memmap(s_data_path, dtype=np.float64, mode='r', offset=i_offset,
+                                    shape=(i_rows, i_columns))
+
+            tx_substance[s_key]["Phases"][s_phase] = mf_data
+
+    return tx_substance
@@ -0,0 +1,236 @@
+import os
+import tempfile
+import numpy as np
+from scipy.interpolate import LinearNDInterpolator
+from scipy.ndimage import distance_transform_edt
+
+
+class PropertyGrid:
+    """
+    Property of a substance in one phase, resampled from the scattered NIST
+    data points onto a regular (temperature, log10 pressure) grid. Cells
+    outside of the data are marked invalid. The interpolation is index
+    arithmetic instead of a triangulation. For the closest valid cell, used
+    by the phase identification, the index of the closest valid cell of
+    every cell is computed with a distance transform on first use.
+    """
+
+    def __init__(self, f_min_temperature, f_max_temperature, f_min_log_pressure, f_max_log_pressure, mf_values,
+                 ai_nearest=None):
+        """
+        Args:
+            f_min_temperature (float): Temperature of the first grid row.
+            f_max_temperature (float): Temperature of the last grid row.
+            f_min_log_pressure (float): log10 of the pressure of the first grid column.
+            f_max_log_pressure (float): log10 of the pressure of the last grid column.
+            mf_values (array): Property values on the grid, NaN for invalid cells.
+            ai_nearest (array): Flat index of the closest valid cell for every
+                cell, computed on first use if not given.
+        """
+        self.f_min_temperature = float(f_min_temperature)
+        self.f_max_temperature = float(f_max_temperature)
+        self.f_min_log_pressure = float(f_min_log_pressure)
+        self.f_max_log_pressure = float(f_max_log_pressure)
+        self.mf_values = np.asarray(mf_values, dtype=float)
+        self.ab_valid = ~np.isnan(self.mf_values)
+
+        i_rows, i_columns = self.mf_values.shape
+        self.f_temperature_step = (self.f_max_temperature - self.f_min_temperature) / max(i_rows - 1, 1)
+        self.f_log_pressure_step = (self.f_max_log_pressure - self.f_min_log_pressure) / max(i_columns - 1, 1)
+
+        self._ai_nearest = None if ai_nearest is None else np.asarray(ai_nearest, dtype=np.int64)
+
+    @property
+    def ai_nearest(self):
+        """
+        Flat index of the closest valid cell for every cell.
+        """
+        if self._ai_nearest is None:
+            # Distances are measured in the range normalized (temperature,
+            # log10 pressure) space, independent of the resolution
+            i_rows, i_columns = self.mf_values.shape
+            af_sampling = (1 / max(i_rows - 1, 1), 1 / max(i_columns - 1, 1))
+            ai_indices = distance_transform_edt(~self.ab_valid, sampling=af_sampling, return_distances=False,
+                                                return_indices=True)
+            self._ai_nearest = np.ravel_multi_index(tuple(ai_indices), self.mf_values.shape)
+
+        return self._ai_nearest
+
+    @classmethod
+    def from_scattered_data(cls, af_temperature, af_pressure, af_values, i_temperature_points=256,
+                            i_pressure_points=256):
+        """
+        Resamples scattered data points onto a regular grid spanning their
+        temperature and pressure range.
+
+        Args:
+            af_temperature (array): Temperatures of the data points.
+            af_pressure (array): Pressures of the data points.
+            af_values (array): Property values of the data points.
+            i_temperature_points (int): Number of grid points in temperature.
+            i_pressure_points (int): Number of grid points in log10 pressure.
+
+        Returns:
+            PropertyGrid: The resampled grid, or None if the data does not
+            span a two dimensional area.
+        """
+        ab_use = (af_pressure > 0) & ~np.isnan(af_temperature) & ~np.isnan(af_pressure) & ~np.isnan(af_values)
+        af_temperature = af_temperature[ab_use]
+        af_log_pressure = np.log10(af_pressure[ab_use])
+        af_values = af_values[ab_use]
+
+        if (af_temperature.size < 3 or np.ptp(af_temperature) == 0 or np.ptp(af_log_pressure) == 0):
+            return None
+
+        af_grid_temperature = np.linspace(af_temperature.min(), af_temperature.max(), i_temperature_points)
+        af_grid_log_pressure = np.linspace(af_log_pressure.min(), af_log_pressure.max(), i_pressure_points)
+
+        try:
+            h_interpolation = LinearNDInterpolator(
+                np.column_stack((af_temperature, af_log_pressure)), af_values, rescale=True
+            )
+        except Exception:
+            # Degenerate point sets, e.g. all points on one line
+            return None
+
+        mf_grid_temperature, mf_grid_log_pressure = np.meshgrid(af_grid_temperature, af_grid_log_pressure, indexing="ij")
+        mf_values = h_interpolation(mf_grid_temperature, mf_grid_log_pressure)
+
+        if np.isnan(mf_values).all():
+            return None
+
+        return cls(af_grid_temperature[0], af_grid_temperature[-1], af_grid_log_pressure[0], af_grid_log_pressure[-1],
+                   mf_values)
+
+    def _get_fractional_indices(self, af_temperature, af_pressure):
+        i_rows, i_columns = self.mf_values.shape
+
+        af_row = (np.asarray(af_temperature, dtype=float) - self.f_min_temperature) / self.f_temperature_step
+        with np.errstate(divide="ignore"):
+            af_log_pressure = np.log10(np.asarray(af_pressure, dtype=float))
+        af_column = (af_log_pressure - self.f_min_log_pressure) / self.f_log_pressure_step
+
+        return np.clip(af_row, 0, i_rows - 1), np.clip(af_column, 0, i_columns - 1)
+
+    def evaluate(self, af_temperature, af_pressure):
+        """
+        Bilinear interpolation on the grid. Values outside of the grid are
+        limited to its edges.
+
+        Args:
+            af_temperature (array): Temperatures.
+            af_pressure (array): Pressures.
+
+        Returns:
+            array: Interpolated values, NaN where an invalid cell contributes
+            to the interpolation.
+        """
+        i_rows, i_columns = self.mf_values.shape
+        af_row, af_column = self._get_fractional_indices(af_temperature, af_pressure)
+
+        ai_row = np.minimum(af_row.astype(np.int64), max(i_rows - 2, 0))
+        ai_column = np.minimum(af_column.astype(np.int64), max(i_columns - 2, 0))
+        af_row_weight = af_row - ai_row
+        af_column_weight = af_column - ai_column
+
+        af_result = np.zeros(np.broadcast(af_row, af_column).shape)
+        ab_invalid = np.zeros(af_result.shape, dtype=bool)
+
+        for i_row_offset, af_row_factor in ((0, 1 - af_row_weight), (1, af_row_weight)):
+            for i_column_offset, af_column_factor in ((0, 1 - af_column_weight), (1, af_column_weight)):
+                af_weight = af_row_factor * af_column_factor
+                af_corner = self.mf_values[np.minimum(ai_row + i_row_offset, i_rows - 1),
+                                           np.minimum(ai_column + i_column_offset, i_columns - 1)]
+
+                ab_corner_invalid = np.isnan(af_corner) & (af_weight > 0)
+                ab_invalid |= ab_corner_invalid
+                af_result += np.where(ab_corner_invalid | (af_weight == 0), 0, af_corner * af_weight)
+
+        af_result[ab_invalid] = np.nan
+        return af_result
+
+    def find_nearest_valid(self, af_temperature, af_pressure):
+        """
+        Returns the value of the valid grid cell closest to the given points.
+
+        Args:
+            af_temperature (array): Temperatures.
+            af_pressure (array): Pressures.
+
+        Returns:
+            array: Values of the closest valid cells.
+        """
+        af_row, af_column = self._get_fractional_indices(af_temperature, af_pressure)
+        ai_cell = np.ravel_multi_index((np.rint(af_row).astype(np.int64), np.rint(af_column).astype(np.int64)),
+                                       self.mf_values.shape)
+
+        return self.mf_values.ravel()[self.ai_nearest.ravel()[ai_cell]]
+
+    def save(self, s_file_path, s_fingerprint, b_nearest=False):
+        """
+        Stores the grid in a .npz file.
+
+        Args:
+            s_file_path (str): Path of the file.
+            s_fingerprint (str): Fingerprint of the source data, see load.
+            b_nearest (bool): Also store the closest valid cells, computing
+                them if necessary. Otherwise they are only stored if they
+                were already computed.
+        """
+        ai_nearest = self.ai_nearest if b_nearest else self._ai_nearest
+        if ai_nearest is None:
+            ai_nearest = np.zeros(0, dtype=np.int64)
+
+        s_directory = os.path.dirname(s_file_path) or "."
+        os.makedirs(s_directory, exist_ok=True)
+
+        # Every writer uses its own temporary file, so parallel workers saving
+        # the same grid do not interfere. The name ends with .npz, otherwise
+        # np.savez would append it.
+        i_file, s_temporary_path = tempfile.mkstemp(dir=s_directory, prefix=os.path.basename(s_file_path) + ".",
+                                                    suffix=".npz")
+        try:
+            with os.fdopen(i_file, "wb") as file:
+                np.savez(
+                    file,
+                    af_limits=np.array([self.f_min_temperature, self.f_max_temperature,
+                                        self.f_min_log_pressure, self.f_max_log_pressure]),
+                    mf_values=self.mf_values,
+                    ai_nearest=ai_nearest,
+                    s_fingerprint=np.array(s_fingerprint),
+                )
+
+            os.replace(s_temporary_path, s_file_path)
+        except BaseException:
+            try:
+                os.remove(s_temporary_path)
+            except OSError:
+                pass
+            raise
+
+    @classmethod
+    def load(cls, s_file_path, s_fingerprint):
+        """
+        Loads a grid stored with save.
+
+        Args:
+            s_file_path (str): Path of the file.
+            s_fingerprint (str): Fingerprint of the current source data.
+
+        Returns:
+            PropertyGrid: The grid, or None if the file does not exist or was
+            created from other source data.
+        """
+        if not os.path.exists(s_file_path):
+            return None
+
+        try:
+            with np.load(s_file_path) as t_file:
+                if str(t_file["s_fingerprint"]) != s_fingerprint:
+                    return None
+
+                # Grids saved before the closest cells were needed store none
+                ai_nearest = t_file["ai_nearest"]
+                return cls(*t_file["af_limits"], t_file["mf_values"], ai_nearest if ai_nearest.size else None)
+        except (OSError, ValueError, KeyError):
+            return None
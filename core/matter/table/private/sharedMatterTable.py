@@ -0,0 +1,128 @@
+import numpy as np
+from multiprocessing import shared_memory
+
+# Alignment of the arrays inside the shared memory block in bytes
+I_ALIGNMENT = 64
+
+
+class SharedArray:
+    """
+    Placeholder for a numpy array of a published matter table. It only
+    stores the position of the array in the list of shared arrays.
+    """
+
+    def __init__(self, iIndex):
+        self.iIndex = iIndex
+
+
+def publish_matter_table(oMT):
+    """
+    Copies all numeric arrays of a matter table into one shared memory
+    block. All other attributes are kept in a small, picklable state that is
+    sent to the worker processes together with the name of the block.
+
+    The caller owns the shared memory block and has to close and unlink it
+    once all workers are done.
+
+    Parameters:
+    oMT (Table): Matter table to publish. The NIST data of all substances is
+        imported first, so lazily loaded substances are shared as well.
+
+    Returns:
+    tuple: The SharedMemory object and the descriptor to pass to
+        attach_matter_table.
+    """
+    for txSubstance in oMT.ttxMatter.values():
+        if hasattr(txSubstance, 'load'):
+            txSubstance.load()
+
+    aoArrays = []
+    txState = {
+        sKey: _replace_arrays(xValue, aoArrays)
+        for sKey, xValue in oMT.__dict__.items()
+        # Interpolations are cheap to rebuild from the shared data and are
+        # created by each worker on first use, cached parameters belong to
+        # the phases of this process
+        if sKey not in ('o_interpolator_cache', 'oSharedMemory', 'tNecessaryParameterCache', 'oPropertyCache')
+    }
+
+    aiOffsets = []
+    iSize = 0
+    for afArray in aoArrays:
+        aiOffsets.append(iSize)
+        iSize += -(-afArray.nbytes // I_ALIGNMENT) * I_ALIGNMENT
+
+    oSharedMemory = shared_memory.SharedMemory(create=True, size=max(iSize, 1))
+
+    ttArrays = []
+    for afArray, iOffset in zip(aoArrays, aiOffsets):
+        afShared = np.ndarray(afArray.shape, dtype=afArray.dtype, buffer=oSharedMemory.buf, offset=iOffset)
+        afShared[...] = afArray
+        ttArrays.append((iOffset, afArray.shape, afArray.dtype.str))
+
+    tDescriptor = {
+        'sName': oSharedMemory.name,
+        'oClass': type(oMT),
+        'txState': txState,
+        'ttArrays': ttArrays,
+    }
+
+    return oSharedMemory, tDescriptor
+
+
+def attach_matter_table(tDescriptor):
+    """
+    Creates a read-only matter table view on a published shared memory
+    block without copying the arrays.
+
+    Parameters:
+    tDescriptor (dict): Descriptor returned by publish_matter_table.
+
+    Returns:
+    Table: Matter table whose arrays are read-only views of the shared
+        memory. The view keeps the block open in its oSharedMemory attribute.
+    """
+    # Worker processes share the resource tracker of the parent, so the
+    # block stays alive until the parent unlinks it
+    oSharedMemory = shared_memory.SharedMemory(name=tDescriptor['sName'])
+
+    aoArrays = []
+    for iOffset, tiShape, sDataType in tDescriptor['ttArrays']:
+        afArray = np.ndarray(tiShape, dtype=np.dtype(sDataType), buffer=oSharedMemory.buf, offset=iOffset)
+        afArray.flags.writeable = False
+        aoArrays.append(afArray)
+
+    oMT = tDescriptor['oClass'].__new__(tDescriptor['oClass'])
+    for sKey, xValue in tDescriptor['txState'].items():
+        setattr(oMT, sKey, _restore_arrays(xValue, aoArrays))
+
+    oMT.oSharedMemory = oSharedMemory
+    return oMT
+
+
+def _replace_arrays(xValue, aoArrays):
+    if isinstance(xValue, np.ndarray) and xValue.dtype.kind in 'biuf':
+        aoArrays.append(np.ascontiguousarray(xValue))
+        return SharedArray(len(aoArrays) - 1)
+
+    if isinstance(xValue, dict):
+        # Lazily loaded substances become plain dicts, their data is loaded
+        return {xKey: _replace_arrays(xItem, aoArrays) for xKey, xItem in xValue.items()}
+
+    if isinstance(xValue, list):
+        return [_replace_arrays(xItem, aoArrays) for xItem in xValue]
+
+    return xValue
+
+
+def _restore_arrays(xValue, aoArrays):
+    if isinstance(xValue, SharedArray):
+        return aoArrays[xValue.iIndex]
+
+    if isinstance(xValue, dict):
+        return {xKey: _restore_arrays(xItem, aoArrays) for xKey, xItem in xValue.items()}
+
+    if isinstance(xValue, list):
+        return [_restore_arrays(xItem, aoArrays) for xItem in xValue]
+
+    return xValue
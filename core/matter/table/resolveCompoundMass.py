@@ -1,4 +1,8 @@
+import sys
+import os
 import numpy as np
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from compoundMass import CompoundMass
 
 def resolve_compound_mass(self, af_mass, ar_compound_mass):
     """
@@ -7,17 +11,28 @@ def resolve_compound_mass(self, af_mass, ar_compound_mass):
 
     Args:
         af_mass (numpy.ndarray): Mass vector with compound masses.
-        ar_compound_mass (numpy.ndarray): Array representing the composition of compounds in terms of base substances.
+        ar_compound_mass (CompoundMass or numpy.ndarray): Composition of compounds in terms of base
+            substances, either sparse or as dense matrix.
 
     Returns:
         numpy.ndarray: Resolved mass vector containing only base substances.
     """
-    if np.any(af_mass[self.abCompound]):
-        af_resolved_mass = af_mass[:, np.newaxis] * ar_compound_mass
+    af_mass = np.asarray(af_mass, dtype=float)
+    ab_compound = np.asarray(self.abCompound, dtype=bool)
+
+    if not np.any(af_mass[ab_compound]):
+        return af_mass
+
+    if isinstance(ar_compound_mass, CompoundMass):
+        # Only the rows of the compounds contribute to the resolved mass
+        ai_compounds, mr_composition = ar_compound_mass.get_rows()
+        af_resolved_mass = np.where(ab_compound, 0, af_mass)
+        if ai_compounds.size:
+            af_resolved_mass += af_mass[ai_compounds] @ mr_composition
+    else:
+        af_resolved_mass = af_mass[:, np.newaxis] * np.asarray(ar_compound_mass, dtype=float)
         af_resolved_mass = np.sum(af_resolved_mass, axis=0)
         # Add masses of non-compound substances back to the resolved mass
-        af_resolved_mass[~self.abCompound] += af_mass[~self.abCompound]
-    else:
-        af_resolved_mass = af_mass
+        af_resolved_mass[~ab_compound] += af_mass[~ab_compound]
 
     return af_resolved_mass
@@ -1,6 +1,13 @@
 import os
 import re
+import sys
 import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "private")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from importMatterData import import_matter_data as import_substance_data
+from lazySubstanceData import LazySubstanceData
+from sharedMatterTable import publish_matter_table, attach_matter_table
+from propertyCache import PropertyCache
 
 class Table:
     """
@@ -26,6 +33,13 @@ class Table:
         'Pressure': 101325,  # Pa (sea-level pressure)
     }
 
+    # Directory of the binary, memory mapped cache of the NIST data
+    sCacheDirectory = os.path.join("data", "MatterTableCache")
+
+    # If True, the NIST data of a substance is only imported when it is used
+    # for the first time
+    bLazyNISTData = True
+
     def __init__(self):
         """
         Class constructor to initialize the matter table.
@@ -46,6 +60,10 @@ class Table:
         self.abEdibleSubstances = []
         self.csEdibleSubstances = []
 
+        # Tolerance based cache of the properties of phases, flows and
+        # processors, shared by all objects using this matter table
+        self.oPropertyCache = PropertyCache()
+
         # Attempt to load existing matter data
         self.load_matter_data()
 
@@ -75,6 +93,36 @@ class Table:
             print("Regenerating matter table from scratch.")
             self.initialize_matter_table()
 
+        self.load_nist_data()
+
+    def load_nist_data(self):
+        """
+        Register the NIST data of all substances with individual data files.
+        The data is read from the binary matter table cache, which is only
+        regenerated from the CSV files if they changed. The arrays are
+        read-only memory maps shared between all processes using the cache.
+
+        With bLazyNISTData the data of a substance is imported on first
+        access, so models only pay for the substances they actually use.
+        """
+        for substance, txSubstance in self.ttxMatter.items():
+            if not txSubstance.get('bIndividualFile'):
+                continue
+
+            self.ttxMatter[substance] = LazySubstanceData(
+                txSubstance, import_substance_data, substance, self.sCacheDirectory
+            )
+
+            if not self.bLazyNISTData:
+                self.ttxMatter[substance].load()
+
+    def get_loaded_substances(self):
+        """
+        Return the substances whose NIST data has already been imported.
+        """
+        return [substance for substance, txSubstance in self.ttxMatter.items()
+                if isinstance(txSubstance, LazySubstanceData) and txSubstance.bLoaded]
+
     def initialize_matter_table(self):
         """
         Initialize the matter table from raw data sources.
@@ -97,12 +145,48 @@ class Table:
         # Save initialized data
         self.save_matter_data()
 
+    def publish_shared_memory(self):
+        """
+        Publish the numeric arrays of the matter table in a shared memory
+        block, so the worker processes of a parallel simulation sweep can
+        attach to it instead of building their own matter table.
+
+        The caller has to close and unlink the returned SharedMemory object
+        once all workers are done.
+
+        Returns:
+            tuple: The SharedMemory object and a small, picklable descriptor
+            to pass to attach_shared_memory in the workers.
+        """
+        return publish_matter_table(self)
+
+    @staticmethod
+    def attach_shared_memory(tDescriptor):
+        """
+        Create a read-only view of a matter table published with
+        publish_shared_memory. The arrays are not copied.
+        """
+        oMT = attach_matter_table(tDescriptor)
+
+        # Cached properties belong to the objects of each process
+        oMT.oPropertyCache = PropertyCache()
+
+        return oMT
+
     def save_matter_data(self):
         """
         Save the initialized matter table to a file for future use.
         """
+        # The NIST data arrays are stored in the binary matter table cache,
+        # only the remaining substance fields are written to the JSON file
+        ttxMatter = {
+            substance: {key: value for key, value in txSubstance.items()
+                        if not (key.startswith('t') and key.endswith('Data') and isinstance(value, dict))}
+            for substance, txSubstance in self.ttxMatter.items()
+        }
+
         data = {
-            'ttxMatter': self.ttxMatter,
+            'ttxMatter': ttxMatter,
             'afMolarMass': self.afMolarMass,
             'aiCharge': self.aiCharge,
             'afNutritionalEnergy': self.afNutritionalEnergy,
@@ -33,6 +33,11 @@ class Infrastructure:
         self.sCreated = None
         self.bInitialized = False
 
+        # Records the execution time of all timer callbacks and post ticks
+        # and prints the top consumers when a run finishes
+        self.bProfileTimer = False
+        self.iProfileReportEntries = 20
+
         # Simulation monitors
         self.ttMonitorCfg = {
             "oConsoleOutput": {"sClass": "simulation.monitors.consoleOutput", "cParams": [100, 10]},
@@ -97,6 +102,12 @@ class Infrastructure:
                 break
             self.step()
 
+        if self.oTimer.oProfiler is not None:
+            self.oTimer.oProfiler.report(self.iProfileReportEntries)
+
+        if self.oTimer.oStepGovernor is not None:
+            self.oTimer.oStepGovernor.report()
+
     def initialize(self):
         """
         Initialize the simulation, creating and sealing all required components.
@@ -108,6 +119,9 @@ class Infrastructure:
         self.bInitialized = True
         self.configure_monitors()
 
+        if self.bProfileTimer:
+            self.oTimer.enable_profiling()
+
     def configure_monitors(self):
         """
         Configure monitors for the simulation.
@@ -54,7 +54,14 @@ class MassBalanceObserver:
                 self.check_manipulator(phase, manipulator)
 
         # Check total mass balance
-        total_mass_error = self.calculate_total_mass_error(phases)
+        phase_state_store = getattr(timer, "oPhaseStateStore", None)
+        if phase_state_store is not None:
+            total_mass_error = abs(
+                float(phase_state_store.afInitialMass[:phase_state_store.iPhases].sum())
+                - phase_state_store.get_total_mass(bIncludeBoundaries=True)
+            )
+        else:
+            total_mass_error = self.calculate_total_mass_error(phases)
         if total_mass_error > self.max_mass_diff:
             print(f"Mass balance exceeded: {total_mass_error}")
             if self.set_breakpoints:
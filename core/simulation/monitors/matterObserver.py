@@ -41,9 +41,15 @@ class MatterObserver:
         """
         timer = self.simulation.timer
         if timer.tick % self.mass_log_interval == 0:
-            # Calculate total and generated mass
-            total_mass = sum(phase.mass for phase in self.phases if not phase.is_boundary)
-            generated_mass = sum(phase.generated_mass for phase in self.phases)
+            # Calculate total and generated mass, in one array operation if
+            # the phases are kept in a phase state store
+            phase_state_store = getattr(timer, "oPhaseStateStore", None)
+            if phase_state_store is not None:
+                total_mass = phase_state_store.get_total_mass()
+                generated_mass = phase_state_store.get_total_generated_mass()
+            else:
+                total_mass = sum(phase.mass for phase in self.phases if not phase.is_boundary)
+                generated_mass = sum(phase.generated_mass for phase in self.phases)
 
             # Log mass data
             self.total_mass_log.append(total_mass)
@@ -63,11 +63,6 @@ class Capacity(Base, EventSource):
         self.fLastRegisteredTemperatureUpdated = -1
         self.fLastTotalHeatCapacityUpdate = 0
 
-        # Heat capacity update-related properties
-        self.fPressureLastHeatCapacityUpdate = None
-        self.fTemperatureLastHeatCapacityUpdate = None
-        self.arPartialMassLastHeatCapacityUpdate = None
-
         # Callback bindings
         self.bTriggerSetCalculateHeatsourcePreCallbackBound = False
         self.bTriggerSetUpdateTemperaturePostCallbackBound = False
@@ -94,15 +89,19 @@ class Capacity(Base, EventSource):
     def update_specific_heat_capacity(self):
         """
         Update the specific heat capacity based on the current phase properties.
-        """
-        if (self.fPressureLastHeatCapacityUpdate is None or
-                abs(self.fPressureLastHeatCapacityUpdate - self.oPhase.fPressure) > 100 or
-                abs(self.fTemperatureLastHeatCapacityUpdate - self.fTemperature) > 1 or
-                max(abs(self.arPartialMassLastHeatCapacityUpdate - self.oPhase.arPartialMass)) > 0.01):
-            self.fSpecificHeatCapacity = self.oMT.calculate_specific_heat_capacity(self.oPhase)
-            self.fPressureLastHeatCapacityUpdate = self.oPhase.fPressure
-            self.fTemperatureLastHeatCapacityUpdate = self.fTemperature
-            self.arPartialMassLastHeatCapacityUpdate = self.oPhase.arPartialMass
+        The value is only recalculated if the pressure, temperature or
+        composition changed by more than the tolerances of the property
+        cache of the matter table.
+        """
+        self.fSpecificHeatCapacity = self.oMT.oPropertyCache.get(
+            self, 'fSpecificHeatCapacity',
+            lambda: self.oMT.calculate_specific_heat_capacity(self.oPhase),
+            {
+                'fPressure': self.oPhase.fPressure,
+                'fTemperature': self.fTemperature,
+                'arPartialMass': self.oPhase.arPartialMass,
+            },
+        )
 
     def set_total_heat_capacity(self, fTotalHeatCapacity):
         """
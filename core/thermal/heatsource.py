@@ -28,7 +28,6 @@ class HeatSource(BaseBranch, EventSource):
         self.fRequestedHeatFlow = fHeatFlow  # Requested heat flow [W]
         self.oCapacity = None  # Reference to the connected capacity
         self.hBindPostTickUpdate = None  # Handle to bind post-tick update
-        self.chUnbindFunctions = []  # List of unbind functions
         self.bTriggerUpdateCallbackBound = False  # Trigger for update callback
         self.bTriggerSetFlowRateCallbackBound = False  # Trigger for flow rate callback
 
@@ -64,10 +63,9 @@ class HeatSource(BaseBranch, EventSource):
         """
         if self.oCapacity is None:
             self.oCapacity = oCapacity
-            self.hBindPostTickUpdate, unbind_fn = self.oCapacity.oTimer.registerPostTick(
+            self.hBindPostTickUpdate = self.oCapacity.oTimer.registerPostTick(
                 self.updateHeatFlow, 'thermal', 'heatsources'
             )
-            self.chUnbindFunctions.append(unbind_fn)
         else:
             raise ValueError("Heatsource already has a capacity object.")
 
@@ -5,10 +5,13 @@ from multiprocessing import Manager
 import time
 import threading
 import pickle
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "matter", "table")))
+from table import Table
 
 def general_parallel_execution(
     sSimulationPath, cmInputs, csSimulationNames=None, iTicksBetweenUpdateWaitBar=1, 
-    sContinueFromFolder=None, fAdvanceTo=None
+    sContinueFromFolder=None, fAdvanceTo=None, oMT=None
 ):
     """
     Executes simulations in parallel with different parameters.
@@ -20,6 +23,9 @@ def general_parallel_execution(
         iTicksBetweenUpdateWaitBar (int, optional): Number of ticks between wait bar updates.
         sContinueFromFolder (str, optional): Folder to continue simulations from.
         fAdvanceTo (float, optional): Time to advance to when continuing simulations.
+        oMT (Table, optional): Matter table built by the parent process. Its
+            arrays are published in shared memory and every simulation
+            attaches a read-only view instead of building its own table.
     """
     iSimulations = len(cmInputs)
 
@@ -46,6 +52,13 @@ def general_parallel_execution(
     # Create a dictionary to track progress
     progress_dict = manager.dict({sim: 0 for sim in range(iSimulations)})
 
+    # Publish the matter table once, the workers only receive the small
+    # descriptor of the shared memory block
+    oSharedMemory = None
+    tSharedMatterTable = None
+    if oMT is not None:
+        oSharedMemory, tSharedMatterTable = oMT.publish_shared_memory()
+
     # Define a function for worker execution
     def worker(sim_idx):
         try:
@@ -53,6 +66,10 @@ def general_parallel_execution(
             sim_name = csSimulationNames[sim_idx]
             print(f"Starting Simulation: {sim_name}")
 
+            oWorkerMT = None
+            if tSharedMatterTable is not None:
+                oWorkerMT = Table.attach_shared_memory(tSharedMatterTable)
+
             if sContinueFromFolder:
                 # Continue from existing simulation
                 sim_file = f"data/runs/{sContinueFromFolder}/oLastSimObj_{sim_name}.pkl"
@@ -63,7 +80,7 @@ def general_parallel_execution(
                 oLastSimObj.advance_to(fAdvanceTo)
             else:
                 # Start a new simulation
-                oLastSimObj = run_simulation(sSimulationPath, sim_input, iTicksBetweenUpdateWaitBar)
+                oLastSimObj = run_simulation(sSimulationPath, sim_input, iTicksBetweenUpdateWaitBar, oWorkerMT)
             
             # Save the result
             sim_file = f"data/runs/{sStorageDirectory}/oLastSimObj_{sim_name}.pkl"
@@ -102,10 +119,14 @@ def general_parallel_execution(
         # Wait for monitor thread to finish
         monitor_thread.join()
 
+    if oSharedMemory is not None:
+        oSharedMemory.close()
+        oSharedMemory.unlink()
+
     print("All simulations completed.")
 
 # Supporting function for running simulations
-def run_simulation(sSimulationPath, sim_input, iTicksBetweenUpdateWaitBar):
+def run_simulation(sSimulationPath, sim_input, iTicksBetweenUpdateWaitBar, oMT=None):
     """
     Run a single simulation.
 
@@ -113,6 +134,7 @@ def run_simulation(sSimulationPath, sim_input, iTicksBetweenUpdateWaitBar):
         sSimulationPath (str): Path to the simulation definition.
         sim_input (dict): Input parameters for the simulation.
         iTicksBetweenUpdateWaitBar (int): Ticks between updates.
+        oMT (Table, optional): Shared matter table to use for the simulation.
 
     Returns:
         Simulation object or result.
@@ -64,16 +64,23 @@ class CHX:
     def define_vapor_pressure_interpolation(self, afTemperature):
         """
         Define the vapor pressure interpolation based on the given temperature range.
+        All support points are calculated in one vectorized call.
         """
-        afVaporPressure = [self.calculate_vapor_pressure(temp) for temp in afTemperature]
+        afTemperature = np.asarray(afTemperature, dtype=float)
+        afVaporPressure = self.calculate_vapor_pressure(afTemperature)
         self.hVaporPressureInterpolation = lambda x: np.interp(x, afTemperature, afVaporPressure)
 
     def calculate_vapor_pressure(self, temperature):
         """
-        Placeholder for calculating vapor pressure at a given temperature.
-        Replace with actual calculation logic.
+        Calculates the vapor pressure of water for scalar or array
+        temperatures with the vapor pressure service of the matter table.
+        Returns 0 as long as the CHX is not connected to a matter table.
         """
-        return 0  # Placeholder value
+        oMT = getattr(self, 'oMT', None)
+        if oMT is None:
+            return np.zeros(np.shape(temperature))
+
+        return oMT.calculate_vapor_pressure(temperature, 'H2O')
 
     def update(self, afPartialInFlowsGas=None):
         """
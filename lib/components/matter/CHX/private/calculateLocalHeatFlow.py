@@ -37,36 +37,20 @@ def calculateLocalHeatFlow(oCHX, tInput):
 
         iSteps = len(mfTemperature)
 
-        mfMolFractionVaporAtSurface = np.zeros(iSteps)
         mfSpecificMassFlowRate_Vapor = np.zeros(iSteps)
         mfBeta_Gas = np.zeros(iSteps)
         mfGasHeatFlux = np.zeros(iSteps)
         mfCoolantHeatFlux = np.zeros(iSteps)
         mfFilmFlowRate = np.zeros(iSteps)
 
-        for iStep in range(iSteps):
-            try:
-                if (oCHX.hVaporPressureInterpolation.GridVectors[0][0] < mfTemperature[iStep] < 
-                        oCHX.hVaporPressureInterpolation.GridVectors[0][1]):
-                    mfMolFractionVaporAtSurface[iStep] = (oCHX.hVaporPressureInterpolation(mfTemperature[iStep]) /
-                                                          tInput['fPressureGas'])
-                else:
-                    mfMolFractionVaporAtSurface[iStep] = (oCHX.oMT.calculateVaporPressure(mfTemperature[iStep], tInput['Vapor']) /
-                                                          tInput['fPressureGas'])
-                if np.isnan(mfMolFractionVaporAtSurface[iStep]):
-                    fTemperatureDifference = mfTemperature[-1] + 5 - 273
-                    fDeltaTemperature = fTemperatureDifference / 50
-                    oCHX.defineVaporPressureInterpolation(np.arange(273, mfTemperature[-1] + 5, fDeltaTemperature))
-                    mfMolFractionVaporAtSurface[iStep] = (oCHX.hVaporPressureInterpolation(mfTemperature[iStep]) /
-                                                          tInput['fPressureGas'])
-            except Exception:
-                mfMolFractionVaporAtSurface[iStep] = (oCHX.oMT.calculateVaporPressure(mfTemperature[iStep], tInput['Vapor']) /
-                                                      tInput['fPressureGas'])
-                oCHX.hVaporPressureInterpolation = oCHX.oMT.ttxMatter[tInput['Vapor']]['tInterpolations']['VaporPressure']
-            
-            if mfMolFractionVaporAtSurface[iStep] > 1:
-                mfMolFractionVaporAtSurface[iStep] = 1
+        # Mol fraction of the vapor at the surface for all search steps at
+        # once, the vapor pressure service evaluates the Antoine ranges for
+        # the whole temperature vector
+        mfMolFractionVaporAtSurface = np.minimum(
+            oCHX.oMT.calculate_vapor_pressure(mfTemperature, tInput['Vapor']) / tInput['fPressureGas'], 1
+        )
 
+        for iStep in range(iSteps):
             if tInput['fMolarFractionVapor'] == 0 and tInput['fMassFlowFilm'] == 0:
                 mfSpecificMassFlowRate_Vapor[iStep] = 0
             else:
@@ -27,9 +27,12 @@ class ManualManipulator:
         self.fMassTransferTime = None
         self.fMassTransferFinishTime = None
 
-        # Timer binding for mass transfer checks
-        self.setMassTransferTimeStep = self.oPhase.oTimer.bind(self.checkMassTransfer, 0)
-        self.setMassTransferTimeStep(float('inf'), True)
+        # Timer binding for mass transfer checks, parked until a mass
+        # transfer is started
+        self.setMassTransferTimeStep, self.unbindMassTransferCheck = self.oPhase.oTimer.bind(
+            lambda _: self.checkMassTransfer(), 0
+        )
+        self.setMassTransferTimeStep.sleep()
 
     def setFlowRate(self, afFlowRates, aarFlowsToCompound=None, bAutoAdjustFlowRates=None):
         """
@@ -99,6 +102,7 @@ class ManualManipulator:
 
         self.afManualFlowRates = [mass / fTime for mass in afPartialMasses]
         self.setMassTransferTimeStep(fTime, True)
+        self.setMassTransferTimeStep.wake()
 
         if aarFlowsToCompound:
             self.aarManualFlowsToCompound = aarFlowsToCompound
@@ -119,7 +123,7 @@ class ManualManipulator:
                 self.afManualFlowRates = [0] * self.oPhase.oMT.iSubstances
                 self.aarManualFlowsToCompound = [[0] * self.oPhase.oMT.iSubstances for _ in range(self.oPhase.oMT.iSubstances)]
                 self.bMassTransferActive = False
-                self.setMassTransferTimeStep(float('inf'), True)
+                self.setMassTransferTimeStep.sleep()
                 self.oPhase.registerMassupdate()
             else:
                 # Update time step
@@ -15,8 +15,8 @@ class ManualP2P(matter.procs.p2ps.stationary):
         self.fMassTransferTime = None
         self.fMassTransferFinishTime = None
         
-        self.setMassTransferTimeStep = self.oTimer.bind(
-            lambda _: self.checkMassTransfer(),
+        self.setMassTransferTimeStep, self.unbindMassTransferCheck = self.oTimer.bind(
+            self.checkMassTransfer,
             0,
             {
                 'sMethod': 'checkMassTransfer',
@@ -24,8 +24,8 @@ class ManualP2P(matter.procs.p2ps.stationary):
                 'oSrcObj': self
             }
         )
-        # Initialize the time step to infinity
-        self.setMassTransferTimeStep(float('inf'), True)
+        # The check is parked until a mass transfer is started
+        self.setMassTransferTimeStep.sleep()
 
     def setFlowRate(self, afPartialFlowRates):
         """
@@ -72,8 +72,9 @@ class ManualP2P(matter.procs.p2ps.stationary):
 
         self.afFlowRates = [mass / fTime for mass in afPartialMasses]
 
-        # Reset the time step
+        # Reset the time step and wake up the check
         self.setMassTransferTimeStep(fTime, True)
+        self.setMassTransferTimeStep.wake()
 
         # Ensure mass updates are triggered for connected phases
         self.oIn.oPhase.registerMassupdate()
@@ -86,7 +87,7 @@ class ManualP2P(matter.procs.p2ps.stationary):
         if self.bMassTransferActive and self.fMassTransferFinishTime - self.oTimer.fTime < self.oTimer.fMinimumTimeStep:
             self.afFlowRates = [0] * self.oMT.iSubstances
             self.bMassTransferActive = False
-            self.setMassTransferTimeStep(float('inf'), True)
+            self.setMassTransferTimeStep.sleep()
             
             # Ensure mass updates are triggered for connected phases
             self.oIn.oPhase.registerMassupdate()
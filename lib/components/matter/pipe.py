@@ -28,8 +28,16 @@ class Pipe(f2f):
         self.fDynamicViscosity = 17.2e-6
         self.rMaxChange = 0.01
 
-        self.fTemperatureLastUpdate = 0
-        self.fPressureLastUpdate = 0
+        # The dynamic viscosity is recalculated if the temperature or
+        # pressure of the inflow changed by more than rMaxChange
+        self.oMT.oPropertyCache.set_tolerances(
+            {
+                "fTemperature": {"fAbsolute": 0, "rRelative": self.rMaxChange},
+                "fPressure": {"fAbsolute": 0, "rRelative": self.rMaxChange},
+            },
+            "fDynamicViscosity",
+            self,
+        )
 
         self.supportSolver("hydraulic", fDiameter, fLength)
         self.supportSolver("callback", self.solverDeltas)
@@ -47,8 +55,7 @@ class Pipe(f2f):
         oFlowIn, _ = self.getFlows()
 
         fDensity = self.oMT.calculateDensity(oFlowIn)
-        if self.oTimer.fTime > self.fTimeOfLastUpdate:
-            self.fDynamicViscosity = self.oMT.calculateDynamicViscosity(oFlowIn)
+        self.fDynamicViscosity = self.getDynamicViscosity(oFlowIn)
 
         fFlowSpeed = oFlowIn.fFlowRate / (fDensity * (3.14159 * 0.25 * self.fDiameter**2))
         self.fDeltaPressure = Pipe(
@@ -63,6 +70,19 @@ class Pipe(f2f):
 
         self.fTimeOfLastUpdate = self.oTimer.fTime
 
+    def getDynamicViscosity(self, oFlowIn):
+        """
+        Dynamic viscosity of the inflow, taken from the property cache of the
+        matter table as long as its temperature and pressure stay within
+        rMaxChange.
+        """
+        return self.oMT.oPropertyCache.get(
+            self,
+            "fDynamicViscosity",
+            lambda: self.oMT.calculateDynamicViscosity(oFlowIn),
+            {"fTemperature": oFlowIn.fTemperature, "fPressure": oFlowIn.fPressure},
+        )
+
     def calculatePressureDropCoefficient(self, _):
         """
         Calculate the pressure drop coefficient for laminar flow.
@@ -92,17 +112,7 @@ class Pipe(f2f):
 
         if self.oBranch.fFlowRate != 0:
             try:
-                if self.oTimer.fTime > self.fTimeOfLastUpdate:
-                    rTemperatureChange = abs(
-                        1 - self.fTemperatureLastUpdate / oFlowIn.fTemperature
-                    )
-                    rPressureChange = abs(
-                        1 - self.fPressureLastUpdate / oFlowIn.fPressure
-                    )
-                    if rTemperatureChange > self.rMaxChange or rPressureChange > self.rMaxChange:
-                        self.fDynamicViscosity = oFlowIn.getDynamicViscosity()
-                        self.fTemperatureLastUpdate = oFlowIn.fTemperature
-                        self.fPressureLastUpdate = oFlowIn.fPressure
+                self.fDynamicViscosity = self.getDynamicViscosity(oFlowIn)
             except Exception:
                 self.fDynamicViscosity = 17.2e-6
                 if not base.oDebug.bOff:
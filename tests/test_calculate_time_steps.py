@@ -0,0 +1,105 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "matter", "phase")))
+from calculateTimeStep import calculate_time_step, calculate_time_step_batch, calculate_time_steps
+
+iSubstances = 40
+
+
+class Phase:
+    """
+    Phase with random masses, flows and time step limits, and the methods
+    used by the time step calculation.
+    """
+    calculate_time_step = calculate_time_step
+
+    def __init__(self, iSeed):
+        oRandom = np.random.default_rng(iSeed)
+
+        self.afFlows = oRandom.normal(size=iSubstances) * 10 ** oRandom.uniform(-9, -2, size=iSubstances)
+        self.afFlows[oRandom.random(iSubstances) < 0.3] = 0
+        self.afFlows[0] = -abs(self.afFlows[0]) - 1e-6
+
+        self.afMass = oRandom.random(iSubstances) * 10 ** oRandom.uniform(-12, 2, size=iSubstances)
+        self.afMass[oRandom.random(iSubstances) < 0.2] = 0
+        if iSeed % 11 == 0:
+            self.afMass[:] = 0
+        self.fMass = float(np.sum(self.afMass))
+
+        self.fMassErrorLimit = 1e-12 * oRandom.random()
+        self.fMaximumInitialMass = oRandom.random()
+        self.rMaxChange = oRandom.uniform(1e-4, 0.05)
+        self.iTimeStepPrecision = int(oRandom.integers(5, 12))
+        self.bHasSubstanceSpecificMaxChangeValues = iSeed % 3 == 0
+        self.arMaxChange = np.where(oRandom.random(iSubstances) < 0.5, oRandom.uniform(0.001, 0.1, iSubstances), 0)
+        self.fFixedTimeStep = 0.5 if iSeed % 13 == 0 else None
+        self.bFlow = iSeed % 17 == 0
+        self.bBoundary = iSeed % 19 == 0
+        self.fMaxStep = oRandom.uniform(1, 100)
+        self.fMinStep = 1e-8 * oRandom.random()
+
+        self.iSubstanceManipulators = int(iSeed % 5 == 0)
+        self.toManips = types.SimpleNamespace(
+            substance=types.SimpleNamespace(afPartialFlows=oRandom.normal(size=iSubstances) * 1e-5)
+        )
+
+        self.fLastUpdate = 0.0 if iSeed % 2 else 1.0
+        self.oTimer = types.SimpleNamespace(fTime=1.0)
+        self.asLog = []
+
+    def get_total_mass_change(self):
+        return self.afFlows.copy(), None, None
+
+    def log_debug(self, *args):
+        self.asLog.append(args)
+
+    def set_time_step(self, fTimeStep, reset_last_exec=False):
+        self.tTimeStep = (fTimeStep, reset_last_exec)
+
+
+def assert_same_result(aoExpected, aoPhases):
+    for oExpected, oPhase in zip(aoExpected, aoPhases):
+        assert oPhase.tTimeStep == oExpected.tTimeStep
+        assert oPhase.fTimeStep == oExpected.fTimeStep
+        assert oPhase.asLog == oExpected.asLog
+        np.testing.assert_array_equal(oPhase.afCurrentTotalInOuts, oExpected.afCurrentTotalInOuts)
+
+
+@pytest.fixture
+def aoExpected():
+    aoPhases = [Phase(iSeed) for iSeed in range(300)]
+    with np.errstate(all='ignore'):
+        for oPhase in aoPhases:
+            oPhase.calculate_time_step()
+
+    return aoPhases
+
+
+def test_batch_equals_the_per_phase_calculation(aoExpected):
+    aoPhases = [Phase(iSeed) for iSeed in range(300)]
+
+    with np.errstate(all='ignore'):
+        afTimeSteps = calculate_time_steps(aoPhases)
+
+    assert_same_result(aoExpected, aoPhases)
+    np.testing.assert_array_equal(afTimeSteps, [oPhase.fTimeStep for oPhase in aoExpected])
+    assert np.all(afTimeSteps > 0)
+
+
+def test_batch_handler_equals_the_per_phase_calculation(aoExpected):
+    aoPhases = [Phase(iSeed) for iSeed in range(300)]
+    aiExecuted = []
+
+    chCallBacks = [oPhase.calculate_time_step for oPhase in aoPhases]
+    chCallBacks.insert(100, lambda: aiExecuted.append(100))
+
+    with np.errstate(all='ignore'):
+        calculate_time_step_batch(chCallBacks)
+
+    assert aiExecuted == [100]
+    assert_same_result(aoExpected, aoPhases)
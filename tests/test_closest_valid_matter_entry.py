@@ -0,0 +1,78 @@
+import os
+import sys
+import types
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "matter", "table")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "matter", "table", "private")))
+from findClosestValidMatterEntry import find_closest_valid_matter_entries, find_closest_valid_matter_entry
+
+
+def create_matter_table():
+    """
+    Matter table with synthetic gas data of one substance on a
+    (temperature, log10 pressure) mesh. Below 300 K the substance is liquid.
+    """
+    mf_temperature, mf_pressure = np.meshgrid(np.linspace(200, 600, 41), np.logspace(2, 7, 26))
+    mf_data = np.column_stack((
+        mf_temperature.ravel(), mf_pressure.ravel(), mf_pressure.ravel() / (287 * mf_temperature.ravel())
+    ))
+
+    t_columns = {"Temperature": 0, "Pressure": 1, "Density": 2}
+    tx_isobaric = {"tColumns": t_columns}
+    for s_phase, ab_phase in (("tLiquid", mf_data[:, 0] < 300), ("tGas", mf_data[:, 0] >= 300)):
+        mf_phase = mf_data[ab_phase]
+        tx_isobaric[s_phase] = {
+            "mfData": mf_phase,
+            "ttExtremes": {
+                "tTemperature": {"Min": mf_phase[:, 0].min(), "Max": mf_phase[:, 0].max()},
+                "tPressure": {"Min": mf_phase[:, 1].min(), "Max": mf_phase[:, 1].max()},
+            },
+        }
+
+    return types.SimpleNamespace(ttx_matter={"Air": {"bIndividualFile": True, "tIsobaricData": tx_isobaric}})
+
+
+def test_closest_entry_in_normalized_temperature_and_log_pressure():
+    oMT = create_matter_table()
+    mf_gas = oMT.ttx_matter["Air"]["tIsobaricData"]["tGas"]["mfData"]
+
+    o_random = np.random.default_rng(0)
+    af_temperature = o_random.uniform(150, 650, 200)
+    af_pressure = 10 ** o_random.uniform(1, 8, 200)
+
+    af_values = find_closest_valid_matter_entries(
+        oMT, "Air", "Density", "Temperature", af_temperature, "Pressure", af_pressure, "gas"
+    )
+
+    # Brute force search with the same metric
+    mf_points = np.column_stack((mf_gas[:, 0], np.log10(mf_gas[:, 1])))
+    af_min, af_max = mf_points.min(axis=0), mf_points.max(axis=0)
+    mf_queries = np.clip(np.column_stack((af_temperature, np.log10(af_pressure))), af_min, af_max)
+    mf_distances = (((mf_points[np.newaxis] - mf_queries[:, np.newaxis]) / (af_max - af_min)) ** 2).sum(axis=2)
+
+    np.testing.assert_array_equal(af_values, mf_gas[np.argmin(mf_distances, axis=1), 2])
+
+
+def test_single_entry_matches_batch():
+    oMT = create_matter_table()
+    t_parameters = {
+        "sSubstance": "Air", "sProperty": "Density", "sFirstDepName": "Temperature", "fFirstDepValue": 250.0,
+        "sSecondDepName": "Pressure", "fSecondDepValue": 2e5, "sPhaseType": "gas",
+    }
+
+    f_value = find_closest_valid_matter_entry(oMT, t_parameters)
+    af_values = find_closest_valid_matter_entries(oMT, "Air", "Density", "Temperature", [250.0], "Pressure", [2e5], "gas")
+
+    assert f_value == af_values[0]
+
+
+def test_inputs_are_not_changed():
+    oMT = create_matter_table()
+    af_pressure = np.array([1e3, 1e5])
+    af_pressure.flags.writeable = False
+
+    find_closest_valid_matter_entries(oMT, "Air", "Density", "Pressure", af_pressure, None, None, "gas")
+
+    np.testing.assert_array_equal(af_pressure, [1e3, 1e5])
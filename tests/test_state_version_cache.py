@@ -0,0 +1,115 @@
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "matter")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "matter", "table", "private")))
+from compoundMass import CompoundMass
+from getNecessaryParameters import MatterTable
+from stateVersion import StateVersionedAttribute
+
+
+class Phase:
+    """
+    Liquid phase with the attributes used by get_necessary_parameters.
+    """
+    sObjectType = "phase"
+
+    fMass = StateVersionedAttribute()
+    fTemperature = StateVersionedAttribute()
+    arPartialMass = StateVersionedAttribute()
+
+    def __init__(self):
+        self.oTimer = types.SimpleNamespace(fTime=0.0)
+        self.sType = "liquid"
+        self.fPressure = 1e5
+        self.fMass = 1.0
+        self.fTemperature = 300.0
+        self.arPartialMass = np.array([0.0, 0.0, 1.0])
+        self.arCompoundMass = CompoundMass(3, {2: np.array([0.25, 0.75, 0.0])})
+
+
+class CountingMatterTable(MatterTable):
+    """
+    Matter table that resolves compounds into their base composition and
+    counts the resolutions.
+    """
+    iSubstances = 3
+    Standard = {"Temperature": 288.15}
+
+    def __init__(self):
+        self.iResolutions = 0
+
+    def resolve_compound_mass(self, arPartialMass, oCompoundMass):
+        self.iResolutions += 1
+        mrCompoundMass = np.asarray(oCompoundMass)
+        arPartialMass = np.asarray(arPartialMass, dtype=float)
+        abCompound = mrCompoundMass.any(axis=1)
+
+        return arPartialMass * ~abCompound + arPartialMass[abCompound] @ mrCompoundMass[abCompound]
+
+
+@pytest.fixture
+def oMT():
+    return CountingMatterTable()
+
+
+@pytest.fixture
+def oPhase():
+    return Phase()
+
+
+def test_unchanged_state_is_resolved_once(oMT, oPhase):
+    tFirst = oMT.get_necessary_parameters(oPhase)
+
+    assert oMT.get_necessary_parameters(oPhase) is tFirst
+    assert oMT.iResolutions == 1
+
+
+def test_assignment_invalidates_the_cache(oMT, oPhase):
+    oMT.get_necessary_parameters(oPhase)
+
+    oPhase.fTemperature = 310.0
+
+    assert oMT.get_necessary_parameters(oPhase)[0] == 310.0
+    assert oMT.iResolutions == 2
+
+
+def test_compound_mass_change_invalidates_the_cache(oMT, oPhase):
+    np.testing.assert_allclose(oMT.get_necessary_parameters(oPhase)[1], [0.25, 0.75, 0.0])
+
+    oPhase.arCompoundMass[2, 0] = 0.5
+    oPhase.arCompoundMass[2, 1] = 0.5
+
+    np.testing.assert_allclose(oMT.get_necessary_parameters(oPhase)[1], [0.5, 0.5, 0.0])
+
+    oPhase.arCompoundMass[2] = np.array([1.0, 0.0, 0.0])
+
+    np.testing.assert_allclose(oMT.get_necessary_parameters(oPhase)[1], [1.0, 0.0, 0.0])
+    assert oMT.iResolutions == 3
+
+
+def test_new_tick_invalidates_the_cache(oMT, oPhase):
+    oMT.get_necessary_parameters(oPhase)
+
+    oPhase.oTimer.fTime = 1.0
+    oMT.get_necessary_parameters(oPhase)
+
+    assert oMT.iResolutions == 2
+
+
+def test_compound_mass_rows_are_read_only():
+    oCompoundMass = CompoundMass(3, {2: np.array([0.25, 0.75, 0.0])})
+
+    with pytest.raises(ValueError):
+        oCompoundMass[2][0] = 0.5
+    with pytest.raises(ValueError):
+        oCompoundMass[2, 0:2][:] = 0.5
+    with pytest.raises(ValueError):
+        oCompoundMass[1][0] = 0.5
+
+    np.testing.assert_array_equal(oCompoundMass.toarray()[2], [0.25, 0.75, 0.0])
+    assert oCompoundMass.iVersion == 1
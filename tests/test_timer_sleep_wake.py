@@ -0,0 +1,93 @@
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "core", "event")))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "lib", "components", "matter", "Manips")))
+from timer import Timer
+from ManualManipulator import ManualManipulator
+
+
+@pytest.fixture(params=[False, True], ids=["heap", "vectorized"])
+def oTimer(request):
+    return Timer(bVectorized=request.param)
+
+
+def run_until(oTimer, fTime):
+    afTimes = []
+    while oTimer.fTime < fTime:
+        oTimer.tick()
+        afTimes.append(oTimer.fTime)
+
+    return afTimes
+
+
+def test_sleeping_callback_is_not_executed(oTimer):
+    afExecuted = []
+    oTimer.bind(lambda _: None, 1)
+    hSetTimeStep, _ = oTimer.bind(lambda oTimer: afExecuted.append(oTimer.fTime), 1)
+
+    run_until(oTimer, 2)
+    hSetTimeStep.sleep()
+    run_until(oTimer, 6)
+
+    assert afExecuted == [0, 1, 2]
+
+
+def test_due_wake_up_does_not_add_a_tick(oTimer):
+    afExecuted = []
+    oTimer.bind(lambda _: None, 1)
+    hSetTimeStep, _ = oTimer.bind(lambda oTimer: afExecuted.append(oTimer.fTime), 1)
+
+    run_until(oTimer, 1)
+    hSetTimeStep.sleep()
+    run_until(oTimer, 3)
+    hSetTimeStep.wake()
+    afTimes = run_until(oTimer, 6)
+
+    assert afTimes == [4, 5, 6]
+    assert afExecuted == [0, 1, 4, 5, 6]
+
+
+def test_wake_up_keeps_the_time_step_of_the_callback(oTimer):
+    # The only other callback is slow and wakes up the parked one at 200 s,
+    # its step must not delay the woken callback
+    afExecuted = []
+    hSetTimeStep, _ = oTimer.bind(lambda oTimer: afExecuted.append(oTimer.fTime), 0)
+    hSetTimeStep.sleep()
+
+    def wake_up(oTimer):
+        if oTimer.fTime == 200:
+            hSetTimeStep(10, True)
+            hSetTimeStep.wake()
+
+    oTimer.bind(wake_up, 100)
+
+    afTimes = run_until(oTimer, 220)
+
+    assert afTimes == [0, 100, 200, 210, 220]
+    assert afExecuted == [210, 220]
+
+
+def test_manual_manipulator_transfer_from_parked_state(oTimer):
+    afMassUpdates = []
+    oPhase = types.SimpleNamespace(
+        oTimer=oTimer,
+        oMT=types.SimpleNamespace(iSubstances=2),
+        registerMassupdate=lambda: afMassUpdates.append(oTimer.fTime),
+    )
+    oManip = ManualManipulator(None, "Manip", oPhase)
+
+    def start_transfer(oTimer):
+        if oTimer.fTime == 200:
+            oManip.setMassTransfer([1, -1], 10)
+
+    oTimer.bind(start_transfer, 100)
+    run_until(oTimer, 300)
+
+    # Started at 200 s and stopped after the requested 10 s
+    assert afMassUpdates == [200, 210]
+    assert not oManip.bMassTransferActive
+    assert oTimer.abSleeping[oManip.setMassTransferTimeStep.iCB]